@@ -0,0 +1,11 @@
+# 🚀 正式啟動入口：streamlit run app.py
+# 以 st.App 包住主程式，讓 app/static/assets/ 的圖片帶長效 Cache-Control（見 cardpack/static_assets.py）
+import streamlit as st
+from starlette.middleware import Middleware
+
+from cardpack.static_assets import ImmutableAssetsMiddleware
+
+app = st.App("優等學院對戰卡牌 抽卡紀錄器.py", middleware=[Middleware(ImmutableAssetsMiddleware)])
+
+if __name__ == "__main__":
+    app.run()
@@ -0,0 +1,257 @@
+# 👩‍🏫 模擬全班同時輸入學號並抽卡的壓力測試（使用本機 Google Sheet 替身，不連網）
+#
+#   python benchmarks/class_load.py --students 30 --latency-ms 80,250
+#   python benchmarks/class_load.py --students 40 --reads-per-minute 60 --output /tmp/load.json
+#
+# 每位學生各開一個 streamlit.testing.v1.AppTest 工作階段（同一個程序內，共用快取、資料庫與替身試算表），
+# 全部準備好後同時開始：輸入學號 → 作業抽卡 → 進度抽卡，記錄每一步的延遲（p50 / p90 / p99）。
+# 最後等待背景同步把佇列送完，並列出替身收到的讀寫次數、429 次數與配額排程的等待次數。
+# 抽卡紀錄寫在暫存資料夾（暫存的 SQLite 資料庫與 抽卡紀錄/ xlsx），不會動到正式資料。
+# 同時執行多個 AppTest 需要改動 Streamlit 內部（見 _make_apptest_concurrent），只在 TESTED_STREAMLIT
+# 驗證過：其他版本預設拒絕執行（--allow-untested-streamlit 可略過），用到的內部屬性不存在時直接報錯；
+# 任何學生發生錯誤時結束代碼為 1。
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+SCRIPT_PATH = os.path.join(ROOT_DIR, "優等學院對戰卡牌 抽卡紀錄器.py")
+SHARED_FILES = ["background.png", "logo.png", "sounds"]
+DRAW_BUTTONS = ["draw_homework", "draw_progress"]
+TIMEOUT = 120
+TESTED_STREAMLIT = "1.65"  # 主版本.次版本
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "n": len(ordered),
+        "p50_ms": pick(50) * 1000,
+        "p90_ms": pick(90) * 1000,
+        "p99_ms": pick(99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "mean_ms": statistics.mean(ordered) * 1000,
+    }
+
+
+def _timed_run(element):
+    started = time.perf_counter()
+    app = element.run(timeout=TIMEOUT)
+    return app, time.perf_counter() - started
+
+
+# AppTest 原本一次只跑一個測試：每次執行都會改寫 Runtime._instance、PagesManager.uses_pages_directory
+# 與 global.appTest 設定，結束時再清除，並新建 ScriptCache 重新編譯腳本。多個工作階段同時執行時，
+# 別人的清除會讓執行中的腳本退回「沒有 Runtime」模式或算出不同的元件 id（輸入框讀不到值），
+# 同時編譯也會觸發 CPython 3.11 的 ast 錯誤。這裡讓它們在整個壓力測試期間固定不變
+# （正式伺服器本來就只有一個 Runtime、腳本只編譯一次）。
+def _keep_assigned(cls, attribute):
+    class _Keep(type(cls)):
+        def __setattr__(self, name, value):
+            if name == attribute:
+                if value is not None:
+                    setattr(cls, name, value)
+                return
+            super().__setattr__(name, value)
+
+    return _Keep(cls.__name__, (cls,), {})
+
+
+def _make_apptest_concurrent(allow_untested=False):
+    import contextlib
+
+    import streamlit
+    from streamlit import config
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    version = streamlit.__version__
+    if not (version == TESTED_STREAMLIT or version.startswith(TESTED_STREAMLIT + ".")) and not allow_untested:
+        raise SystemExit(
+            f"壓力測試只在 Streamlit {TESTED_STREAMLIT}.x 驗證過（目前 {version}），"
+            "請先確認 _make_apptest_concurrent 用到的內部結構，再以 --allow-untested-streamlit 執行"
+        )
+    required = [
+        (app_test, "ScriptCache"), (local_script_runner, "ScriptCache"), (app_test, "Runtime"),
+        (app_test, "PagesManager"), (app_test, "patch_config_options"),
+        (Runtime, "_instance"), (PagesManager, "uses_pages_directory"),
+    ]
+    missing = [f"{getattr(owner, '__name__', owner)}.{name}" for owner, name in required if not hasattr(owner, name)]
+    if missing:
+        raise RuntimeError(f"Streamlit {version} 沒有壓力測試需要的內部屬性：{', '.join(missing)}")
+
+    shared = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: shared
+    app_test.Runtime = _keep_assigned(Runtime, "_instance")
+    app_test.PagesManager = _keep_assigned(PagesManager, "uses_pages_directory")
+    config.set_option("global.appTest", True, "class_load")
+    app_test.patch_config_options = lambda options: contextlib.nullcontext()
+
+
+# 逐一開啟每位學生的頁面（第一次執行腳本）
+def open_sessions(student_ids, allow_untested=False):
+    from streamlit.testing.v1 import AppTest
+
+    _make_apptest_concurrent(allow_untested)
+    sessions = {}
+    for student_id in student_ids:
+        app = AppTest.from_file(SCRIPT_PATH, default_timeout=TIMEOUT)
+        app.run()
+        sessions[student_id] = app
+    return sessions
+
+
+# 一位學生：輸入學號 → 依序按下所有抽卡按鈕
+def student_session(student_id, app, start_barrier, timings, errors):
+    try:
+        start_barrier.wait()
+        app, elapsed = _timed_run(app.text_input(key="student_id_input").input(student_id))
+        timings["login"].append(elapsed)
+        for key in DRAW_BUTTONS:
+            buttons = [b for b in app.button if b.key == key]
+            if not buttons:
+                shown = [e.value for e in list(app.error) + list(app.warning)]
+                errors.append(f"{student_id}: 找不到按鈕 {key} {shown}")
+                continue
+            app, elapsed = _timed_run(buttons[0].click())
+            timings["draw"].append(elapsed)
+        if app.exception:
+            errors.append(f"{student_id}: {app.exception[0].message}")
+    except Exception as e:
+        errors.append(f"{student_id}: {e!r}")
+        start_barrier.abort()
+
+
+def _seed_progress(spreadsheet, student_ids):
+    from cardpack.gsheets import PROGRESS_SHEET
+
+    rows = [[sid, f"學生{i + 1}", "是", "", "是", ""] for i, sid in enumerate(student_ids)]
+    spreadsheet.worksheet(PROGRESS_SHEET).append_rows(rows)
+
+
+def _wait_for_replication(ledger, timeout):
+    started = time.perf_counter()
+    while ledger.outbox_depth() and time.perf_counter() - started < timeout:
+        time.sleep(0.2)
+    return time.perf_counter() - started, ledger.outbox_depth()
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="class-load-")
+    os.environ["CARDPACK_SHEETS_BACKEND"] = "fake"
+    os.environ["CARDPACK_DB_PATH"] = os.path.join(workdir, "draw_card.db")
+    if args.latency_ms:
+        os.environ["CARDPACK_FAKE_LATENCY_MS"] = args.latency_ms
+    # 替身的配額與程式內的配額排程（cardpack/quota.py）設成一樣，就像正式環境的 Google 配額
+    if args.reads_per_minute:
+        os.environ["CARDPACK_FAKE_READS_PER_MINUTE"] = str(args.reads_per_minute)
+        os.environ["CARDPACK_SHEETS_READS_PER_MINUTE"] = str(args.reads_per_minute)
+    if args.writes_per_minute:
+        os.environ["CARDPACK_FAKE_WRITES_PER_MINUTE"] = str(args.writes_per_minute)
+        os.environ["CARDPACK_SHEETS_WRITES_PER_MINUTE"] = str(args.writes_per_minute)
+    if args.error_rate:
+        os.environ["CARDPACK_FAKE_ERROR_RATE"] = str(args.error_rate)
+
+    # 腳本以相對路徑讀背景、音效並寫入 抽卡紀錄/，在暫存資料夾內執行
+    for name in SHARED_FILES:
+        if os.path.exists(os.path.join(ROOT_DIR, name)):
+            os.symlink(os.path.join(ROOT_DIR, name), os.path.join(workdir, name))
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from cardpack.fake_sheets import shared_fake_spreadsheet
+        from cardpack.ledger import get_ledger
+        from cardpack.quota import scheduler
+
+        spreadsheet = shared_fake_spreadsheet()
+        student_ids = [f"LOAD{i + 1:03d}" for i in range(args.students)]
+        _seed_progress(spreadsheet, student_ids)
+        sessions = open_sessions(student_ids, args.allow_untested_streamlit)
+        before = spreadsheet.stats()
+
+        timings = {"login": [], "draw": []}
+        errors = []
+        barrier = threading.Barrier(args.students)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.students) as pool:
+            for sid, app in sessions.items():
+                pool.submit(student_session, sid, app, barrier, timings, errors)
+        wall = time.perf_counter() - started
+
+        drain_s, remaining = _wait_for_replication(get_ledger(), args.drain_timeout)
+        after = spreadsheet.stats()
+        return {
+            "students": args.students,
+            "latency_ms": args.latency_ms,
+            "wall_s": wall,
+            "login": percentiles(timings["login"]),
+            "draw": percentiles(timings["draw"]),
+            "replication_drain_s": drain_s,
+            "outbox_remaining": remaining,
+            "sheet_calls": {k: after[k] - before.get(k, 0) for k in after},
+            "scheduler": scheduler.headroom()["stats"],
+            "errors": errors,
+        }
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_report(report):
+    print(f"👩‍🏫 {report['students']} 位學生同時操作（替身延遲 {report['latency_ms'] or 0} ms），總耗時 {report['wall_s']:.1f} 秒")
+    for step in ["login", "draw"]:
+        stats = report[step]
+        if stats:
+            print(f"  {step:<6} n={stats['n']:<4} p50 {stats['p50_ms']:8.1f} ms   p90 {stats['p90_ms']:8.1f} ms   "
+                  f"p99 {stats['p99_ms']:8.1f} ms   max {stats['max_ms']:8.1f} ms")
+    print(f"  背景同步送完：{report['replication_drain_s']:.1f} 秒（剩餘 {report['outbox_remaining']} 筆）")
+    print(f"  試算表呼叫：{report['sheet_calls']}")
+    print(f"  配額排程：{report['scheduler']}")
+    for error in report["errors"][:10]:
+        print(f"  ⚠️ {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="模擬全班同時抽卡的壓力測試")
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--latency-ms", default="80,250", help="替身每次呼叫的延遲，例如 80 或 80,250")
+    parser.add_argument("--reads-per-minute", type=int, help="替身每分鐘讀取配額")
+    parser.add_argument("--writes-per-minute", type=int, help="替身每分鐘寫入配額")
+    parser.add_argument("--error-rate", type=float, help="替身隨機回傳 429 的機率")
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="等待背景同步送完的秒數上限")
+    parser.add_argument("--output", help="另存結果 JSON")
+    parser.add_argument("--allow-untested-streamlit", action="store_true",
+                        help=f"在 Streamlit {TESTED_STREAMLIT}.x 以外的版本仍然執行")
+    args = parser.parse_args(argv)
+
+    from streamlit import logger
+
+    logger.set_log_level("error")
+    report = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    # 有學生出錯（包括 Streamlit 內部改變造成工作階段互相干擾）時讓呼叫端知道
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+# ⏱️ 抽卡、存檔、畫面產生等熱點的基準測試（不需要網路或 Google Sheet）
+#
+# 執行全部：          python benchmarks/run_benchmarks.py
+# 只跑部分項目：      python benchmarks/run_benchmarks.py --only draw. --only ledger.
+# 比較兩次結果：      python benchmarks/run_benchmarks.py --compare benchmarks/results/舊.json benchmarks/results/新.json
+#
+# 結果存成 benchmarks/results/<commit>.json（每一項：每次呼叫的中位數/最小值秒數，以及額外數據如 HTML 大小），
+# 同一台機器上不同 commit 的結果可以直接比較。學生與抽卡紀錄都是固定亂數種子產生的假資料。
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from cardpack.sampler import PACK_SIZE, DrawSession  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+POOL = "基礎包"
+STUDENT_COUNTS = [50, 500, 5000]
+DRAWS_PER_STUDENT = 30
+SEED = 20240501
+
+
+# 重複執行 fn，回傳每次呼叫的秒數統計
+def measure(fn, repeat=5, number=1):
+    fn()  # 暖身（讀檔、產生縮圖等一次性成本不計入）
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def _pool_cards():
+    from cardpack.catalog import get_catalog
+
+    pool_df = get_catalog().pool_cards(POOL)
+    return list(zip(pool_df["名稱"], pool_df["稀有度"]))
+
+
+# 已抽過幾張的假資料：每張非傳說卡隨機已抽 0 或 1 張
+def _drawn_counts(cards, rng):
+    return {card: rng.randrange(2) for card in cards if card[1] != "傳說"}
+
+
+# 🎴 建卡池 + 單抽（對應 start_draw_session + draw_single）
+def bench_draw_single(results):
+    cards = _pool_cards()
+    drawn_counts = _drawn_counts(cards, random.Random(SEED))
+    results["draw.single"] = measure(lambda: DrawSession(cards, drawn_counts).draw(1), number=2000)
+
+
+# 🎴 一次工作階段連抽 N 包（對應 simulate_draws）
+def bench_simulate_draws(results):
+    cards = _pool_cards()
+    for n_packs in [1, 10, 30]:
+        results[f"draw.simulate_packs.{n_packs}"] = measure(
+            lambda: DrawSession(cards).packs(n_packs), number=200
+        )
+        results[f"draw.simulate_packs.{n_packs}"]["cards"] = sum(len(p) for p in DrawSession(cards).packs(n_packs))
+
+
+# 📚 卡牌資料：解析 Excel（無快取）、讀 pickle 快取、程序內共用
+def bench_catalog(results):
+    from cardpack.catalog import build_catalog, get_catalog
+
+    cache_dir = tempfile.mkdtemp(prefix="catalog-bench-")
+    try:
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            build_catalog(cache_dir=cache_dir)
+
+        results["catalog.parse_excel"] = measure(cold, repeat=3)
+        results["catalog.load_pickle"] = measure(lambda: build_catalog(cache_dir=cache_dir), repeat=5, number=5)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    results["catalog.get_catalog"] = measure(get_catalog, number=1000)
+
+
+# 🖼️ 翻牌元件 HTML：產生時間與送到瀏覽器的大小
+def bench_reveal_html(results):
+    from cardpack.render import build_card_reveal_html
+    from cardpack.static_assets import static_serving_enabled
+
+    cards = _pool_cards()
+    rng = random.Random(SEED)
+    for n_cards in [1, PACK_SIZE, 5 * PACK_SIZE]:
+        picked = [rng.choice(cards) for _ in range(n_cards)]
+        card_df = {"卡名": [name for name, _ in picked], "稀有度": [rarity for _, rarity in picked]}
+        html = build_card_reveal_html(card_df)
+        if html is None:
+            results[f"render.reveal_html.{n_cards}"] = {"skipped": "缺少 card_back 圖片"}
+            continue
+        entry = measure(lambda: build_card_reveal_html(card_df), repeat=5, number=3)
+        entry["payload_bytes"] = len(html.encode("utf-8"))
+        entry["static_serving"] = static_serving_enabled()
+        results[f"render.reveal_html.{n_cards}"] = entry
+
+
+def _synthetic_records(cards, n_draws, rng):
+    return [(*rng.choice(cards), f"2024-05-01 08:{i // 60 % 60:02d}:{i % 60:02d}") for i in range(n_draws)]
+
+
+# 🏆 本機資料庫：匯入假學生、排行榜彙總、單次抽卡寫入
+def bench_ledger(results):
+    from cardpack.ledger import DrawLedger
+
+    cards = _pool_cards()
+    for n_students in STUDENT_COUNTS:
+        rng = random.Random(SEED)
+        folder = tempfile.mkdtemp(prefix="ledger-bench-")
+        try:
+            ledger = DrawLedger(os.path.join(folder, "bench.db"))
+            students = {f"S{i:05d}": _synthetic_records(cards, rng.randint(1, 2 * DRAWS_PER_STUDENT), rng)
+                        for i in range(n_students)}
+
+            started = time.perf_counter()
+            for student_id, records in students.items():
+                ledger.import_student(student_id, records)
+            results[f"ledger.import.{n_students}"] = {
+                "total_s": time.perf_counter() - started,
+                "rows": sum(len(r) for r in students.values()),
+            }
+
+            results[f"ledger.leaderboard.{n_students}"] = measure(ledger.leaderboard, repeat=5, number=5)
+
+            student_ids = list(students)
+            results[f"ledger.record_draws.{n_students}"] = measure(
+                lambda: ledger.record_draws(rng.choice(student_ids), [rng.choice(cards)], "2024-05-02 08:00:00"),
+                number=200,
+            )
+            results[f"ledger.drawn_counts.{n_students}"] = measure(
+                lambda: ledger.drawn_counts(rng.choice(student_ids)), number=500
+            )
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+BENCHMARKS = [
+    ("draw.", bench_draw_single),
+    ("draw.", bench_simulate_draws),
+    ("catalog.", bench_catalog),
+    ("render.", bench_reveal_html),
+    ("ledger.", bench_ledger),
+]
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def run(only=None):
+    results = {}
+    for prefix, bench in BENCHMARKS:
+        if only and not any(prefix.startswith(o) or o.startswith(prefix) for o in only):
+            continue
+        print(f"▶ {bench.__name__}", flush=True)
+        bench(results)
+    if only:
+        results = {k: v for k, v in results.items() if any(k.startswith(o) for o in only)}
+    return {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+
+
+def _format(entry):
+    if "median_s" in entry:
+        return f"{entry['median_s'] * 1000:10.3f} ms"
+    if "total_s" in entry:
+        return f"{entry['total_s'] * 1000:10.1f} ms"
+    return "         -"
+
+
+def print_report(report):
+    for name, entry in report["results"].items():
+        extra = "  ".join(f"{k}={v}" for k, v in entry.items() if k not in ("median_s", "min_s", "total_s", "repeat", "number"))
+        print(f"{name:<32}{_format(entry)}  {extra}")
+
+
+# 兩份結果逐項比較（新/舊 > 1 表示變慢）
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{'項目':<32}{old['commit']:>14}{new['commit']:>14}    新/舊")
+    for name, entry in new["results"].items():
+        before = old["results"].get(name, {})
+        key = "median_s" if "median_s" in entry else "total_s"
+        if key not in entry or key not in before:
+            continue
+        ratio = entry[key] / before[key] if before[key] else float("inf")
+        flag = "  ⚠️" if ratio > 1.2 else ""
+        print(f"{name:<32}{_format(before)}{_format(entry)}  {ratio:6.2f}×{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="抽卡系統基準測試")
+    parser.add_argument("--only", action="append", help="只執行名稱以此開頭的項目（可重複）")
+    parser.add_argument("--output", help="結果 JSON 路徑（預設 benchmarks/results/<commit>.json）")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="比較兩份結果 JSON")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args.only)
+    print_report(report)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 結果已存到 {output}")
+
+
+if __name__ == "__main__":
+    main()
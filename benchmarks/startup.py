@@ -0,0 +1,135 @@
+# 🚀 冷啟動測量：每次開一個全新的 Python 程序，以 bare 模式執行一次頁面腳本（首頁，尚未輸入任何資料）
+#
+#   python benchmarks/startup.py
+#   python benchmarks/startup.py --script "pages/2_優等卡牌圖鑑.py" --repeat 5 --top 15
+#   python benchmarks/startup.py --output /tmp/startup.json
+#
+# 子程序先載入 streamlit（正式伺服器本來就已載入），之後以 -X importtime 記錄腳本額外載入的模組，
+# 列出最耗時的模組、腳本總耗時，並確認首頁沒有連網：沒有 Google Sheet 呼叫（使用本機替身計數），
+# 也沒有載入 gspread / google.oauth2。本機資料庫寫在暫存資料夾。
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SCRIPTS = ["優等學院對戰卡牌 抽卡紀錄器.py", "抽卡模擬器.py"]
+MARKER = "startup-benchmark: script start"
+WATCHED_MODULES = ["pandas", "numpy", "PIL.Image", "gspread", "google.oauth2"]
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+# 子程序：載入 streamlit 後執行腳本一次，結果以 JSON 印到 stdout
+def child(script):
+    sys.path.insert(0, ROOT_DIR)
+    import runpy
+
+    import streamlit
+    from streamlit import logger
+
+    logger.set_log_level("error")
+    print(MARKER, file=sys.stderr, flush=True)
+    started = time.perf_counter()
+    runpy.run_path(os.path.join(ROOT_DIR, script), run_name="__main__")
+    elapsed = time.perf_counter() - started
+    # 腳本結束當下已載入的模組（腳本最後才啟動的背景缺圖檢查會接著載入 pandas，不算在首頁內）
+    modules = {name: name in sys.modules for name in WATCHED_MODULES}
+
+    from cardpack.fake_sheets import shared_fake_spreadsheet
+
+    stats = shared_fake_spreadsheet().stats()
+    print(json.dumps({
+        "script_s": elapsed,
+        "sheet_calls": stats["read"] + stats["write"],
+        "modules": modules,
+    }))
+
+
+# 只取腳本開始後、第一層（由腳本或 cardpack 直接載入）的模組
+def parse_importtime(stderr):
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        m = IMPORT_LINE.match(line)
+        if m and not m.group(3):
+            imports.append((m.group(4), int(m.group(2)) / 1e6))
+    return imports
+
+
+def measure(script, workdir):
+    env = dict(os.environ, CARDPACK_SHEETS_BACKEND="fake", CARDPACK_DB_PATH=os.path.join(workdir, "draw_card.db"))
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", script],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script} 執行失敗：\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_s"] = wall
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def run(scripts, repeat):
+    report = {}
+    with tempfile.TemporaryDirectory(prefix="startup-") as workdir:
+        for script in scripts:
+            runs = [measure(script, workdir) for _ in range(repeat)]
+            # 各模組取多次中的中位數
+            per_module = {}
+            for r in runs:
+                for name, seconds in r["imports"]:
+                    per_module.setdefault(name, []).append(seconds)
+            report[script] = {
+                "script_s": statistics.median(r["script_s"] for r in runs),
+                "process_s": statistics.median(r["process_s"] for r in runs),
+                "import_s": statistics.median(sum(s for _, s in r["imports"]) for r in runs),
+                "sheet_calls": max(r["sheet_calls"] for r in runs),
+                "modules": runs[-1]["modules"],
+                "imports": sorted(((n, statistics.median(s)) for n, s in per_module.items()), key=lambda x: -x[1]),
+            }
+    return report
+
+
+def print_report(report, top):
+    for script, r in report.items():
+        print(f"🚀 {script}")
+        print(f"  腳本執行 {r['script_s'] * 1000:8.1f} ms（其中載入模組 {r['import_s'] * 1000:.1f} ms）   "
+              f"整個程序 {r['process_s'] * 1000:8.1f} ms")
+        print(f"  Google Sheet 呼叫：{r['sheet_calls']} 次")
+        print("  已載入：" + "、".join(f"{name} {'✅' if loaded else '—'}" for name, loaded in r["modules"].items()))
+        for name, seconds in r["imports"][:top]:
+            print(f"    {seconds * 1000:8.1f} ms  {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="測量頁面腳本的冷啟動時間與模組載入")
+    parser.add_argument("--script", action="append", help="要測量的腳本（相對於專案根目錄），可重複指定")
+    parser.add_argument("--repeat", type=int, default=3, help="每個腳本測量幾次（取中位數）")
+    parser.add_argument("--top", type=int, default=10, help="列出最耗時的幾個模組")
+    parser.add_argument("--output", help="另存結果 JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child)
+        return
+
+    report = run(args.script or DEFAULT_SCRIPTS, args.repeat)
+    print_report(report, args.top)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
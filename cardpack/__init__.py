@@ -0,0 +1 @@
+# 優等學院對戰卡牌 抽卡系統共用模組
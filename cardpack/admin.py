@@ -0,0 +1,44 @@
+# 🔒 管理頁面的密碼檢查
+#
+# 密碼放在 st.secrets["admin_password"]（或環境變數 CARDPACK_ADMIN_PASSWORD）；
+# 沒有設定密碼時管理頁面一律不開放。通過後記在 st.session_state.authenticated，同一個工作階段不必重輸。
+import hmac
+import os
+
+ADMIN_PASSWORD_SECRET = "admin_password"
+ADMIN_PASSWORD_ENV = "CARDPACK_ADMIN_PASSWORD"
+
+
+def admin_password():
+    import streamlit as st
+
+    try:
+        password = st.secrets.get(ADMIN_PASSWORD_SECRET)
+    except Exception:
+        password = None  # 沒有 secrets.toml
+    return password or os.environ.get(ADMIN_PASSWORD_ENV) or None
+
+
+def is_admin():
+    import streamlit as st
+
+    return bool(st.session_state.get("authenticated"))
+
+
+# 尚未通過密碼檢查時顯示密碼欄位並停止執行頁面其餘部分
+def require_admin():
+    import streamlit as st
+
+    if is_admin():
+        return
+    expected = admin_password()
+    if expected is None:
+        st.error("🔒 尚未設定管理密碼（st.secrets 的 admin_password），此頁面不開放。")
+        st.stop()
+    entered = st.text_input("🔒 請輸入管理密碼：", type="password")
+    if entered and hmac.compare_digest(entered.encode(), str(expected).encode()):
+        st.session_state.authenticated = True
+        st.rerun()
+    if entered:
+        st.error("❌ 密碼錯誤")
+    st.stop()
@@ -0,0 +1,138 @@
+# 🗂️ 卡名 → 圖檔 索引（取代每張卡逐一試副檔名的 os.path.exists）
+#
+# 每個資料夾只掃描一次（os.scandir），之後以名稱 O(1) 查詢檔案路徑、大小與內容雜湊；
+# 資料夾 mtime 改變（新增、刪除、改名檔案）時自動重新掃描。
+import logging
+import os
+import threading
+import time
+
+from cardpack.images import source_sha1
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARD_IMAGE_DIR = os.path.join(ROOT_DIR, "card_images")
+SOUND_DIR = os.path.join(ROOT_DIR, "sounds")
+IMAGE_EXTS = [".png", ".jpg", ".jpeg", ".webp"]
+SOUND_EXTS = [".mp3", ".ogg", ".wav"]
+CHECK_INTERVAL = 2.0  # 秒；兩次檢查資料夾 mtime 的最短間隔
+
+logger = logging.getLogger(__name__)
+
+
+class AssetInfo:
+    def __init__(self, name, path, size):
+        self.name = name
+        self.path = path
+        self.size = size
+
+    # 內容雜湊在第一次用到時才計算（並依 mtime/大小 記憶）
+    @property
+    def sha1(self):
+        return source_sha1(self.path)
+
+
+class AssetRegistry:
+    def __init__(self, folder, exts):
+        self.folder = folder
+        self.exts = exts
+        self._assets = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        # 同名不同副檔名時，依 exts 順序優先（與舊版逐一嘗試的順序相同）
+        rank = {ext: i for i, ext in enumerate(self.exts)}
+        found = {}
+        for entry in os.scandir(self.folder):
+            stem, ext = os.path.splitext(entry.name)
+            ext = ext.lower()
+            if ext not in rank or not entry.is_file():
+                continue
+            current = found.get(stem)
+            if current is None or rank[ext] < current[0]:
+                found[stem] = (rank[ext], AssetInfo(stem, entry.path, entry.stat().st_size))
+        return {stem: info for stem, (_, info) in found.items()}
+
+    def _refresh_if_changed(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._mtime is not None and now - self._checked_at < CHECK_INTERVAL:
+                return
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.folder).st_mtime_ns
+            except FileNotFoundError:
+                self._assets, self._mtime = {}, None
+                return
+            if mtime != self._mtime:
+                self._assets = self._scan()
+                self._mtime = mtime
+
+    # 名稱（不含副檔名）→ AssetInfo；找不到時回傳 None
+    def resolve(self, name):
+        self._refresh_if_changed()
+        return self._assets.get(name)
+
+    def path(self, name):
+        info = self.resolve(name)
+        return info.path if info else None
+
+    def names(self):
+        self._refresh_if_changed()
+        return set(self._assets)
+
+    # 沒有對應檔案的名稱
+    def missing(self, names):
+        available = self.names()
+        return sorted({name for name in names if name not in available})
+
+
+card_art = AssetRegistry(CARD_IMAGE_DIR, IMAGE_EXTS)
+sounds = AssetRegistry(SOUND_DIR, SOUND_EXTS)
+
+_reported = set()
+_last_missing = None
+_report_lock = threading.Lock()
+
+
+# ⚠️ 回報卡牌資料中沒有圖片的卡片（每個卡牌資料版本只記錄一次 log）
+def report_missing_card_art(catalog):
+    global _last_missing
+    missing = card_art.missing(catalog.main_cards["名稱"])
+    with _report_lock:
+        _last_missing = missing
+        if catalog.version not in _reported:
+            _reported.add(catalog.version)
+            if missing:
+                logger.warning("以下卡片在 card_images/ 找不到圖片：%s", "、".join(missing))
+    return missing
+
+
+# 最近一次檢查出缺少圖片的卡片；還沒檢查過時回傳 None（不會為此載入卡牌資料）
+def known_missing_card_art():
+    with _report_lock:
+        return _last_missing
+
+
+def _check_card_art():
+    from cardpack.catalog import get_catalog
+
+    try:
+        report_missing_card_art(get_catalog())
+    except Exception:
+        logger.exception("檢查卡片圖片失敗")
+
+
+_check_thread = None
+_check_thread_lock = threading.Lock()
+
+
+# 🚀 程序啟動時在背景檢查一次（載入卡牌資料與 pandas 不拖慢首頁顯示）
+def start_card_art_check():
+    global _check_thread
+    with _check_thread_lock:
+        if _check_thread is None:
+            _check_thread = threading.Thread(target=_check_card_art, name="card-art-check", daemon=True)
+            _check_thread.start()
+        return _check_thread
@@ -0,0 +1,86 @@
+# 🔊 音效共用快取
+#
+# 每個音效檔在程序內只讀取、編碼一次（檔案 mtime/大小 改變時才重新讀），所有工作階段共用。
+# 翻牌元件內每個用到的音效只輸出一次 <audio id="..." preload="auto">，瀏覽器載入、解碼一次，
+# 卡片以 data-sfx 屬性參照 id，不再每張卡、每次 hover 都 new Audio(dataURI)。
+import base64
+import mimetypes
+import os
+import threading
+
+from cardpack.assets import sounds
+from cardpack.static_assets import publish, static_serving_enabled
+from cardpack.tracing import span
+
+_clips = {}   # 路徑 → ((mtime, 大小), bytes, data URI)
+_clips_lock = threading.Lock()
+
+
+# sounds/<名稱>.*；沒有檔案時回傳 None（該音效就不播放，例如目前沒有 hover.mp3）
+def sound_path(name):
+    return sounds.path(name)
+
+
+def _load(path):
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _clips_lock:
+        cached = _clips.get(path)
+        if cached and cached[0] == key:
+            return cached
+    with span("audio.load"), open(path, "rb") as f:
+        data = f.read()
+    mime_type = mimetypes.guess_type(path)[0] or "audio/mpeg"
+    entry = (key, data, f"data:{mime_type};base64," + base64.b64encode(data).decode())
+    with _clips_lock:
+        _clips[path] = entry
+    return entry
+
+
+# 音效的 data URI；沒有檔案時回傳空字串
+def clip_data_uri(name):
+    path = sound_path(name)
+    return _load(path)[2] if path else ""
+
+
+def sfx_id(name):
+    return f"sfx-{name}"
+
+
+# 元件內共用的 <audio> 元素（每個音效一個）
+def audio_elements(names):
+    tags = []
+    for name in names:
+        uri = clip_data_uri(name)
+        if uri:
+            tags.append(f'<audio id="{sfx_id(name)}" preload="auto" src="{uri}"></audio>')
+    return "\n".join(tags)
+
+
+BGM_VOLUME = 0.05
+# 背景音樂播放器放在元件自己的 iframe 內，音量也在元件內設定（不碰主頁面的 DOM）
+BGM_PLAYER_HTML = """
+<audio id="bgm" src="{src}" controls loop autoplay preload="auto" style="width: 100%;"></audio>
+<script>
+document.getElementById("bgm").volume = {volume};
+</script>
+"""
+
+
+# 背景音樂的網址：靜態檔案服務開啟時用可快取的靜態網址（整首不隨每次 rerun 重送），否則用 data URI
+def bgm_src(path):
+    if static_serving_enabled():
+        return publish(path)
+    return _load(path)[2]
+
+
+# 🎵 背景音樂播放器；沒有 sounds/bgm.* 時整個區塊（含標題）都不顯示
+def show_bgm_player(title):
+    import streamlit as st
+    import streamlit.components.v1 as components
+
+    path = sound_path("bgm")
+    if path is None:
+        return
+    st.markdown(title)
+    components.html(BGM_PLAYER_HTML.format(src=bgm_src(path), volume=BGM_VOLUME), height=60)
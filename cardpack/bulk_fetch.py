@@ -0,0 +1,115 @@
+# 📦 批次、平行讀取多個學生分頁（重建或核對本機統計用）
+#
+# 每次 values_batch_get 一次讀取多個分頁的範圍，再用有上限的執行緒池同時送出數批，結果合併成一張欄位式表格。
+# 這些讀取以最低優先順序向配額排程取得權杖（見 cardpack/quota.py），不會擠掉學生抽卡的寫入；
+# 遇到配額錯誤（429）時由排程統一暫停並指數退避。
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cardpack.gsheets import STUDENT_SHEET_HEADER, is_student_sheet
+from cardpack.quota import LOW, sheets_priority
+
+BATCH_SIZE = 25      # 每次 batchGet 的分頁數
+MAX_WORKERS = 4      # 同時進行的請求數
+
+
+def _quote(title):
+    return "'" + title.replace("'", "''") + "'"
+
+
+def _batch_get(spreadsheet, titles):
+    ranges = [f"{_quote(title)}!A:D" for title in titles]
+    with sheets_priority(LOW):
+        response = spreadsheet.values_batch_get(ranges)
+    return response.get("valueRanges", [])
+
+
+def student_sheet_titles(spreadsheet):
+    with sheets_priority(LOW):
+        worksheets = spreadsheet.worksheets()
+    return [ws.title for ws in worksheets if is_student_sheet(ws.title)]
+
+
+# 讀取分頁內容，回傳 (欄位式資料 {欄位: [值, ...]}, 讀到的分頁名稱)
+def fetch_student_columns(spreadsheet, titles=None, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    titles = student_sheet_titles(spreadsheet) if titles is None else list(titles)
+    batches = [titles[i:i + batch_size] for i in range(0, len(titles), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(lambda batch: _batch_get(spreadsheet, batch), batches))
+
+    columns = {name: [] for name in STUDENT_SHEET_HEADER}
+    for batch, value_ranges in zip(batches, results):
+        for title, value_range in zip(batch, value_ranges):
+            values = value_range.get("values", [])
+            if not values:
+                continue
+            header = values[0]
+            positions = [header.index(name) if name in header else None for name in STUDENT_SHEET_HEADER[1:]]
+            for row in values[1:]:
+                if not any(row):
+                    continue
+                columns["學號"].append(title)
+                for name, pos in zip(STUDENT_SHEET_HEADER[1:], positions):
+                    columns[name].append(row[pos] if pos is not None and pos < len(row) else "")
+    return columns, titles
+
+
+# 📊 所有學生分頁合併成一張 DataFrame（學號、卡名、稀有度、抽取時間）
+def fetch_student_sheets(spreadsheet, titles=None, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    import pandas as pd
+
+    columns, _ = fetch_student_columns(spreadsheet, titles, batch_size, max_workers)
+    return pd.DataFrame(columns)
+
+
+def _group_records(columns):
+    grouped = {}
+    for sid, name, rarity, draw_time in zip(*(columns[c] for c in STUDENT_SHEET_HEADER)):
+        grouped.setdefault(sid, []).append((name, rarity, draw_time))
+    return grouped
+
+
+# 📥 把所有尚未匯入的學生分頁匯入本機資料庫，回傳匯入人數
+def import_all_student_sheets(spreadsheet, ledger):
+    titles = [t for t in student_sheet_titles(spreadsheet) if not ledger.has_student(t)]
+    if not titles:
+        return 0
+    columns, titles = fetch_student_columns(spreadsheet, titles)
+    grouped = _group_records(columns)
+    imported = 0
+    for title in titles:
+        if ledger.import_student(title, grouped.get(title, [])):
+            imported += 1
+    return imported
+
+
+_bootstrapped = False
+_bootstrap_lock = threading.Lock()
+
+
+# 🚚 本機資料庫還沒有任何學生時（例如剛部署、資料庫檔是新建的）自動匯入所有學生分頁；
+# 每個程序成功一次後就不再檢查，同時開啟頁面的人等第一個人匯入完成，不重複讀取。回傳匯入人數
+def bootstrap_ledger(spreadsheet, ledger):
+    global _bootstrapped
+    if _bootstrapped:
+        return 0
+    with _bootstrap_lock:
+        if _bootstrapped:
+            return 0
+        imported = 0 if ledger.has_students() else import_all_student_sheets(spreadsheet, ledger)
+        _bootstrapped = True
+        return imported
+
+
+# 🔍 核對 Google Sheet 與本機統計的總抽卡數，回傳不一致的學生
+def audit_leaderboard(spreadsheet, ledger):
+    columns, titles = fetch_student_columns(spreadsheet)
+    grouped = _group_records(columns)
+    local = {row["學號"]: row["總抽卡數"] for row in ledger.leaderboard()}
+    mismatches = []
+    for title in titles:
+        remote_total = len(grouped.get(title, []))
+        local_total = local.get(title, 0)
+        if remote_total != local_total:
+            mismatches.append({"學號": title, "Google Sheet": remote_total, "本機": local_total})
+    return mismatches
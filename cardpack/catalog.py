@@ -0,0 +1,83 @@
+# 📚 卡牌資料（優等卡牌 的副本.xlsx）共用快取
+#
+# Excel 只在檔案內容改變時用 openpyxl 解析一次，解析出的卡片表（DataFrame，不是 Catalog 物件）
+# 存成 cardpack/.cache/ 下的 pickle（檔名帶格式版本與檔案內容的 SHA-1），載入後再建立 Catalog，
+# Catalog 的欄位改變不會讀到舊格式的物件；程序內再以檔案 mtime/大小 判斷是否需要重新載入，
+# 所有頁面共用同一份已篩選好的卡片表。回傳的 DataFrame 是共用的，請勿原地修改。
+# pandas 在第一次載入卡牌資料時才匯入（import 這個模組不會拖慢頁面啟動）。
+import os
+import pickle
+import threading
+
+from cardpack.images import file_sha1
+from cardpack.tracing import span
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_PATH = os.path.join(ROOT_DIR, "優等卡牌 的副本.xlsx")
+CATALOG_SHEET = "遊戲卡片"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+MAIN_CARD_TYPES = ["學生卡", "知識卡", "武器卡"]
+CATALOG_FORMAT_VERSION = 2  # 快取內容（解析方式）改變時加一，舊的快取檔就不再使用
+
+
+class Catalog:
+    def __init__(self, cards, version):
+        self.version = version
+        self.cards = cards
+        # 主卡（學生、知識、武器）
+        self.main_cards = cards[cards["類型"].isin(MAIN_CARD_TYPES)].reset_index(drop=True)
+        # 圖鑑預設排序
+        self.gallery_cards = self.main_cards.sort_values(by=["稀有度", "名稱"]).reset_index(drop=True)
+        # 各卡池可抽的主卡
+        self.pools = {}
+        if "卡池分類" in self.main_cards.columns:
+            for pool, pool_df in self.main_cards.groupby("卡池分類", sort=False):
+                self.pools[pool] = pool_df.reset_index(drop=True)
+
+    def pool_cards(self, pool):
+        pool_df = self.pools.get(pool)
+        if pool_df is None:
+            return self.main_cards.iloc[0:0]
+        return pool_df
+
+
+# 依檔案內容讀取（或建立）已解析的卡片表 pickle，再建立 Catalog
+def build_catalog(path=CATALOG_PATH, sheet_name=CATALOG_SHEET, cache_dir=CACHE_DIR):
+    version = file_sha1(path)
+    artifact = os.path.join(cache_dir, f"catalog-v{CATALOG_FORMAT_VERSION}-{sheet_name}-{version}.pkl")
+    cards = None
+    if os.path.exists(artifact):
+        try:
+            with span("catalog.load_pickle"), open(artifact, "rb") as f:
+                cards = pickle.load(f)
+        except Exception:
+            cards = None  # 損壞的快取，重新解析
+
+    if cards is None:
+        import pandas as pd
+
+        with span("catalog.read_excel"):
+            cards = pd.read_excel(path, sheet_name=sheet_name)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{artifact}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cards, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, artifact)
+    return Catalog(cards, version)
+
+
+_catalog = None
+_catalog_stat = None
+_catalog_lock = threading.Lock()
+
+
+# 整個程序共用的卡牌資料；Excel 檔案有變動時自動重新載入
+def get_catalog(path=CATALOG_PATH):
+    global _catalog, _catalog_stat
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _catalog_lock:
+        if _catalog is None or _catalog_stat != key:
+            _catalog = build_catalog(path)
+            _catalog_stat = key
+        return _catalog
@@ -0,0 +1,83 @@
+# 🗂️ 每位學生已抽卡片數量的快取（LRU，寫入時同步更新）
+#
+# 第一次抽卡時讀一次學生的抽卡紀錄，之後每次存檔成功就直接在快取上累加，
+# 抽卡時不必再讀整張歷史工作表。
+# 讀取期間（loader() 執行中）同一位學生若有新的存檔，讀到的可能是存檔前的資料，
+# 這時不放入快取、重新讀取，避免快取少算而超過每張卡的上限。
+import threading
+from collections import OrderedDict
+
+MAX_CACHED_STUDENTS = 256
+
+
+class DrawCountCache:
+    def __init__(self, max_students=MAX_CACHED_STUDENTS):
+        self.max_students = max_students
+        self._counts = OrderedDict()
+        self._loading = {}  # 學號 → [讀取中的數量, 讀取期間的存檔次數]
+        self._lock = threading.Lock()
+
+    # 取得 {(卡名, 稀有度): 張數}；未快取時呼叫 loader() 讀取並存入
+    def get(self, student_id, loader):
+        while True:
+            with self._lock:
+                counts = self._counts.get(student_id)
+                if counts is not None:
+                    self._counts.move_to_end(student_id)
+                    return dict(counts)
+                state = self._loading.setdefault(student_id, [0, 0])
+                state[0] += 1
+                generation = state[1]
+
+            try:
+                loaded = dict(loader())
+            except BaseException:
+                with self._lock:
+                    self._finish_loading(student_id, state)
+                raise
+
+            with self._lock:
+                self._finish_loading(student_id, state)
+                if state[1] == generation:
+                    # 讀取期間若已有其他工作階段放入（並可能已累加），以快取內的為準
+                    counts = self._counts.setdefault(student_id, loaded)
+                    self._counts.move_to_end(student_id)
+                    while len(self._counts) > self.max_students:
+                        self._counts.popitem(last=False)
+                    return dict(counts)
+            # 讀取期間有新的存檔：重新讀取
+
+    # 抽卡紀錄存檔成功後累加；尚未快取的學生下次讀取時自然包含這些紀錄，
+    # 正在讀取中的則讓該次讀取作廢重讀
+    def record(self, student_id, cards):
+        with self._lock:
+            counts = self._counts.get(student_id)
+            if counts is None:
+                self._mark_loading_stale(student_id)
+                return
+            for key in cards:
+                counts[key] = counts.get(key, 0) + 1
+
+    def _finish_loading(self, student_id, state):
+        state[0] -= 1
+        if state[0] == 0:
+            del self._loading[student_id]
+
+    def _mark_loading_stale(self, student_id):
+        state = self._loading.get(student_id)
+        if state is not None:
+            state[1] += 1
+
+    def invalidate(self, student_id=None):
+        with self._lock:
+            if student_id is None:
+                self._counts.clear()
+                for state in self._loading.values():
+                    state[1] += 1
+            else:
+                self._counts.pop(student_id, None)
+                self._mark_loading_stale(student_id)
+
+
+# 整個程序共用（Streamlit 每次 rerun 都會重新執行頁面腳本，但模組只載入一次）
+draw_counts = DrawCountCache()
@@ -0,0 +1,281 @@
+# 🧪 本機記憶體內的 Google Sheet 替身（離線開發與壓力測試用）
+#
+# 實作本程式用到的 gspread 呼叫（worksheets、worksheet、add_worksheet、get_all_values、get_all_records、
+# row_values、append_rows、batch_update、update_cell、clear、values_batch_get），資料只存在記憶體。
+# 可模擬網路延遲、每分鐘讀寫配額（超過時丟出 status_code 429 的錯誤，與 gspread 的 APIError 相同判斷方式）
+# 以及隨機失敗，並統計呼叫次數。
+#
+# 設定環境變數 CARDPACK_SHEETS_BACKEND=fake 後，get_spreadsheet()／open_spreadsheet() 會使用整個程序共用的替身，可再用以下變數調整：
+#   CARDPACK_FAKE_SHEETS               初始資料 JSON 檔（{"分頁名稱": [[第一列...], ...]}）
+#   CARDPACK_FAKE_LATENCY_MS           每次呼叫的延遲，例如 "80" 或 "80,250"（範圍內隨機）
+#   CARDPACK_FAKE_READS_PER_MINUTE     每分鐘讀取配額
+#   CARDPACK_FAKE_WRITES_PER_MINUTE    每分鐘寫入配額
+#   CARDPACK_FAKE_ERROR_RATE           每次呼叫隨機失敗（429）的機率，例如 0.01
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from cardpack.gsheets import PROGRESS_SHEET
+
+PROGRESS_HEADER = ["學號", "姓名", "完成作業", "作業最後抽卡日", "完成進度", "進度最後抽卡日"]
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(f"[{status_code}] {message}")
+        self.response = SimpleNamespace(status_code=status_code)
+
+
+class FakeWorksheetNotFound(Exception):
+    pass
+
+
+def _column_number(letters):
+    number = 0
+    for ch in letters.upper():
+        number = number * 26 + ord(ch) - 64
+    return number
+
+
+# "A1"、"D5"、"A:D"、"B2:C9" → (起始列, 起始欄, 結束列, 結束欄)；未指定的列為 None
+def _parse_range(a1):
+    cells = []
+    for part in a1.split(":"):
+        m = re.fullmatch(r"([A-Za-z]*)(\d*)", part.strip())
+        if m is None:
+            raise ValueError(f"無法解析的範圍：{a1}")
+        letters, digits = m.groups()
+        cells.append((int(digits) if digits else None, _column_number(letters) if letters else None))
+    (r1, c1), (r2, c2) = cells[0], cells[-1]
+    return r1, c1, r2, c2
+
+
+def _split_sheet_range(a1):
+    if "!" not in a1:
+        return None, a1
+    title, cells = a1.rsplit("!", 1)
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    return title, cells
+
+
+# 與 gspread 的 numericise 相同：看起來像數字的字串轉成數字
+def _numericise(value):
+    if isinstance(value, str) and value.strip():
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return value
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, sheet_id, title, rows=None):
+        self.spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+        self._rows = [list(map(str, row)) for row in (rows or [])]
+
+    def _call(self, kind):
+        self.spreadsheet._call(kind)
+
+    def _snapshot(self):
+        with self.spreadsheet._lock:
+            return [list(row) for row in self._rows]
+
+    def get_all_values(self):
+        self._call("read")
+        return self._snapshot()
+
+    def get_all_records(self, expected_headers=None, **kwargs):
+        self._call("read")
+        values = self._snapshot()
+        if not values:
+            return []
+        header = values[0]
+        for name in expected_headers or []:
+            if name not in header:
+                raise FakeAPIError(400, f"找不到標題欄位：{name}")
+        records = []
+        for row in values[1:]:
+            row = row + [""] * (len(header) - len(row))
+            records.append({name: _numericise(value) for name, value in zip(header, row)})
+        return records
+
+    def row_values(self, row):
+        self._call("read")
+        with self.spreadsheet._lock:
+            return list(self._rows[row - 1]) if row <= len(self._rows) else []
+
+    def append_rows(self, rows, **kwargs):
+        self._call("write")
+        with self.spreadsheet._lock:
+            self._rows.extend([["" if v is None else str(v) for v in row] for row in rows])
+
+    def append_row(self, row, **kwargs):
+        self.append_rows([row], **kwargs)
+
+    def _set(self, row, col, value):
+        while len(self._rows) < row:
+            self._rows.append([])
+        cells = self._rows[row - 1]
+        if len(cells) < col:
+            cells.extend([""] * (col - len(cells)))
+        cells[col - 1] = "" if value is None else str(value)
+
+    def update_cell(self, row, col, value):
+        self._call("write")
+        with self.spreadsheet._lock:
+            self._set(row, col, value)
+
+    # data: [{"range": "D5", "values": [[...]]}, ...]
+    def batch_update(self, data, **kwargs):
+        self._call("write")
+        with self.spreadsheet._lock:
+            for item in data:
+                _, cells = _split_sheet_range(item["range"])
+                r1, c1, _, _ = _parse_range(cells)
+                for i, values in enumerate(item["values"]):
+                    for j, value in enumerate(values):
+                        self._set((r1 or 1) + i, (c1 or 1) + j, value)
+
+    def clear(self):
+        self._call("write")
+        with self.spreadsheet._lock:
+            self._rows = []
+
+
+_spreadsheet_ids = itertools.count(1)
+
+
+class FakeSpreadsheet:
+    def __init__(self, sheets=None, latency=(0.0, 0.0), reads_per_minute=None, writes_per_minute=None,
+                 error_rate=0.0, seed=None, title="fake"):
+        self.id = f"fake-{next(_spreadsheet_ids)}"  # 不用 id(self)：物件回收後會被重複使用，工作表索引會對到舊的替身
+        self.title = title
+        self.latency = latency
+        self.quotas = {"read": reads_per_minute, "write": writes_per_minute}
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._windows = {"read": deque(), "write": deque()}
+        self._stats = {"read": 0, "write": 0, "quota_errors": 0, "random_errors": 0}
+        self._worksheets = []
+        for title, rows in (sheets or {}).items():
+            self._new_worksheet(title, rows)
+
+    def _new_worksheet(self, title, rows=None):
+        worksheet = FakeWorksheet(self, len(self._worksheets) + 1, title, rows)
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    # 每次 API 呼叫：延遲、配額、隨機失敗、統計
+    def _call(self, kind):
+        lo, hi = self.latency
+        with self._lock:
+            delay = self._rng.uniform(lo, hi) if hi > lo else lo
+            fail = self.error_rate and self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        now = time.monotonic()
+        with self._lock:
+            self._stats[kind] += 1
+            if fail:
+                self._stats["random_errors"] += 1
+                raise FakeAPIError(429, "隨機注入的配額錯誤")
+            limit = self.quotas[kind]
+            if limit is not None:
+                window = self._windows[kind]
+                while window and now - window[0] >= 60:
+                    window.popleft()
+                if len(window) >= limit:
+                    self._stats["quota_errors"] += 1
+                    raise FakeAPIError(429, f"超過每分鐘{'讀取' if kind == 'read' else '寫入'}配額（{limit}）")
+                window.append(now)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def worksheets(self):
+        self._call("read")
+        with self._lock:
+            return list(self._worksheets)
+
+    def worksheet(self, title):
+        self._call("read")
+        with self._lock:
+            for worksheet in self._worksheets:
+                if worksheet.title == title:
+                    return worksheet
+        raise FakeWorksheetNotFound(title)
+
+    def add_worksheet(self, title, rows=1000, cols=26, **kwargs):
+        self._call("write")
+        with self._lock:
+            if any(ws.title == title for ws in self._worksheets):
+                raise FakeAPIError(400, f"分頁「{title}」已存在")
+            return self._new_worksheet(title)
+
+    # 與 Spreadsheet.values_batch_get 相同的回傳格式（只支援整欄或矩形範圍）
+    def values_batch_get(self, ranges, params=None):
+        self._call("read")
+        value_ranges = []
+        with self._lock:
+            by_title = {ws.title: ws for ws in self._worksheets}
+            for a1 in ranges:
+                title, cells = _split_sheet_range(a1)
+                worksheet = by_title.get(title)
+                if worksheet is None:
+                    raise FakeAPIError(400, f"Unable to parse range: {a1}")
+                r1, c1, r2, c2 = _parse_range(cells)
+                rows = worksheet._rows[(r1 or 1) - 1:r2]
+                values = [row[(c1 or 1) - 1:c2] for row in rows]
+                while values and not any(values[-1]):
+                    values.pop()
+                value_ranges.append({"range": a1, "majorDimension": "ROWS", "values": [list(v) for v in values]})
+        return {"spreadsheetId": self.id, "valueRanges": value_ranges}
+
+
+def _latency_from_env(text):
+    if not text:
+        return (0.0, 0.0)
+    parts = [float(p) / 1000 for p in text.split(",")]
+    return (parts[0], parts[-1])
+
+
+def _optional_int(text):
+    return int(text) if text else None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+# 整個程序共用的替身（依環境變數設定）；第一次建立時載入初始資料
+def shared_fake_spreadsheet():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            sheets = {PROGRESS_SHEET: [PROGRESS_HEADER]}
+            seed_path = os.environ.get("CARDPACK_FAKE_SHEETS")
+            if seed_path:
+                with open(seed_path, encoding="utf-8") as f:
+                    sheets.update(json.load(f))
+            _shared = FakeSpreadsheet(
+                sheets,
+                latency=_latency_from_env(os.environ.get("CARDPACK_FAKE_LATENCY_MS")),
+                reads_per_minute=_optional_int(os.environ.get("CARDPACK_FAKE_READS_PER_MINUTE")),
+                writes_per_minute=_optional_int(os.environ.get("CARDPACK_FAKE_WRITES_PER_MINUTE")),
+                error_rate=float(os.environ.get("CARDPACK_FAKE_ERROR_RATE") or 0),
+            )
+        return _shared
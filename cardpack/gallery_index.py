@@ -0,0 +1,164 @@
+# 🗂️ 卡牌圖鑑查詢索引（每個卡牌資料版本建立一次，所有工作階段共用）
+#
+# 卡片以圖鑑預設順序（稀有度、名稱）編號 0..n-1，每個屬性值對應一個 bitset（Python int 的位元）：
+#   稀有度、卡池、類型、科目 → 值的 bitset；KN 範圍 → 依 KN 排序後的前綴 bitset 相減；
+#   卡名關鍵字 → 逐一比對小寫卡名（結果依關鍵字快取）。
+# 篩選只是 bitset 的 AND / OR，排序使用預先算好的順序（KN、科目各自升冪／降冪的組合），
+# 最後只取出目前這一頁的卡片，不再每次互動都對整張 DataFrame 做遮罩與排序。
+import bisect
+import math
+import threading
+from collections import OrderedDict
+
+NAME_CACHE_SIZE = 256
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _bits(ids):
+    mask = 0
+    for i in ids:
+        mask |= 1 << i
+    return mask
+
+
+def _popcount(mask):
+    return bin(mask).count("1")
+
+
+class GalleryIndex:
+    def __init__(self, cards):
+        self.records = cards.to_dict("records")
+        n = len(self.records)
+        self.all = (1 << n) - 1
+
+        self.postings = {}   # 欄位 → {值: bitset}
+        for column in ["稀有度", "卡池分類", "類型", "科目"]:
+            postings = {}
+            if column in cards.columns:
+                for i, value in enumerate(cards[column].tolist()):
+                    if not _is_missing(value):
+                        postings[value] = postings.get(value, 0) | (1 << i)
+            self.postings[column] = postings
+
+        # KN：依 KN 由小到大的卡片順序，prefix[k] 為前 k 張的 bitset（KN 空白的卡片不會出現在任何範圍內）
+        kn = [(value, i) for i, value in enumerate(cards["KN"].tolist()) if not _is_missing(value)]
+        kn.sort()
+        self._kn_values = [value for value, _ in kn]
+        self._kn_prefix = [0]
+        for _, i in kn:
+            self._kn_prefix.append(self._kn_prefix[-1] | (1 << i))
+        self._kn = [math.inf if _is_missing(r["KN"]) else r["KN"] for r in self.records]
+
+        self._names = ["" if _is_missing(r["名稱"]) else str(r["名稱"]).lower() for r in self.records]
+        self._name_cache = OrderedDict()
+        self._orderings = {}
+        self._lock = threading.Lock()
+
+    # 各篩選欄位可選的值（已排序）
+    def options(self, column):
+        return sorted(v for v in self.postings[column] if isinstance(v, str))
+
+    # 任一個值（OR）
+    def any_of(self, column, values):
+        postings = self.postings[column]
+        mask = 0
+        for value in values:
+            mask |= postings.get(value, 0)
+        return mask
+
+    def kn_between(self, low, high):
+        start = bisect.bisect_left(self._kn_values, low)
+        stop = bisect.bisect_right(self._kn_values, high)
+        if stop <= start:
+            return 0
+        return self._kn_prefix[stop] & ~self._kn_prefix[start]
+
+    # 卡名包含關鍵字（不分大小寫，字面比對）
+    def name_contains(self, query):
+        query = query.lower()
+        with self._lock:
+            mask = self._name_cache.get(query)
+            if mask is not None:
+                self._name_cache.move_to_end(query)
+                return mask
+        mask = _bits(i for i, name in enumerate(self._names) if query in name)
+        with self._lock:
+            self._name_cache[query] = mask
+            while len(self._name_cache) > NAME_CACHE_SIZE:
+                self._name_cache.popitem(last=False)
+        return mask
+
+    # 卡片顯示順序：kn_order / subject_order 為 None、"asc" 或 "desc"；
+    # 兩者都指定時以科目為主、KN 為次，其餘維持圖鑑預設順序
+    def ordering(self, kn_order=None, subject_order=None):
+        key = (kn_order, subject_order)
+        with self._lock:
+            order = self._orderings.get(key)
+        if order is not None:
+            return order
+        order = list(range(len(self.records)))
+        if kn_order:
+            order.sort(key=lambda i: self._kn[i], reverse=kn_order == "desc")
+        if subject_order:
+            subjects = [str(r["科目"]) for r in self.records]
+            order.sort(key=lambda i: subjects[i], reverse=subject_order == "desc")
+        with self._lock:
+            self._orderings[key] = order
+        return order
+
+    def query(self, name_query="", rarity=None, pool=None, types=None, kn_range=None, subjects=None,
+              kn_order=None, subject_order=None):
+        mask = self.all
+        if name_query:
+            mask &= self.name_contains(name_query)
+        if rarity is not None:
+            mask &= self.postings["稀有度"].get(rarity, 0)
+        if pool is not None:
+            mask &= self.postings["卡池分類"].get(pool, 0)
+        if types is not None:
+            mask &= self.any_of("類型", types)
+        if kn_range is not None:
+            mask &= self.kn_between(*kn_range)
+        if subjects is not None:
+            mask &= self.any_of("科目", subjects)
+        return GalleryResult(self, mask, self.ordering(kn_order, subject_order))
+
+
+class GalleryResult:
+    def __init__(self, index, mask, order):
+        self.index = index
+        self.mask = mask
+        self.order = order
+        self.total = _popcount(mask)
+
+    def __len__(self):
+        return self.total
+
+    # 依顯示順序取出第 start ~ stop-1 張符合條件的卡片資料
+    def page(self, start, stop):
+        rows = []
+        seen = 0
+        for i in self.order:
+            if self.mask >> i & 1:
+                if seen >= start:
+                    rows.append(self.index.records[i])
+                    if len(rows) >= stop - start:
+                        break
+                seen += 1
+        return rows
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+# 目前卡牌資料版本的索引；卡牌資料更新時重建
+def gallery_index(catalog):
+    global _index
+    with _index_lock:
+        if _index is None or _index[0] != catalog.version:
+            _index = (catalog.version, GalleryIndex(catalog.gallery_cards))
+        return _index[1]
@@ -0,0 +1,266 @@
+# 📄 Google Sheet 共用工具
+import os
+import threading
+
+from cardpack.quota import call_kind, scheduler
+from cardpack.tracing import SHEETS_PREFIX, span
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/1-uKCq-8w_c3EUItPKV9NnEVkRAQiC5I5vW2BZr8NFfg/edit"
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+BACKEND_ENV = "CARDPACK_SHEETS_BACKEND"  # "gspread"（預設）或 "fake"（本機替身，見 cardpack/fake_sheets.py）
+STUDENT_SHEET_HEADER = ["學號", "卡名", "稀有度", "抽取時間"]
+
+
+# 🔌 試算表／工作表代理：每個 API 方法呼叫都先向配額排程取得權杖（見 cardpack/quota.py），
+# 並記成 sheets.<方法名稱> 的耗時（見 cardpack/tracing.py）；回傳的工作表也一併包裝
+class _SheetProxy:
+    _WORKSHEET_METHODS = ("worksheets", "worksheet", "add_worksheet")
+
+    def __init__(self, target):
+        object.__setattr__(self, "_target", target)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value) or name.startswith("_"):
+            return value
+
+        def call(*args, **kwargs):
+            with span(SHEETS_PREFIX + name):
+                result = scheduler.call(call_kind(name), lambda: value(*args, **kwargs))
+            if name in self._WORKSHEET_METHODS:
+                if isinstance(result, list):
+                    return [SheetWorksheet(ws) for ws in result]
+                return SheetWorksheet(result)
+            return result
+
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __eq__(self, other):
+        other = getattr(other, "_target", other)
+        return self._target == other
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __repr__(self):
+        return f"<scheduled {self._target!r}>"
+
+
+class SheetSpreadsheet(_SheetProxy):
+    pass
+
+
+class SheetWorksheet(_SheetProxy):
+    pass
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+# 🔑 以 st.secrets["gspread_json"] 授權的 gspread 用戶端，整個程序只建立一次
+# （同一個 HTTP 連線池，不必每次 rerun 重新取得存取權杖）
+def authorized_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            import gspread
+            import streamlit as st
+            from google.oauth2.service_account import Credentials
+
+            with span("sheets.authorize"):
+                creds = Credentials.from_service_account_info(st.secrets["gspread_json"], scopes=SCOPE)
+                _client = gspread.authorize(creds)
+        return _client
+
+
+# 預設連到 Google Sheet；CARDPACK_SHEETS_BACKEND=fake 時改用記憶體內的替身，不需要網路與憑證
+def _open_target(url):
+    if os.environ.get(BACKEND_ENV, "gspread") == "fake":
+        from cardpack.fake_sheets import shared_fake_spreadsheet
+        return shared_fake_spreadsheet()
+
+    client = authorized_client()
+    with span("sheets.open_by_url"):
+        return scheduler.call("read", lambda: client.open_by_url(url))
+
+
+# 立即開啟試算表（每次呼叫都重新讀取試算表資訊）
+def open_spreadsheet(url=SHEET_URL):
+    return SheetSpreadsheet(_open_target(url))
+
+
+# 💤 延遲開啟的共用試算表：第一次真的用到時才開啟，之後整個程序共用；
+# worksheet(名稱) 經由工作表索引取得，同一個分頁不會重複查詢
+class SharedSpreadsheet(SheetSpreadsheet):
+    def __init__(self, url):
+        object.__setattr__(self, "_url", url)
+        object.__setattr__(self, "_opened", None)
+        object.__setattr__(self, "_open_lock", threading.Lock())
+
+    @property
+    def _target(self):
+        if self._opened is None:
+            with self._open_lock:
+                if self._opened is None:
+                    # 開啟失敗（例如網路或配額）時不記住，下次再試
+                    object.__setattr__(self, "_opened", _open_target(self._url))
+        return self._opened
+
+    def worksheet(self, title):
+        worksheet = worksheet_index(self).get(title)
+        if worksheet is None:
+            # 讓後端丟出原本的「找不到工作表」錯誤
+            return self.__getattr__("worksheet")(title)
+        return worksheet
+
+    def __repr__(self):
+        state = "opened" if self._opened is not None else "not opened"
+        return f"<shared spreadsheet {self._url} ({state})>"
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+# 所有頁面、所有工作階段共用的試算表（不會在 import 或 rerun 時連網）
+def get_spreadsheet(url=SHEET_URL):
+    with _shared_lock:
+        spreadsheet = _shared.get(url)
+        if spreadsheet is None:
+            spreadsheet = _shared[url] = SharedSpreadsheet(url)
+        return spreadsheet
+
+
+# 🗂️ 工作表名稱 → 工作表物件 的索引
+# 只有找不到工作表時才重新呼叫 worksheets() 列出所有分頁。
+class WorksheetIndex:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self._worksheets = {}
+        self._headerless = set()  # 新建立後第一次寫入失敗、可能還沒有標題列的分頁
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        worksheets = {ws.title: ws for ws in self.spreadsheet.worksheets()}
+        with self._lock:
+            self._worksheets = worksheets
+
+    def get(self, title):
+        with self._lock:
+            worksheet = self._worksheets.get(title)
+        if worksheet is None:
+            self.refresh()
+            with self._lock:
+                worksheet = self._worksheets.get(title)
+        return worksheet
+
+    # 找不到就建立分頁；回傳 (工作表, 是否為新建立)
+    def get_or_create(self, title, rows=1000, cols=10):
+        worksheet = self.get(title)
+        if worksheet is not None:
+            return worksheet, False
+        worksheet = self.spreadsheet.add_worksheet(title=title, rows=rows, cols=cols)
+        with self._lock:
+            self._worksheets[title] = worksheet
+        return worksheet, True
+
+    def forget(self, title):
+        with self._lock:
+            self._worksheets.pop(title, None)
+
+    def mark_headerless(self, title, headerless=True):
+        with self._lock:
+            if headerless:
+                self._headerless.add(title)
+            else:
+                self._headerless.discard(title)
+
+    def maybe_headerless(self, title):
+        with self._lock:
+            return title in self._headerless
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+# 每份試算表共用一個索引（以試算表 id 區分）
+def worksheet_index(spreadsheet):
+    with _indexes_lock:
+        index = _indexes.get(spreadsheet.id)
+        if index is None:
+            index = _indexes[spreadsheet.id] = WorksheetIndex(spreadsheet)
+        return index
+
+
+# ✍️ 一次附加多列到分頁；新分頁連同標題列一起寫入
+# 建立分頁後第一次寫入失敗時，重試會先確認第 1 列是否還是空的，是的話補上標題列
+def append_rows(spreadsheet, title, header, rows):
+    index = worksheet_index(spreadsheet)
+    worksheet, created = index.get_or_create(title)
+    if created or (index.maybe_headerless(title) and not worksheet.row_values(1)):
+        rows = [header] + list(rows)
+    try:
+        worksheet.append_rows(rows)
+    except Exception:
+        if created:
+            index.mark_headerless(title)
+        # 分頁可能已被刪除或改名，下次重新查詢
+        index.forget(title)
+        raise
+    index.mark_headerless(title, False)
+    return worksheet
+
+
+# 🔁 依第一欄（例如日期）更新或附加：已有同一個鍵的列整列覆寫，其餘附加在最後；空分頁連同標題列一起寫入
+# 先讀一次整張分頁找出既有的鍵，覆寫的列一次 batch_update
+def upsert_rows(spreadsheet, title, header, rows):
+    index = worksheet_index(spreadsheet)
+    worksheet, _ = index.get_or_create(title)
+    try:
+        values = worksheet.get_all_values()
+        positions = {row[0]: n for n, row in enumerate(values[1:], start=2) if row}
+        updates = [{"range": f"A{positions[row[0]]}", "values": [list(row)]} for row in rows if row[0] in positions]
+        appends = [list(row) for row in rows if row[0] not in positions]
+        if not values:
+            appends = [header] + appends
+        if updates:
+            worksheet.batch_update(updates)
+        if appends:
+            worksheet.append_rows(appends)
+    except Exception:
+        # 分頁可能已被刪除或改名，下次重新查詢
+        index.forget(title)
+        raise
+    return worksheet
+
+
+def append_student_rows(spreadsheet, student_id, rows):
+    return append_rows(spreadsheet, student_id, STUDENT_SHEET_HEADER, rows)
+
+
+# 不是學生抽卡紀錄的分頁
+SYSTEM_SHEETS = ["進度表", "排行榜記錄", "排行榜快照"]
+
+
+def is_student_sheet(title):
+    return title not in SYSTEM_SHEETS and not title.lower().startswith("test")
+
+
+def _as_records(rows):
+    return [(r.get("卡名"), r.get("稀有度"), str(r.get("抽取時間", ""))) for r in rows]
+
+
+# 📥 讀取學生分頁的抽卡紀錄 [(卡名, 稀有度, 抽取時間), ...]；沒有分頁時回傳 None
+def student_sheet_records(spreadsheet, student_id):
+    worksheet = worksheet_index(spreadsheet).get(student_id)
+    if worksheet is None:
+        return None
+    return _as_records(worksheet.get_all_records())
+
+
+PROGRESS_SHEET = "進度表"
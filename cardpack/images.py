@@ -0,0 +1,195 @@
+# 🖼️ 卡牌圖片縮圖（依畫面實際顯示尺寸預先產生）
+#
+# card_images/ 的原圖每張約 1 MB，但翻牌區只顯示 200×290 / 260×370，圖鑑寬度 ≤ 320；
+# 頁面背景 background.png 也以同樣方式壓縮成螢幕寬度的版本。
+# 這裡依顯示尺寸（×2 供高解析度螢幕）產生 WebP 縮圖（Pillow 不支援 WebP 時改用 JPEG），
+# 以原圖內容的 SHA-1 命名存在 cardpack/.cache/images/，原圖沒變就不會重做。
+#
+# 重新產生有變動的卡片圖：python -m cardpack.images [--force] [--workers N]
+import hashlib
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from cardpack.tracing import span
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIRS = [os.path.join(ROOT_DIR, "card_images")]
+DERIVED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "images")
+MANIFEST_PATH = os.path.join(DERIVED_DIR, "manifest.json")
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+DERIVED_EXTS = (".webp", ".jpg")  # 縮圖可能的副檔名（WebP 優先）
+
+# 顯示尺寸（CSS 像素）；高度 None 表示只限制寬度
+DISPLAY_SIZES = {
+    "pack": (200, 290),      # 一次多張的翻牌區
+    "single": (260, 370),    # 單抽翻牌
+    "gallery": (320, None),  # 圖鑑、英雄卡
+    "background": (960, None),  # 全頁背景（×2 後最寬 1920，見 cardpack/theme.py）
+}
+CARD_SIZES = ["pack", "single", "gallery"]
+PIXEL_RATIO = 2
+QUALITY = 82
+
+_manifest_lock = threading.Lock()
+_generate_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _output_format():
+    from PIL import features
+    return ("WEBP", ".webp") if features.check("webp") else ("JPEG", ".jpg")
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _derived_path(sha1, size_name, ext):
+    return os.path.join(DERIVED_DIR, size_name, f"{sha1[:20]}{ext}")
+
+
+# 產生單張原圖的所有尺寸縮圖（在子程序中執行）
+def _render(src_path, sha1, size_names, force=False):
+    from PIL import Image
+
+    fmt, ext = _output_format()
+    written = []
+    with Image.open(src_path) as original:
+        original.load()
+        for size_name in size_names:
+            out_path = _derived_path(sha1, size_name, ext)
+            if os.path.exists(out_path) and not force:
+                continue
+            width, height = DISPLAY_SIZES[size_name]
+            box = (width * PIXEL_RATIO, (height or 100000) * PIXEL_RATIO)
+            img = original.copy()
+            img.thumbnail(box, Image.LANCZOS)
+            if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            tmp_path = f"{out_path}.{os.getpid()}.tmp"
+            options = {"quality": QUALITY, "method": 6} if fmt == "WEBP" else {"quality": QUALITY, "optimize": True}
+            img.save(tmp_path, fmt, **options)
+            os.replace(tmp_path, out_path)
+            written.append(out_path)
+    return written
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest):
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    tmp_path = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+# 原圖的 SHA-1；檔案 mtime/大小 與上次相同時不重新計算
+_known_sha1 = {}
+
+
+def source_sha1(src_path, manifest=None):
+    stat = os.stat(src_path)
+    key = os.path.relpath(src_path, ROOT_DIR)
+    known = _known_sha1.get(key)
+    if known is None and manifest:
+        entry = manifest.get(key)
+        known = entry and (entry["mtime"], entry["size"], entry["sha1"])
+    if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+        sha1 = known[2]
+    else:
+        sha1 = file_sha1(src_path)
+    _known_sha1[key] = (stat.st_mtime_ns, stat.st_size, sha1)
+    return sha1
+
+
+def list_sources(source_dirs=SOURCE_DIRS):
+    sources = []
+    for folder in source_dirs:
+        for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTS):
+                sources.append(entry.path)
+    return sources
+
+
+# 🏭 批次產生縮圖（多核心平行），只處理新增或內容有變動的圖片
+def build_derivatives(sources=None, size_names=None, force=False, workers=None):
+    sources = list_sources() if sources is None else sources
+    size_names = CARD_SIZES if size_names is None else size_names
+    _, ext = _output_format()
+
+    with _manifest_lock:
+        manifest = _load_manifest()
+    jobs = []
+    for src_path in sources:
+        sha1 = source_sha1(src_path, manifest)
+        stat = os.stat(src_path)
+        manifest[os.path.relpath(src_path, ROOT_DIR)] = {
+            "sha1": sha1, "mtime": stat.st_mtime_ns, "size": stat.st_size,
+        }
+        missing = [s for s in size_names if force or not os.path.exists(_derived_path(sha1, s, ext))]
+        if missing:
+            jobs.append((src_path, sha1, missing))
+
+    written = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render, src, sha1, sizes, force) for src, sha1, sizes in jobs]
+            for future in futures:
+                written.extend(future.result())
+
+    with _manifest_lock:
+        _save_manifest(manifest)
+    return {"sources": len(sources), "rebuilt": len(jobs), "written": len(written)}
+
+
+# 取得某張原圖在某顯示尺寸的縮圖路徑；還沒產生時當場產生
+# （已經產生過的縮圖直接使用，不必載入 Pillow，首頁顯示不用等 PIL 匯入）
+def derivative_path(src_path, size_name):
+    manifest = None
+    if os.path.relpath(src_path, ROOT_DIR) not in _known_sha1:
+        with _manifest_lock:
+            manifest = _load_manifest()
+    sha1 = source_sha1(src_path, manifest)
+    for ext in DERIVED_EXTS:
+        out_path = _derived_path(sha1, size_name, ext)
+        if os.path.exists(out_path):
+            return out_path
+    _, ext = _output_format()
+    out_path = _derived_path(sha1, size_name, ext)
+    if not os.path.exists(out_path):
+        with _generate_lock:
+            if not os.path.exists(out_path):
+                with span("images.render", size=size_name):
+                    _render(src_path, sha1, [size_name])
+    return out_path
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="產生卡牌圖片縮圖（只重做有變動的卡片）")
+    parser.add_argument("--force", action="store_true", help="全部重新產生")
+    parser.add_argument("--workers", type=int, default=None, help="平行處理的程序數（預設為 CPU 核心數）")
+    args = parser.parse_args(argv)
+    stats = build_derivatives(force=args.force, workers=args.workers)
+    print(f"✅ 共 {stats['sources']} 張原圖，重新產生 {stats['rebuilt']} 張（{stats['written']} 個縮圖檔）")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
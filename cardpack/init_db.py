@@ -1,30 +1,10 @@
-import sqlite3
+import os
+import sys
 
-# 建立資料庫檔案（會自動產生 draw_card.db）
-conn = sqlite3.connect("draw_card.db")
-c = conn.cursor()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cardpack.ledger import DB_PATH, DrawLedger
 
-# 建立抽卡紀錄表
-c.execute('''
-    CREATE TABLE IF NOT EXISTS draw_records (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        student_id TEXT,
-        card_name TEXT,
-        rarity TEXT,
-        draw_time TEXT
-    )
-''')
-
-# 建立學生保底狀態表
-c.execute('''
-    CREATE TABLE IF NOT EXISTS student_status (
-        student_id TEXT PRIMARY KEY,
-        total_draws INTEGER DEFAULT 0,
-        no_legendary_count INTEGER DEFAULT 0
-    )
-''')
-
-conn.commit()
-conn.close()
+# 建立資料庫檔案（會自動產生 draw_card.db），含抽卡紀錄表、學生保底狀態表與索引，並啟用 WAL 模式
+DrawLedger(DB_PATH)
 
 print("✅ SQLite 資料庫建立完成（draw_card.db）！")
@@ -0,0 +1,343 @@
+# 🗃️ 抽卡紀錄本機資料庫（SQLite，WAL 模式）
+#
+# draw_records / student_status 是抽卡的正式紀錄；Google Sheet 只作為備份鏡像。
+# 學生第一次出現時，會把 Google Sheet 上既有的紀錄匯入一次。
+# 要同步到 Google Sheet 的寫入先放進 sheet_outbox，由背景執行緒（cardpack/replication.py）送出；
+# 無法送出（內容有誤或重試次數用完）的項目移到 sheet_outbox_dead 保留，不再擋住後面的項目。
+# student_cards / student_summary 是每次寫入時同步累加的統計，排行榜與抽卡限制不必掃描明細。
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from cardpack.tracing import traced
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "draw_card.db")
+DB_PATH_ENV = "CARDPACK_DB_PATH"  # 壓力測試等情況改用其他資料庫檔
+LEGENDARY = "傳說"
+# 稀有度 → student_summary 欄位
+RARITY_COLUMNS = {"傳說": "legendary", "史詩": "epic", "稀有": "rare", "普通": "common"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS draw_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT,
+    card_name TEXT,
+    rarity TEXT,
+    draw_time TEXT
+);
+CREATE TABLE IF NOT EXISTS student_status (
+    student_id TEXT PRIMARY KEY,
+    total_draws INTEGER DEFAULT 0,
+    no_legendary_count INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_draw_records_student_id ON draw_records (student_id);
+CREATE INDEX IF NOT EXISTS idx_draw_records_draw_time ON draw_records (draw_time);
+CREATE TABLE IF NOT EXISTS student_cards (
+    student_id TEXT,
+    card_name TEXT,
+    rarity TEXT,
+    count INTEGER DEFAULT 0,
+    PRIMARY KEY (student_id, card_name, rarity)
+);
+CREATE TABLE IF NOT EXISTS student_summary (
+    student_id TEXT PRIMARY KEY,
+    total INTEGER DEFAULT 0,
+    unique_cards INTEGER DEFAULT 0,
+    legendary INTEGER DEFAULT 0,
+    epic INTEGER DEFAULT 0,
+    rare INTEGER DEFAULT 0,
+    common INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rank_snapshots (
+    snapshot_date TEXT PRIMARY KEY,
+    ranks TEXT
+);
+CREATE TABLE IF NOT EXISTS sheet_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT,
+    worksheet TEXT,
+    payload TEXT,
+    attempts INTEGER DEFAULT 0,
+    next_attempt REAL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sheet_outbox_next_attempt ON sheet_outbox (next_attempt);
+CREATE TABLE IF NOT EXISTS sheet_outbox_dead (
+    id INTEGER PRIMARY KEY,
+    kind TEXT,
+    worksheet TEXT,
+    payload TEXT,
+    attempts INTEGER,
+    last_error TEXT,
+    failed_at REAL
+);
+"""
+
+
+class DrawLedger:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self.connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self._backfill_summaries(conn)
+
+    # 每個執行緒各自一條連線（Streamlit 每個工作階段跑在不同執行緒）
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def has_student(self, student_id):
+        row = self.connection().execute(
+            "SELECT 1 FROM student_status WHERE student_id = ?", (student_id,)
+        ).fetchone()
+        return row is not None
+
+    # 匯入既有紀錄（records: [(卡名, 稀有度, 抽取時間), ...]），已匯入過的學生不重複匯入
+    def import_student(self, student_id, records):
+        conn = self.connection()
+        with conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO student_status (student_id) VALUES (?)", (student_id,)
+            ).rowcount
+            if inserted:
+                self._insert_draws(conn, student_id, records)
+        return bool(inserted)
+
+    # 學生不在資料庫時，用 fetch() 取得 Google Sheet 上的紀錄匯入；fetch() 回傳 None 表示沒有紀錄
+    def ensure_student(self, student_id, fetch):
+        if self.has_student(student_id):
+            return True
+        records = fetch()
+        if records is None:
+            return False
+        self.import_student(student_id, records)
+        return True
+
+    # 寫入一次抽卡結果（cards: [(卡名, 稀有度), ...]），同一個交易內排入 Google Sheet 同步佇列
+    # 沒有抽到卡（卡池已抽完）時不寫入、也不排入同步
+    @traced("ledger.record_draws")
+    def record_draws(self, student_id, cards, draw_time):
+        if not cards:
+            return
+        records = [(name, rarity, draw_time) for name, rarity in cards]
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO student_status (student_id) VALUES (?)", (student_id,)
+            )
+            self._insert_draws(conn, student_id, records)
+            self._enqueue(conn, "append", student_id, [[student_id, name, rarity, t] for name, rarity, t in records])
+
+    def _insert_draws(self, conn, student_id, records):
+        records = list(records)
+        conn.executemany(
+            "INSERT INTO draw_records (student_id, card_name, rarity, draw_time) VALUES (?, ?, ?, ?)",
+            [(student_id, name, rarity, draw_time) for name, rarity, draw_time in records],
+        )
+        self._update_summary(conn, student_id, [(name, rarity) for name, rarity, _ in records])
+        total, no_legendary = conn.execute(
+            "SELECT total_draws, no_legendary_count FROM student_status WHERE student_id = ?",
+            (student_id,),
+        ).fetchone()
+        for _, rarity, _ in records:
+            no_legendary = 0 if rarity == LEGENDARY else no_legendary + 1
+        conn.execute(
+            "UPDATE student_status SET total_draws = ?, no_legendary_count = ? WHERE student_id = ?",
+            (total + len(records), no_legendary, student_id),
+        )
+
+    # 累加 student_cards 與 student_summary
+    def _update_summary(self, conn, student_id, cards):
+        conn.execute("INSERT OR IGNORE INTO student_summary (student_id) VALUES (?)", (student_id,))
+        known_names = {
+            name for (name,) in conn.execute(
+                "SELECT DISTINCT card_name FROM student_cards WHERE student_id = ?", (student_id,)
+            )
+        }
+        deltas = {column: 0 for column in RARITY_COLUMNS.values()}
+        new_names = set()
+        for name, rarity in cards:
+            conn.execute(
+                "INSERT INTO student_cards (student_id, card_name, rarity, count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (student_id, card_name, rarity) DO UPDATE SET count = count + 1",
+                (student_id, name, rarity),
+            )
+            if name not in known_names:
+                new_names.add(name)
+            if rarity in RARITY_COLUMNS:
+                deltas[RARITY_COLUMNS[rarity]] += 1
+        conn.execute(
+            "UPDATE student_summary SET total = total + ?, unique_cards = unique_cards + ?, "
+            "legendary = legendary + ?, epic = epic + ?, rare = rare + ?, common = common + ? "
+            "WHERE student_id = ?",
+            (len(cards), len(new_names), deltas["legendary"], deltas["epic"], deltas["rare"], deltas["common"], student_id),
+        )
+
+    # 舊資料庫升級：由 draw_records 重建尚未有統計的學生
+    def _backfill_summaries(self, conn):
+        missing = [
+            sid for (sid,) in conn.execute(
+                "SELECT DISTINCT student_id FROM draw_records "
+                "WHERE student_id NOT IN (SELECT student_id FROM student_summary)"
+            )
+        ]
+        with conn:
+            for student_id in missing:
+                cards = conn.execute(
+                    "SELECT card_name, rarity FROM draw_records WHERE student_id = ? ORDER BY id", (student_id,)
+                ).fetchall()
+                self._update_summary(conn, student_id, cards)
+
+    # {(卡名, 稀有度): 張數}
+    def drawn_counts(self, student_id):
+        rows = self.connection().execute(
+            "SELECT card_name, rarity, count FROM student_cards WHERE student_id = ?",
+            (student_id,),
+        ).fetchall()
+        return {(name, rarity): count for name, rarity, count in rows}
+
+    # 與學生分頁相同欄位的紀錄明細
+    def student_records(self, student_id):
+        rows = self.connection().execute(
+            "SELECT student_id, card_name, rarity, draw_time FROM draw_records WHERE student_id = ? ORDER BY id",
+            (student_id,),
+        ).fetchall()
+        return [{"學號": sid, "卡名": name, "稀有度": rarity, "抽取時間": t} for sid, name, rarity, t in rows]
+
+    def has_students(self):
+        return self.connection().execute("SELECT 1 FROM student_status LIMIT 1").fetchone() is not None
+
+    def student_ids(self):
+        rows = self.connection().execute("SELECT student_id FROM student_status ORDER BY student_id").fetchall()
+        return [sid for (sid,) in rows]
+
+    # 排行榜統計：每位學生的總抽卡數、卡片種類數與各稀有度張數（直接讀 student_summary）
+    def leaderboard(self):
+        rows = self.connection().execute(
+            "SELECT student_id, total, unique_cards, legendary, epic, rare, common "
+            "FROM student_summary WHERE total > 0"
+        ).fetchall()
+        return [
+            {
+                "學號": sid,
+                "總抽卡數": total,
+                "卡片種類數": unique,
+                "傳說卡數": legend,
+                "史詩卡數": epic,
+                "稀有卡數": rare,
+                "普通卡數": normal,
+            }
+            for sid, total, unique, legend, epic, rare, normal in rows
+        ]
+
+    # 🏆 每日名次快照 {學號: 名次}
+    def rank_snapshot(self, snapshot_date):
+        row = self.connection().execute(
+            "SELECT ranks FROM rank_snapshots WHERE snapshot_date = ?", (snapshot_date,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def has_rank_snapshots(self):
+        return self.connection().execute("SELECT 1 FROM rank_snapshots LIMIT 1").fetchone() is not None
+
+    # 合併當日名次：已記錄的學生保留當天第一次的名次；有新增時回傳合併後的快照，否則回傳 None
+    def merge_rank_snapshot(self, snapshot_date, ranks, mirror_worksheet=None):
+        conn = self.connection()
+        with conn:
+            row = conn.execute(
+                "SELECT ranks FROM rank_snapshots WHERE snapshot_date = ?", (snapshot_date,)
+            ).fetchone()
+            current = json.loads(row[0]) if row else {}
+            added = {sid: rank for sid, rank in ranks.items() if sid not in current}
+            if not added:
+                return None
+            merged = {**current, **added}
+            payload = json.dumps(merged, ensure_ascii=False)
+            conn.execute(
+                "INSERT INTO rank_snapshots (snapshot_date, ranks) VALUES (?, ?) "
+                "ON CONFLICT (snapshot_date) DO UPDATE SET ranks = excluded.ranks",
+                (snapshot_date, payload),
+            )
+            if mirror_worksheet:
+                self._enqueue(conn, "rank_snapshot", mirror_worksheet, [[snapshot_date, payload]])
+        return merged
+
+    # 📤 Google Sheet 同步佇列
+    def enqueue(self, kind, worksheet, payload):
+        conn = self.connection()
+        with conn:
+            self._enqueue(conn, kind, worksheet, payload)
+
+    def _enqueue(self, conn, kind, worksheet, payload):
+        conn.execute(
+            "INSERT INTO sheet_outbox (kind, worksheet, payload) VALUES (?, ?, ?)",
+            (kind, worksheet, json.dumps(payload, ensure_ascii=False)),
+        )
+
+    # 佇列中的項目 [(id, kind, worksheet, payload, attempts, next_attempt), ...]，依排入順序
+    def outbox_items(self, limit=1000):
+        rows = self.connection().execute(
+            "SELECT id, kind, worksheet, payload, attempts, next_attempt FROM sheet_outbox ORDER BY id LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [(i, kind, ws, json.loads(payload), attempts, t) for i, kind, ws, payload, attempts, t in rows]
+
+    # 某種類、某工作表尚未送出的內容（例如還沒寫回進度表的抽卡日期）
+    def pending_payloads(self, kind, worksheet):
+        rows = self.connection().execute(
+            "SELECT payload FROM sheet_outbox WHERE kind = ? AND worksheet = ? ORDER BY id",
+            (kind, worksheet),
+        ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def complete_outbox(self, ids):
+        conn = self.connection()
+        with conn:
+            conn.executemany("DELETE FROM sheet_outbox WHERE id = ?", [(i,) for i in ids])
+
+    def defer_outbox(self, ids, delay, error):
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                "UPDATE sheet_outbox SET attempts = attempts + 1, next_attempt = ?, last_error = ? WHERE id = ?",
+                [(time.time() + delay, str(error), i) for i in ids],
+            )
+
+    # 放棄送出：移到 sheet_outbox_dead（保留內容、錯誤與含這一次在內的嘗試次數，之後可人工處理）
+    def dead_letter_outbox(self, ids, error):
+        conn = self.connection()
+        with conn:
+            for i in ids:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sheet_outbox_dead (id, kind, worksheet, payload, attempts, last_error, failed_at) "
+                    "SELECT id, kind, worksheet, payload, attempts + 1, ?, ? FROM sheet_outbox WHERE id = ?",
+                    (str(error), time.time(), i),
+                )
+                conn.execute("DELETE FROM sheet_outbox WHERE id = ?", (i,))
+
+    def outbox_depth(self):
+        return self.connection().execute("SELECT COUNT(*) FROM sheet_outbox").fetchone()[0]
+
+    def dead_letter_depth(self):
+        return self.connection().execute("SELECT COUNT(*) FROM sheet_outbox_dead").fetchone()[0]
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+# 整個程序共用的資料庫
+def get_ledger():
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = DrawLedger(os.environ.get(DB_PATH_ENV) or DB_PATH)
+        return _ledger
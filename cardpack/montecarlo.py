@@ -0,0 +1,172 @@
+# 📈 大量虛擬學生的抽卡蒙地卡羅模擬（新卡池上線前調整稀有度權重與張數上限用）
+#
+# 每位學生的抽卡過程 = 依「稀有度權重」對每一張剩餘可抽的卡做不放回加權抽樣（與 CardPool 相同的機率）。
+# 不放回加權抽樣等同於：每一份可抽張數各給一個 Exp(1) / 權重 的亂數鍵，依鍵由小到大就是抽出順序
+# （Efraimidis–Spirakis）。因此不必逐抽模擬：
+#   某張卡第一次抽到的「時間」= 該卡所有份數的鍵最小值，
+#   到某個時間為止抽了幾次 = 鍵 ≤ 該時間的份數個數。
+# 一次以 (學生數, 總張數) 的陣列處理一批學生，10⁶ 位學生在筆電上約數秒。
+import argparse
+import time
+
+import numpy as np
+
+from cardpack.sampler import MAX_ALLOWED, PACK_SIZE, RARITY_WEIGHTS
+
+CHUNK_SIZE = 20000   # 每批學生數（控制記憶體：20000 × 總張數 × 8 bytes）
+CHECKPOINTS = [10, 25, 50, 100]
+PERCENTILES = [50, 90, 99]
+
+
+# 依稀有度分組：回傳 [(稀有度, 卡片清單, 每張份數, 權重), ...]；同一稀有度的份數在陣列中相鄰
+def _rarity_groups(cards, max_allowed, rarity_weights):
+    groups = {}
+    for name, rarity in cards:
+        copies = max_allowed.get(rarity, 0)
+        weight = rarity_weights.get(rarity, 0)
+        if copies <= 0 or weight <= 0:
+            continue  # 抽不到的卡不列入收集目標（與 CardPool 相同）
+        groups.setdefault(rarity, (rarity, [], copies, weight))[1].append((name, rarity))
+    return list(groups.values())
+
+
+# 每位學生：鍵 ≤ times 的份數（= 到該時間為止的抽卡次數）
+def _draws_until(keys, times):
+    return np.count_nonzero(keys <= times[:, None], axis=1)
+
+
+# 🎲 模擬 n_students 位學生，回傳每位學生的原始結果（numpy 陣列）
+#   complete：收集到每張卡（至少一張）所需抽數
+#   first_legendary：第一次抽到傳說卡所需抽數（卡池沒有傳說卡時為 None）
+#   rarity_complete：{稀有度: 收集到該稀有度所有卡所需抽數}
+#   saturation：{抽數: {稀有度: 平均已收集比例}}
+def simulate(cards, n_students, max_allowed=None, rarity_weights=None,
+             checkpoints=CHECKPOINTS, chunk_size=CHUNK_SIZE, seed=None):
+    max_allowed = MAX_ALLOWED if max_allowed is None else max_allowed
+    rarity_weights = RARITY_WEIGHTS if rarity_weights is None else rarity_weights
+    groups = _rarity_groups(cards, max_allowed, rarity_weights)
+    if not groups:
+        raise ValueError("卡池沒有可抽的卡")
+
+    spans = {}
+    inv_weights = []
+    for rarity, group_cards, copies, weight in groups:
+        spans[rarity] = (len(inv_weights), len(group_cards), copies)
+        inv_weights.extend([1.0 / weight] * (len(group_cards) * copies))
+    inv_weights = np.asarray(inv_weights)
+    total_units = len(inv_weights)
+    checkpoints = [n for n in checkpoints if n <= total_units]
+    has_legendary = "傳說" in spans
+
+    rng = np.random.default_rng(seed)
+    complete = np.empty(n_students, dtype=np.int32)
+    first_legendary = np.empty(n_students, dtype=np.int32) if has_legendary else None
+    rarity_complete = {r: np.empty(n_students, dtype=np.int32) for r in spans}
+    owned_sums = {n: dict.fromkeys(spans, 0.0) for n in checkpoints}
+
+    for lo in range(0, n_students, chunk_size):
+        hi = min(n_students, lo + chunk_size)
+        m = hi - lo
+        keys = rng.standard_exponential((m, total_units))
+        keys *= inv_weights
+
+        # 每張卡第一次抽到的時間：(學生, 該稀有度卡片數)
+        first_seen = {}
+        for rarity, (offset, count, copies) in spans.items():
+            block = keys[:, offset:offset + count * copies].reshape(m, count, copies)
+            # 份數很少（1～2），逐份取 minimum 比在長度 2 的軸上 reduce 快很多
+            seen = block[:, :, 0]
+            for j in range(1, copies):
+                seen = np.minimum(seen, block[:, :, j])
+            first_seen[rarity] = seen
+
+        done_at = {r: seen.max(axis=1) for r, seen in first_seen.items()}
+        complete[lo:hi] = _draws_until(keys, np.max(list(done_at.values()), axis=0))
+        if has_legendary:
+            first_legendary[lo:hi] = _draws_until(keys, first_seen["傳說"].min(axis=1))
+        for rarity, times in done_at.items():
+            rarity_complete[rarity][lo:hi] = _draws_until(keys, times)
+
+        if checkpoints:
+            # 第 n 抽的時間 = 第 n 小的鍵
+            ordered = np.sort(keys, axis=1)
+            for n in checkpoints:
+                nth = ordered[:, n - 1, None]
+                for rarity, seen in first_seen.items():
+                    owned_sums[n][rarity] += np.count_nonzero(seen <= nth) / seen.shape[1]
+
+    saturation = {n: {r: owned_sums[n][r] / n_students for r in spans} for n in checkpoints}
+    return {
+        "cards": [card for _, group_cards, _, _ in groups for card in group_cards],
+        "total_units": total_units,
+        "complete": complete,
+        "first_legendary": first_legendary,
+        "rarity_complete": rarity_complete,
+        "saturation": saturation,
+    }
+
+
+# 平均與百分位數
+def describe(values):
+    summary = {"平均": float(np.mean(values))}
+    for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"P{p}"] = float(v)
+    return summary
+
+
+def _parse_mapping(text, default):
+    if not text:
+        return default
+    mapping = {}
+    for item in text.split(","):
+        key, value = item.split("=")
+        mapping[key.strip()] = int(value)
+    return mapping
+
+
+def _print_row(label, values):
+    summary = describe(values)
+    cells = "  ".join(f"{k} {v:7.1f}" for k, v in summary.items())
+    print(f"{label:<14}{cells}   （約 {summary['平均'] / PACK_SIZE:.1f} 包）")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="模擬大量學生的抽卡進度")
+    parser.add_argument("--pool", default="基礎包", help="卡池分類")
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--weights", help="稀有度權重，例如 普通=75,稀有=20,史詩=4,傳說=1")
+    parser.add_argument("--max-allowed", help="每張卡上限，例如 普通=2,稀有=2,史詩=2,傳說=1")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    from cardpack.catalog import get_catalog
+
+    pool_df = get_catalog().pool_cards(args.pool)
+    cards = list(zip(pool_df["名稱"], pool_df["稀有度"]))
+    started = time.perf_counter()
+    result = simulate(
+        cards,
+        args.students,
+        max_allowed=_parse_mapping(args.max_allowed, MAX_ALLOWED),
+        rarity_weights=_parse_mapping(args.weights, RARITY_WEIGHTS),
+        seed=args.seed,
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"卡池：{args.pool}（{len(result['cards'])} 張卡，共 {result['total_units']} 張可抽）")
+    print(f"模擬 {args.students} 位學生，耗時 {elapsed:.2f} 秒\n")
+    _print_row("收集全部卡片", result["complete"])
+    if result["first_legendary"] is not None:
+        _print_row("第一張傳說", result["first_legendary"])
+    for rarity, values in result["rarity_complete"].items():
+        _print_row(f"{rarity}收集完成", values)
+
+    if result["saturation"]:
+        print("\n平均已收集比例（依抽數）")
+        for n, by_rarity in result["saturation"].items():
+            cells = "  ".join(f"{r} {v:6.1%}" for r, v in by_rarity.items())
+            print(f"  {n:>4} 抽：{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# 📋 進度表索引（學號 → 列號、該列資料），短時間快取
+#
+# 上課一開始全班輸入學號時，不必每人各下載一次整張進度表：整張表只在快取過期（PROGRESS_TTL 秒）
+# 或明確 invalidate() 後才以一次 get_all_values 重新讀取；同時過期時只有一個執行緒讀取，其餘等它讀完。
+# 寫回抽卡日期時每一批先重新讀取一次（列可能被重新排序或插入），再以一次 batch_update 寫入目標儲存格，
+# 不再 find + row_values + update_cell。
+import threading
+import time
+
+from cardpack.gsheets import PROGRESS_SHEET, worksheet_index
+
+PROGRESS_TTL = 60.0  # 秒
+
+
+def _a1(row, col):
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return f"{letters}{row}"
+
+
+class ProgressIndex:
+    def __init__(self, ttl=PROGRESS_TTL):
+        self.ttl = ttl
+        self._header = []
+        self._rows = {}  # 學號 → (列號, {欄位: 值})
+        self._loaded_at = None
+        self._sheet_found = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # 同一時間只有一個執行緒讀取整張進度表
+
+    def _load(self, spreadsheet):
+        worksheet = worksheet_index(spreadsheet).get(PROGRESS_SHEET)
+        values = worksheet.get_all_values() if worksheet is not None else []
+        header = values[0] if values else []
+        rows = {}
+        for row_number, row in enumerate(values[1:], start=2):
+            record = dict(zip(header, row))
+            student_id = str(record.get("學號", "")).strip()
+            if student_id and student_id not in rows:
+                rows[student_id] = (row_number, record)
+        with self._lock:
+            self._sheet_found = worksheet is not None
+            self._header = header
+            self._rows = rows
+            self._loaded_at = time.monotonic()
+
+    def _fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    # 取得 (列號, 該列資料)；找不到學號時回傳 None
+    def lookup(self, spreadsheet, student_id):
+        if not self._fresh():
+            with self._load_lock:
+                if not self._fresh():  # 等待期間其他執行緒可能已經讀好了
+                    self._load(spreadsheet)
+        with self._lock:
+            found = self._rows.get(str(student_id).strip())
+            return (found[0], dict(found[1])) if found else None
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    # 抽卡後先更新快取內的資料（Google Sheet 由背景同步寫入）
+    def set_local(self, student_id, column, value):
+        with self._lock:
+            found = self._rows.get(str(student_id).strip())
+            if found:
+                found[1][column] = value
+
+    def _resolve(self, student_id, column):
+        with self._lock:
+            found = self._rows.get(str(student_id).strip())
+            if found is None or column not in self._header:
+                return None
+            return _a1(found[0], self._header.index(column) + 1)
+
+    # 📅 把抽卡日期寫回進度表（updates: [(學號, 欄位名稱, 日期), ...]），一次 batch_update
+    # 列號以寫入前剛讀到的進度表為準（快取的列號可能已過時，寫到別的學生那一列）；
+    # 進度表上找不到學號或欄位的項目不寫入，回傳這些項目
+    def write_dates(self, spreadsheet, updates):
+        with self._load_lock:
+            self._load(spreadsheet)
+            # 整張進度表不見時（可能暫時改名）整批稍後重試，不當成個別項目的錯誤
+            if not self._sheet_found:
+                raise LookupError(f"找不到「{PROGRESS_SHEET}」工作表")
+            cells = [self._resolve(student_id, column) for student_id, column, _ in updates]
+
+        data = [{"range": cell, "values": [[value]]} for cell, (_, _, value) in zip(cells, updates) if cell]
+        if data:
+            worksheet_index(spreadsheet).get(PROGRESS_SHEET).batch_update(data)
+        return [update for cell, update in zip(cells, updates) if cell is None]
+
+
+# 整個程序共用
+progress_index = ProgressIndex()
@@ -0,0 +1,185 @@
+# 🚦 Google Sheets API 配額排程（所有頁面、所有工作階段共用同一個服務帳號的配額）
+#
+# 讀取與寫入各有一個權杖桶（token bucket），每分鐘各有 READS_PER_MINUTE / WRITES_PER_MINUTE 個權杖。
+# 每次 API 呼叫先取得一個權杖；權杖不足時等待，而不是直接送出後吃到 429。
+# 優先順序：抽卡寫入（HIGH）> 一般查詢（NORMAL）> 排行榜掃描、批次匯入（LOW）：
+#   有較高優先的呼叫在等待時，較低優先的不能插隊；較低優先也不能用掉保留給較高優先的權杖。
+# 仍然收到 429 時，全部呼叫一起暫停並指數退避（加上隨機抖動），成功後恢復。
+# 呼叫端以 with sheets_priority(LOW): 設定目前執行緒的優先順序。
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+READS_PER_MINUTE = int(os.environ.get("CARDPACK_SHEETS_READS_PER_MINUTE") or 60)
+WRITES_PER_MINUTE = int(os.environ.get("CARDPACK_SHEETS_WRITES_PER_MINUTE") or 60)
+
+HIGH, NORMAL, LOW = 0, 1, 2
+PRIORITY_NAMES = {HIGH: "抽卡寫入", NORMAL: "一般查詢", LOW: "排行榜掃描"}
+RESERVE = {HIGH: 0.0, NORMAL: 0.1, LOW: 0.3}   # 各優先順序不能動用的權杖比例
+WAIT_TIMEOUT = {HIGH: 60.0, NORMAL: 20.0, LOW: 120.0}  # 等待權杖的秒數上限
+
+MAX_RETRIES = 4
+BASE_BACKOFF = 2.0
+MAX_BACKOFF = 64.0
+
+WRITE_METHODS = {
+    "add_worksheet", "append_row", "append_rows", "batch_update", "clear",
+    "delete_rows", "insert_row", "insert_rows", "update", "update_cell", "update_cells",
+}
+
+
+class QuotaWaitTimeout(Exception):
+    pass
+
+
+# 是否為 Google Sheets API 的配額錯誤（HTTP 429）
+def is_quota_error(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+# 配額用盡或等不到權杖：畫面上應顯示「稍後再試」而不是「找不到資料」
+def is_sheets_busy(error):
+    return isinstance(error, QuotaWaitTimeout) or is_quota_error(error)
+
+
+SHEETS_BUSY_MESSAGE = "⏳ Google Sheet 目前太忙（每分鐘的讀寫次數已達上限），請稍等幾秒再試一次。"
+
+
+def call_kind(method_name):
+    return "write" if method_name in WRITE_METHODS else "read"
+
+
+# 每分鐘的權杖桶：用掉的權杖剛好 60 秒後歸還，任何 60 秒內的呼叫數都不會超過 per_minute
+# （Google 以每分鐘計算配額；以固定速率慢慢補充的權杖桶在桶滿時可以一分鐘內用掉將近兩倍）
+class TokenBucket:
+    WINDOW = 60.0
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self._spent = deque()   # 用掉權杖的時間
+
+    def _expire(self, now):
+        while self._spent and now - self._spent[0] >= self.WINDOW:
+            self._spent.popleft()
+
+    def available(self, now):
+        self._expire(now)
+        return self.capacity - len(self._spent)
+
+    def take(self, now):
+        self._spent.append(now)
+
+    # 可用權杖回到 target 個還要幾秒
+    def seconds_until(self, target, now):
+        missing = target - self.available(now)
+        if missing <= 0:
+            return 0.0
+        return self._spent[missing - 1] + self.WINDOW - now
+
+
+class SheetsScheduler:
+    def __init__(self, reads_per_minute=READS_PER_MINUTE, writes_per_minute=WRITES_PER_MINUTE):
+        self.buckets = {"read": TokenBucket(reads_per_minute), "write": TokenBucket(writes_per_minute)}
+        self._waiting = {kind: [0, 0, 0] for kind in self.buckets}
+        self._cond = threading.Condition()
+        self._cooldown_until = 0.0
+        self._failures = 0
+        self._stats = {"calls": 0, "waited": 0, "quota_errors": 0, "timeouts": 0}
+
+    def _blocked_by_higher(self, kind, priority):
+        return any(self._waiting[kind][p] for p in range(priority))
+
+    # 取得一個權杖；等不到時丟出 QuotaWaitTimeout
+    def acquire(self, kind, priority=NORMAL, timeout=None):
+        bucket = self.buckets[kind]
+        timeout = WAIT_TIMEOUT[priority] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        floor = 1 + int(bucket.capacity * RESERVE[priority])
+        waited = False
+        with self._cond:
+            self._waiting[kind][priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now >= self._cooldown_until and not self._blocked_by_higher(kind, priority) and bucket.available(now) >= floor:
+                        bucket.take(now)
+                        self._stats["calls"] += 1
+                        self._stats["waited"] += waited
+                        return
+                    if now >= deadline:
+                        self._stats["timeouts"] += 1
+                        raise QuotaWaitTimeout(f"等待 Google Sheet {'寫入' if kind == 'write' else '讀取'}配額逾時")
+                    delay = max(self._cooldown_until - now, bucket.seconds_until(floor, now), 0.05)
+                    waited = True
+                    self._cond.wait(min(delay, deadline - now, 1.0))
+            finally:
+                self._waiting[kind][priority] -= 1
+                self._cond.notify_all()
+
+    # 收到 429：全部呼叫暫停，暫停時間指數成長
+    def report_quota_error(self):
+        with self._cond:
+            delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** self._failures) * (0.5 + random.random() / 2)
+            self._failures += 1
+            self._stats["quota_errors"] += 1
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+
+    def report_success(self):
+        if self._failures:
+            with self._cond:
+                self._failures = 0
+
+    # 依配額執行 fn()；429 時退避後重試，最後一次仍失敗就丟出原本的錯誤
+    def call(self, kind, fn, priority=None, retries=MAX_RETRIES):
+        priority = current_priority() if priority is None else priority
+        for attempt in range(retries + 1):
+            self.acquire(kind, priority)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_quota_error(e) or attempt == retries:
+                    raise
+                self.report_quota_error()
+                continue
+            self.report_success()
+            return result
+
+    # 目前配額餘裕（管理頁面顯示用）
+    def headroom(self):
+        with self._cond:
+            now = time.monotonic()
+            result = {}
+            for kind, bucket in self.buckets.items():
+                result[kind] = {
+                    "available": bucket.available(now),
+                    "per_minute": bucket.capacity,
+                    "waiting": {PRIORITY_NAMES[p]: n for p, n in enumerate(self._waiting[kind])},
+                }
+            result["cooldown_s"] = round(max(0.0, self._cooldown_until - now), 1)
+            result["stats"] = dict(self._stats)
+            return result
+
+
+# 整個程序共用
+scheduler = SheetsScheduler()
+
+_local = threading.local()
+
+
+def current_priority():
+    return getattr(_local, "priority", NORMAL)
+
+
+# 設定這個執行緒內 Google Sheet 呼叫的優先順序
+@contextmanager
+def sheets_priority(priority):
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
@@ -0,0 +1,61 @@
+# 🏆 排行榜名次紀錄（每天一筆快照）
+#
+# 舊的「排行榜記錄」每位學生每天一列、永遠增長，且每次載入排行榜都整張讀取。
+# 現在名次以 {學號: 名次} 的每日快照存在本機資料庫（以日期為主鍵查詢昨日名次），
+# 同步到 Google Sheet「排行榜快照」時每天一列（已有當天的列就覆寫）。舊紀錄第一次使用時壓縮匯入一次。
+import threading
+
+from cardpack.gsheets import worksheet_index
+from cardpack.quota import LOW, sheets_priority
+
+RANK_SNAPSHOT_SHEET = "排行榜快照"
+RANK_SNAPSHOT_HEADER = ["日期", "名次資料"]
+LEGACY_RANK_SHEET = "排行榜記錄"
+
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+
+# 把舊的「排行榜記錄」（日期、學號、名次）壓縮成每日快照，回傳匯入的天數
+# 完成後（或本機已有快照時）才記住這個資料庫已匯入；讀取失敗（配額、網路、欄位不符）會丟出例外，下次再試
+def migrate_legacy_rank_history(spreadsheet, ledger):
+    with _migrate_lock:
+        if ledger.path in _migrated:
+            return 0
+        if ledger.has_rank_snapshots():
+            _migrated.add(ledger.path)
+            return 0
+        imported = _import_legacy_ranks(spreadsheet, ledger)
+        _migrated.add(ledger.path)
+        return imported
+
+
+def _import_legacy_ranks(spreadsheet, ledger):
+    # 一次性的整張讀取，不可以擠掉學生抽卡的 Google Sheet 呼叫
+    with sheets_priority(LOW):
+        worksheet = worksheet_index(spreadsheet).get(LEGACY_RANK_SHEET)
+        if worksheet is None:
+            return 0
+        values = worksheet.get_all_values()
+    if not values:
+        return 0
+    header = values[0]
+    date_col, sid_col, rank_col = header.index("日期"), header.index("學號"), header.index("名次")
+    snapshots = {}
+    for row in values[1:]:
+        try:
+            snapshots.setdefault(row[date_col], {}).setdefault(row[sid_col], int(row[rank_col]))
+        except (IndexError, ValueError):
+            continue
+    for snapshot_date in sorted(snapshots):
+        ledger.merge_rank_snapshot(snapshot_date, snapshots[snapshot_date], RANK_SNAPSHOT_SHEET)
+    return len(snapshots)
+
+
+def ranks_on(ledger, snapshot_date):
+    return ledger.rank_snapshot(snapshot_date) or {}
+
+
+# 記錄當日名次（已記錄的學生不重複記錄），有變更時排入同步；回傳是否有變更
+def record_ranks(ledger, snapshot_date, ranks):
+    return ledger.merge_rank_snapshot(snapshot_date, ranks, RANK_SNAPSHOT_SHEET) is not None
@@ -0,0 +1,202 @@
+# 🎴 翻牌動畫元件的 HTML
+#
+# 卡片逐張出現的節奏與捲動都交給瀏覽器（CSS animation-delay + setTimeout），
+# 伺服器端一次產生整包卡的 HTML 後立即送出，不再於腳本執行緒內 time.sleep。
+# 音效每種只放一個 <audio> 元素（見 cardpack/audio.py），翻牌與 hover 由同一段腳本依 data-sfx 播放。
+from cardpack.assets import card_art
+from cardpack.audio import audio_elements, sfx_id
+from cardpack.images import derivative_path
+from cardpack.static_assets import asset_url
+from cardpack.tracing import traced
+
+REVEAL_INTERVAL_MS = 200  # 每張卡出現的間隔
+CARDS_PER_ROW = 5
+HOVER_VOLUME = 0.4
+
+# 稀有度 → (光暈樣式, 翻牌音效)
+RARITY_EFFECTS = {
+    "稀有": ("hover-glow-white", "rare"),
+    "史詩": ("hover-glow-purple", "epic"),
+    "傳說": ("hover-glow-gold pulse-animation", "legendary"),
+}
+
+
+# 產生翻牌元件的 HTML（card_df 需有「卡名」「稀有度」欄位）；缺少卡背圖時回傳 None
+@traced("render.reveal_html")
+def build_card_reveal_html(card_df):
+    back_path = card_art.path("card_back")
+    if back_path is None:
+        return None
+    cards = list(zip(card_df["卡名"], card_df["稀有度"]))
+
+    card_width = 200
+    card_height = 290
+    image_size = "pack"
+    if len(cards) == 1:
+        card_width = 260
+        card_height = 370
+        image_size = "single"
+
+    container_css = f"""
+    .card-container {{
+        {'display: flex; justify-content: center; align-items: center; height: 100%; padding: 30px;' if len(cards) == 1 else 'display: grid; grid-template-columns: repeat(5, 1fr); gap: 20px; justify-items: center; padding: 20px; max-width: 1100px; margin: 0 auto;'}
+    }}
+    .flip-card {{
+        background-color: transparent;
+        width: {card_width}px;
+        height: {card_height}px;
+        perspective: 1000px;
+        position: relative;
+        transition: box-shadow 0.5s ease-in-out;
+        animation: float 3s ease-in-out infinite;
+    }}
+    """
+
+    # 使用依顯示尺寸預先縮好的圖片（見 cardpack/images.py）
+    back_src = asset_url(derivative_path(back_path, image_size))
+    html_cards = ""
+    used_sounds = {"hover"}  # 統一 hover 音效
+
+    for idx, (name, rarity) in enumerate(cards):
+        delay = idx * REVEAL_INTERVAL_MS
+        img_path = card_art.path(name)
+        if img_path:
+            front_src = asset_url(derivative_path(img_path, image_size))
+            rarity_class, sound = RARITY_EFFECTS.get(rarity, ("", None))
+            sfx_attr = ""
+            if sound:
+                used_sounds.add(sound)
+                sfx_attr = f'data-sfx="{sfx_id(sound)}"'
+
+            html_cards += f"""
+            <div class="reveal-slot" style="animation-delay: {delay}ms;">
+            <div class="flip-card {rarity_class}" {sfx_attr}>
+              <div class="flip-card-inner">
+                <div class="flip-card-front">
+                  <img src="{back_src}" width="100%">
+                </div>
+                <div class="flip-card-back">
+                  <img src="{front_src}" width="100%">
+                  <p style='text-align:center;font-weight:bold;color:gold;margin:0;'>{name} ({rarity})</p>
+                </div>
+              </div>
+            </div>
+            </div>
+    """
+
+        if (idx + 1) % CARDS_PER_ROW == 0:
+            html_cards += f"<div class='row-marker' data-delay='{delay}'></div>"
+
+    final_html = f"""
+    <style>
+    {container_css}
+    .flip-card-inner {{
+        position: relative;
+        width: 100%;
+        height: 100%;
+        text-align: center;
+        transition: transform 0.8s;
+        transform-style: preserve-3d;
+    }}
+    .flipped .flip-card-inner {{
+        transform: rotateY(180deg);
+    }}
+    .flip-card-front, .flip-card-back {{
+        position: absolute;
+        width: 100%;
+        height: 100%;
+        backface-visibility: hidden;
+        border-radius: 12px;
+        box-shadow: 0 4px 8px rgba(0,0,0,0.3);
+    }}
+    .flip-card-back {{
+        transform: rotateY(180deg);
+    }}
+    .hover-glow-white:hover {{
+        box-shadow: 0 0 20px 5px white !important;
+        animation: glow-white 1.5s infinite alternate;
+    }}
+    .hover-glow-purple:hover {{
+        box-shadow: 0 0 20px 5px purple !important;
+        animation: glow-purple 1.5s infinite alternate;
+    }}
+    .hover-glow-gold:hover {{
+        box-shadow: 0 0 20px 5px gold !important;
+        animation: glow-gold 1.5s infinite alternate;
+    }}
+    @keyframes glow-white {{
+        from {{ box-shadow: 0 0 5px white; }}
+        to {{ box-shadow: 0 0 25px white; }}
+    }}
+    @keyframes glow-purple {{
+        from {{ box-shadow: 0 0 5px purple; }}
+        to {{ box-shadow: 0 0 25px violet; }}
+    }}
+    @keyframes glow-gold {{
+        from {{ box-shadow: 0 0 5px gold; }}
+        to {{ box-shadow: 0 0 25px orange; }}
+    }}
+    @keyframes pulse {{
+        0%   {{ transform: scale(1); }}
+        50%  {{ transform: scale(1.2); }}
+        100% {{ transform: scale(1); }}
+    }}
+    @keyframes float {{
+        0% {{ transform: translateY(0px); }}
+        50% {{ transform: translateY(-10px); }}
+        100% {{ transform: translateY(0px); }}
+    }}
+    .pulse-animation {{
+        animation: pulse 1s ease-in-out infinite;
+    }}
+    .reveal-slot {{
+        opacity: 0;
+        animation: reveal 0.4s ease-out forwards;
+    }}
+    .row-marker {{
+        grid-column: 1 / -1;
+        flex-basis: 100%;
+        height: 10px;
+    }}
+    @keyframes reveal {{
+        from {{ opacity: 0; transform: translateY(20px); }}
+        to   {{ opacity: 1; transform: translateY(0); }}
+    }}
+    </style>
+    {audio_elements(sorted(used_sounds))}
+    <div class="card-container">
+    {html_cards}
+    </div>
+    <script>
+    function playSfx(id, loop, volume) {{
+        var audio = document.getElementById(id);
+        if (!audio) return null;
+        audio.loop = loop;
+        audio.volume = volume;
+        audio.currentTime = 0;
+        audio.play().catch(function() {{}});
+        return audio;
+    }}
+    // 點擊翻牌並播放稀有度音效；滑鼠停在卡片上時循環播放 hover 音效
+    document.querySelectorAll(".flip-card").forEach(function(card) {{
+        card.addEventListener("click", function() {{
+            card.classList.add("flipped");
+            if (card.dataset.sfx) playSfx(card.dataset.sfx, false, 1.0);
+        }});
+        card.addEventListener("mouseenter", function() {{
+            playSfx("{sfx_id("hover")}", true, {HOVER_VOLUME});
+        }});
+        card.addEventListener("mouseleave", function() {{
+            var hover = document.getElementById("{sfx_id("hover")}");
+            if (hover) {{ hover.pause(); hover.currentTime = 0; }}
+        }});
+    }});
+    // 每排卡片出現時捲動到該排
+    document.querySelectorAll(".row-marker").forEach(function(marker) {{
+        setTimeout(function() {{
+            marker.scrollIntoView({{ behavior: "smooth", block: "end" }});
+        }}, Number(marker.dataset.delay));
+    }});
+    </script>
+    """
+    return final_html
@@ -0,0 +1,157 @@
+# ☁️ 背景同步：把本機資料庫的 sheet_outbox 送到 Google Sheet
+#
+# 抽卡只要寫進本機資料庫就回應學生；這裡的背景執行緒把同一個工作表的待送項目合併成一次寫入，
+# 失敗時以指數退避重試，重試 MAX_ATTEMPTS 次仍失敗的項目、或內容本身無法寫入的項目（例如進度表上
+# 找不到的學號）移到 sheet_outbox_dead 並記錄在 log，不會一直擋住同一個工作表的其他項目。
+# 佇列存在 SQLite 內，程式重啟後會接著送。
+# 這個執行緒的 Google Sheet 呼叫在配額排程中享有最高優先順序（見 cardpack/quota.py）。
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from cardpack.gsheets import PROGRESS_SHEET, append_student_rows, upsert_rows
+from cardpack.progress import progress_index
+from cardpack.quota import HIGH, sheets_priority
+from cardpack.rank_history import RANK_SNAPSHOT_HEADER
+
+POLL_INTERVAL = 1.0
+BASE_BACKOFF = 2.0
+MAX_BACKOFF = 300.0
+MAX_ATTEMPTS = 20  # 約 1 小時的重試
+
+logger = logging.getLogger(__name__)
+
+
+# 📅 排入一筆進度表抽卡日期更新
+def enqueue_progress_date(ledger, student_id, column, value):
+    ledger.enqueue("progress_date", PROGRESS_SHEET, {"學號": student_id, "欄位": column, "日期": value})
+    progress_index.set_local(student_id, column, value)
+
+
+# 還沒寫回進度表的抽卡日期 {欄位名稱: 日期}，讓資格檢查不會讀到舊資料
+def pending_progress_dates(ledger, student_id):
+    dates = {}
+    for payload in ledger.pending_payloads("progress_date", PROGRESS_SHEET):
+        if payload["學號"] == student_id:
+            dates[payload["欄位"]] = payload["日期"]
+    return dates
+
+
+# 送出同一個工作表的項目（entries: [(id, payload), ...]），回傳無法寫入、應放棄的項目 id
+def _send(spreadsheet, kind, worksheet, entries):
+    if kind == "append":
+        rows = [row for _, payload in entries for row in payload]
+        if rows:
+            append_student_rows(spreadsheet, worksheet, rows)
+        return []
+    if kind == "rank_snapshot":
+        # 同一天只需要寫最新（合併後）的快照；分頁上已有該日期的列時覆寫，不再多一列
+        latest = OrderedDict()
+        for _, payload in entries:
+            for snapshot_date, ranks in payload:
+                latest[snapshot_date] = ranks
+        upsert_rows(spreadsheet, worksheet, RANK_SNAPSHOT_HEADER, [[d, r] for d, r in latest.items()])
+        return []
+    if kind == "progress_date":
+        # 同一位學生、同一欄位只需要寫最新的日期
+        latest = OrderedDict()
+        ids = {}
+        for item_id, payload in entries:
+            key = (payload["學號"], payload["欄位"])
+            latest[key] = payload["日期"]
+            ids.setdefault(key, []).append(item_id)
+        skipped = progress_index.write_dates(spreadsheet, [(sid, col, value) for (sid, col), value in latest.items()])
+        rejected = []
+        for sid, col, value in skipped:
+            logger.warning("進度表找不到 %s 的「%s」欄位，放棄寫入抽卡日期 %s", sid, col, value)
+            rejected.extend(ids[(sid, col)])
+        return rejected
+    raise ValueError(f"未知的同步項目：{kind}")
+
+
+# 送出一輪佇列，回傳成功送出的項目數
+def replicate_once(ledger, spreadsheet):
+    groups = OrderedDict()
+    for item_id, kind, worksheet, payload, attempts, next_attempt in ledger.outbox_items():
+        groups.setdefault((kind, worksheet), []).append((item_id, payload, attempts, next_attempt))
+
+    now = time.time()
+    sent = 0
+    for (kind, worksheet), entries in groups.items():
+        # 同一個工作表的最早一筆還在等待重試時，後面的也先不送，避免順序錯亂
+        if entries[0][3] > now:
+            continue
+        ids = [entry[0] for entry in entries]
+        try:
+            rejected = _send(spreadsheet, kind, worksheet, [(entry[0], entry[1]) for entry in entries])
+        except Exception as e:
+            attempts = max(entry[2] for entry in entries) + 1
+            if attempts >= MAX_ATTEMPTS:
+                logger.error("同步到「%s」（%s）失敗 %d 次，放棄 %d 筆：%s", worksheet, kind, attempts, len(ids), e)
+                ledger.dead_letter_outbox(ids, e)
+            else:
+                ledger.defer_outbox(ids, min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (attempts - 1)), e)
+            continue
+        rejected = set(rejected)
+        if rejected:
+            ledger.dead_letter_outbox(sorted(rejected), f"「{worksheet}」找不到對應的儲存格")
+        ledger.complete_outbox([i for i in ids if i not in rejected])
+        sent += len(ids) - len(rejected)
+    return sent
+
+
+class ReplicationWorker(threading.Thread):
+    def __init__(self, ledger, spreadsheet_provider, interval=POLL_INTERVAL):
+        super().__init__(name="sheet-replication", daemon=True)
+        self.ledger = ledger
+        self.spreadsheet_provider = spreadsheet_provider
+        self.interval = interval
+        self.last_error = None
+        self._wake = threading.Event()
+
+    def notify(self):
+        self._wake.set()
+
+    def run(self):
+        # 學生的抽卡紀錄優先使用 Google Sheet 配額
+        with sheets_priority(HIGH):
+            self._loop()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                replicate_once(self.ledger, self.spreadsheet_provider())
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+# 啟動（或取得已啟動的）背景同步執行緒；整個程序只有一個
+def start_replication(ledger, spreadsheet_provider):
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ReplicationWorker(ledger, spreadsheet_provider)
+            _worker.start()
+        return _worker
+
+
+# 有新項目時叫醒背景執行緒，不必等到下一次輪詢
+def notify_replication():
+    if _worker is not None:
+        _worker.notify()
+
+
+def queue_depth(ledger):
+    return ledger.outbox_depth()
+
+
+def dead_letter_depth(ledger):
+    return ledger.dead_letter_depth()
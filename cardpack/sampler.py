@@ -0,0 +1,109 @@
+# 🎲 兩段式（稀有度 → 卡片）抽卡卡池
+#
+# 舊版卡池每一單位權重放一筆 (卡名, 稀有度)，普通卡一張就 150 筆，且每抽一次都重建。
+# 這裡每張卡只依「剩餘可抽張數」放入所屬稀有度的桶子，抽卡時用一個亂數：
+#   先依 稀有度權重 × 桶子大小 決定稀有度，再以同一個亂數在桶子內定位。
+# 每張卡被抽中的機率 = 稀有度權重 × 剩餘張數 / 總權重，與舊版 list 卡池完全相同。
+import random
+
+MAX_ALLOWED = {"普通": 2, "稀有": 2, "史詩": 2, "傳說": 1}
+RARITY_WEIGHTS = {"普通": 75, "稀有": 20, "史詩": 4, "傳說": 1}
+PACK_SIZE = 5
+
+
+class CardPool:
+    def __init__(self, cards, drawn_counts=None, max_allowed=None, rarity_weights=None, rng=None):
+        drawn_counts = drawn_counts or {}
+        max_allowed = MAX_ALLOWED if max_allowed is None else max_allowed
+        rarity_weights = RARITY_WEIGHTS if rarity_weights is None else rarity_weights
+
+        self.cards = []      # 卡片編號 → (卡名, 稀有度)
+        self.rarities = []   # 桶子順序對應的稀有度
+        self.weights = []    # 每個桶子的稀有度權重
+        self.buckets = []    # 每個桶子：每一張剩餘可抽的卡放一個卡片編號
+        bucket_index = {}
+
+        for name, rarity in cards:
+            key = (name, rarity)
+            remaining = max(0, max_allowed.get(rarity, 0) - drawn_counts.get(key, 0))
+            weight = rarity_weights.get(rarity, 0)
+            if remaining == 0 or weight <= 0:
+                continue
+            if rarity not in bucket_index:
+                bucket_index[rarity] = len(self.buckets)
+                self.rarities.append(rarity)
+                self.weights.append(weight)
+                self.buckets.append([])
+            card_id = len(self.cards)
+            self.cards.append(key)
+            self.buckets[bucket_index[rarity]].extend([card_id] * remaining)
+
+        self.total = sum(w * len(b) for w, b in zip(self.weights, self.buckets))
+        self._rng = rng or random
+
+    # 與舊版 list 卡池的 len() 相同：總權重
+    def __len__(self):
+        return self.total
+
+    # 用一個亂數定位：回傳 (桶子編號, 桶子內位置)
+    def _locate(self):
+        if self.total <= 0:
+            raise IndexError("卡池已空")
+        r = self._rng.randrange(self.total)
+        for i, (weight, bucket) in enumerate(zip(self.weights, self.buckets)):
+            span = weight * len(bucket)
+            if r < span:
+                return i, r // weight
+            r -= span
+        raise AssertionError("卡池總權重不一致")
+
+    # 抽一張（不扣除剩餘張數），O(稀有度數) = O(1)
+    def draw(self):
+        i, pos = self._locate()
+        return self.cards[self.buckets[i][pos]]
+
+    # 抽一張並扣除該卡一張剩餘張數（與桶子最後一格交換後移除），O(1)
+    def take(self):
+        i, pos = self._locate()
+        bucket = self.buckets[i]
+        card_id = bucket[pos]
+        bucket[pos] = bucket[-1]
+        bucket.pop()
+        self.total -= self.weights[i]
+        return self.cards[card_id]
+
+    def draw_many(self, k):
+        return [self.draw() for _ in range(k)]
+
+    # 每張卡的整數權重，可直接與 Counter(舊版 list 卡池) 比對
+    def card_weights(self):
+        result = {}
+        for weight, bucket in zip(self.weights, self.buckets):
+            for card_id in bucket:
+                key = self.cards[card_id]
+                result[key] = result.get(key, 0) + weight
+        return result
+
+
+# 🎴 抽卡工作階段：學生的已抽數量只讀一次、卡池只建一次，
+# 之後每抽一張都在記憶體內扣除剩餘張數，同一包或連續多包都不會超過每張卡的上限。
+class DrawSession:
+    def __init__(self, cards, drawn_counts=None, max_allowed=None, rarity_weights=None, rng=None):
+        self.pool = CardPool(cards, drawn_counts, max_allowed, rarity_weights, rng)
+        self.drawn = []
+
+    # 還有沒有卡可以抽
+    def exhausted(self):
+        return self.pool.total <= 0
+
+    # 抽 k 張；卡池抽完時回傳的張數會少於 k
+    def draw(self, k=1):
+        cards = []
+        while len(cards) < k and self.pool.total > 0:
+            cards.append(self.pool.take())
+        self.drawn.extend(cards)
+        return cards
+
+    # 連續抽 n 包，回傳每包的卡片清單
+    def packs(self, n, size=PACK_SIZE):
+        return [self.draw(size) for _ in range(n)]
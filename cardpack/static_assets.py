@@ -0,0 +1,106 @@
+# 🌐 圖片以可快取的靜態網址提供，不再每次 rerun 內嵌 base64
+#
+# 開啟 Streamlit 靜態檔案服務（.streamlit/config.toml：server.enableStaticServing）後，
+# static/ 底下的檔案會以 app/static/... 提供。這裡把圖片以內容 SHA-1 命名複製到 static/assets/，
+# 網址再加上 ?v=<hash>，圖片內容改變時網址也跟著改變。背景音樂（cardpack/audio.py）也用同樣的網址。
+#
+# Streamlit 1.65 的靜態檔案服務（Starlette）不會回傳 Cache-Control，所以正式啟動要透過
+# app.py / simulator_app.py（st.App），由 ImmutableAssetsMiddleware 對 app/static/assets/ 底下
+# 帶 ?v= 的回應加上 Cache-Control: public, max-age=31536000, immutable。
+# 直接 streamlit run 主程式時網址一樣可用，只是瀏覽器會依預設規則重新驗證。
+import base64
+import os
+import shutil
+import threading
+from urllib.parse import parse_qs
+
+from cardpack.images import file_sha1
+from cardpack.tracing import traced
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT_DIR, "static")
+ASSETS_DIR = os.path.join(STATIC_DIR, "assets")
+STATIC_URL_PREFIX = "app/static"
+ASSETS_URL_PATH = f"/{STATIC_URL_PREFIX}/assets/"
+IMMUTABLE_CACHE_CONTROL = b"public, max-age=31536000, immutable"
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+_published = {}
+_publish_lock = threading.Lock()
+
+
+# 是否使用靜態網址；未開啟靜態檔案服務時改回內嵌 data URI
+def static_serving_enabled():
+    try:
+        import streamlit as st
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+# 把檔案複製到 static/assets/（以內容命名），回傳帶版本的網址
+@traced("image.publish")
+def publish(path):
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    with _publish_lock:
+        cached = _published.get(key)
+        if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+
+    sha1 = file_sha1(path)
+    ext = os.path.splitext(path)[1].lower()
+    name = f"{sha1[:20]}{ext}"
+    target = os.path.join(ASSETS_DIR, name)
+    if not os.path.exists(target):
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+    url = f"{STATIC_URL_PREFIX}/assets/{name}?v={sha1[:12]}"
+
+    with _publish_lock:
+        _published[key] = ((stat.st_mtime_ns, stat.st_size), url)
+    return url
+
+
+@traced("image.base64")
+def data_uri(path):
+    mime = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+    with open(path, "rb") as f:
+        return f"data:{mime};base64," + base64.b64encode(f.read()).decode()
+
+
+# 🔗 圖片網址：靜態檔案服務開啟時回傳可快取網址，否則回傳 data URI
+def asset_url(path):
+    if static_serving_enabled():
+        return publish(path)
+    return data_uri(path)
+
+
+# 🗄️ ASGI middleware：帶版本參數的 static/assets 回應加上長效 Cache-Control（用法見 app.py）
+class ImmutableAssetsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or ASSETS_URL_PATH not in scope.get("path", ""):
+            return await self.app(scope, receive, send)
+        if "v" not in parse_qs(scope.get("query_string", b"").decode("latin-1")):
+            return await self.app(scope, receive, send)
+
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                headers.append((b"cache-control", IMMUTABLE_CACHE_CONTROL))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
@@ -0,0 +1,53 @@
+# 🎨 各頁共用的背景圖片
+#
+# background.png 原圖約 1.7 MB。這裡先壓縮成螢幕寬度的 WebP（cardpack/images.py，以內容命名快取在磁碟），
+# 再以靜態網址（cardpack/static_assets.py）放進一小段 CSS；CSS 字串在程序內快取，
+# 原圖沒變時每次 rerun 只送出這段幾百 bytes 的樣式，不重新讀檔或編碼。
+import os
+import threading
+
+from cardpack.images import derivative_path
+from cardpack.static_assets import asset_url, static_serving_enabled
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKGROUND_IMAGE_PATH = os.path.join(ROOT_DIR, "background.png")
+
+BACKGROUND_CSS = """
+<style>
+[data-testid="stApp"] {{
+    background-image: url("{url}");
+    background-size: cover;
+    background-position: center;
+    background-attachment: fixed;
+}}
+</style>
+"""
+
+_css = {}   # 原圖路徑 → ((mtime, 大小, 是否使用靜態網址), CSS)
+_css_lock = threading.Lock()
+
+
+def background_css(path=BACKGROUND_IMAGE_PATH):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size, static_serving_enabled())
+    with _css_lock:
+        cached = _css.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+    css = BACKGROUND_CSS.format(url=asset_url(derivative_path(path, "background")))
+    with _css_lock:
+        _css[path] = (key, css)
+    return css
+
+
+# 🖼️ 在目前頁面套用背景（每頁開頭呼叫一次）
+def apply_background(path=BACKGROUND_IMAGE_PATH):
+    import streamlit as st
+
+    css = background_css(path)
+    if css:
+        st.markdown(css, unsafe_allow_html=True)
@@ -0,0 +1,121 @@
+# ⏱️ 輕量計時：每次 rerun 一筆 trace，裡面記錄各個外部呼叫與耗時步驟（span）
+#
+# 頁面開頭呼叫 start_trace("頁面名稱")，之後同一個執行緒內的 with span("名稱"): 都會記到這筆 trace；
+# 背景執行緒（例如 Google Sheet 同步）沒有 trace，只計入各 span 名稱的整體統計。
+# 最近的 trace 與每個名稱最近的耗時都放在固定大小的環狀緩衝區（deque），只存在記憶體。
+# pages/5_效能監控.py 讀取這裡的資料顯示延遲分佈與每次抽卡的 API 呼叫次數。
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_TRACES = 500          # 保留最近幾筆 rerun
+MAX_SAMPLES = 2000        # 每個 span 名稱保留最近幾筆耗時
+SHEETS_PREFIX = "sheets."
+
+
+class Trace:
+    def __init__(self, page):
+        self.page = page
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._last = self._start
+        self.spans = []      # [(名稱, 開始秒數, 耗時秒數, 屬性), ...]
+        self.tags = set()
+
+    def add(self, name, start, duration, attrs):
+        self.spans.append((name, start - self._start, duration, attrs))
+        self._last = max(self._last, start + duration)
+
+    # 從 rerun 開始到最後一個 span 結束
+    @property
+    def elapsed(self):
+        return self._last - self._start
+
+    def count(self, prefix):
+        return sum(1 for name, _, _, _ in self.spans if name.startswith(prefix))
+
+
+class Tracer:
+    def __init__(self, max_traces=MAX_TRACES, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._traces = deque(maxlen=max_traces)
+        self._samples = {}   # 名稱 → deque[耗時秒數]
+        self._counts = {}    # 名稱 → 累計次數（含已被擠出緩衝區的）
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start_trace(self, page):
+        trace = Trace(page)
+        self._local.trace = trace
+        with self._lock:
+            self._traces.append(trace)
+        return trace
+
+    def current(self):
+        return getattr(self._local, "trace", None)
+
+    # 標記目前的 trace（例如 "draw" 表示這次 rerun 有抽卡）
+    def tag(self, tag):
+        trace = self.current()
+        if trace is not None:
+            trace.tags.add(tag)
+
+    def record(self, name, start, duration, attrs=None):
+        trace = self.current()
+        if trace is not None:
+            trace.add(name, start, duration, attrs or {})
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+            samples.append(duration)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    @contextmanager
+    def span(self, name, **attrs):
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except Exception as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, start, time.perf_counter() - start, attrs)
+
+    def traces(self):
+        with self._lock:
+            return list(self._traces)
+
+    # {名稱: (累計次數, [最近的耗時秒數...])}
+    def samples(self):
+        with self._lock:
+            return {name: (self._counts[name], list(samples)) for name, samples in self._samples.items()}
+
+    def reset(self):
+        with self._lock:
+            self._traces.clear()
+            self._samples.clear()
+            self._counts.clear()
+
+
+# 整個程序共用
+tracer = Tracer()
+start_trace = tracer.start_trace
+span = tracer.span
+tag_trace = tracer.tag
+
+
+# 包裝函式：每次呼叫都記一個 span
+def traced(name):
+    def decorator(fn):
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    return decorator
+
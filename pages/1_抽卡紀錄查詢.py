@@ -1,47 +1,34 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-from datetime import datetime
-import base64
-import os
+from cardpack.gsheets import get_spreadsheet, is_student_sheet, student_sheet_records
+from cardpack.ledger import get_ledger
+from cardpack.quota import SHEETS_BUSY_MESSAGE, is_sheets_busy
+from cardpack.theme import apply_background
+from cardpack.tracing import start_trace
 
 st.set_page_config(page_title="抽卡紀錄查詢")
+start_trace("抽卡紀錄查詢")
 
 # ✅ 背景圖片設定
-BACKGROUND_IMAGE_PATH = "background.png"
-if os.path.exists(BACKGROUND_IMAGE_PATH):
-    with open(BACKGROUND_IMAGE_PATH, "rb") as f:
-        bg_bytes = f.read()
-        bg_base64 = base64.b64encode(bg_bytes).decode()
-        page_bg = f"""
-        <style>
-        [data-testid="stApp"] {{
-            background-image: url("data:image/jpg;base64,{bg_base64}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-        }}
-        </style>
-        """
-        st.markdown(page_bg, unsafe_allow_html=True)
+apply_background()
 
 st.title("📚 查詢學生抽卡紀錄")
 
-# ✅ Google Sheet 授權連結
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = Credentials.from_service_account_info(st.secrets["gspread_json"], scopes=SCOPE)
-client = gspread.authorize(creds)
+# ✅ 共用的 Google Sheet（整個程序只授權、開啟一次，第一次用到時才連線）
+sheet = get_spreadsheet()
 
-# ✅ 連接到指定 Google Sheet
-SHEET_URL = "https://docs.google.com/spreadsheets/d/1-uKCq-8w_c3EUItPKV9NnEVkRAQiC5I5vW2BZr8NFfg/edit"
-sheet = client.open_by_url(SHEET_URL)
+# ✅ 從本機抽卡資料庫查詢（尚未匯入的學生會先從 Google Sheet 匯入一次）
+ledger = get_ledger()
 
 query_id = st.text_input("請輸入要查詢的學號：", key="query")
 if query_id:
     try:
-        worksheet = sheet.worksheet(query_id)
-        records = worksheet.get_all_records()
+        # 進度表、排行榜等系統分頁不是學生，不匯入本機資料庫
+        if not is_student_sheet(query_id):
+            raise LookupError(query_id)
+        if not ledger.ensure_student(query_id, lambda: student_sheet_records(sheet, query_id)):
+            raise LookupError(query_id)
+        records = ledger.student_records(query_id)
         if records:
             df = pd.DataFrame(records)
             st.subheader("📋 抽過的卡片統計：")
@@ -53,5 +40,7 @@ if query_id:
             st.dataframe(df, use_container_width=True)
         else:
             st.info("尚無抽卡紀錄。")
-    except:
-        st.warning("找不到該學號的紀錄，請確認是否輸入正確或已完成抽卡。")
\ No newline at end of file
+    except LookupError:
+        st.warning("找不到該學號的紀錄，請確認是否輸入正確或已完成抽卡。")
+    except Exception as e:
+        st.error(SHEETS_BUSY_MESSAGE if is_sheets_busy(e) else f"❌ 讀取抽卡紀錄失敗：{e}")
\ No newline at end of file
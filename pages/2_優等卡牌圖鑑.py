@@ -1,53 +1,37 @@
 import streamlit as st
-import pandas as pd
-import os
-from PIL import Image
-from io import BytesIO
-import base64
-import zipfile
+from cardpack.assets import card_art, report_missing_card_art
+from cardpack.catalog import get_catalog
+from cardpack.gallery_index import gallery_index
+from cardpack.images import derivative_path
+from cardpack.theme import apply_background
+from cardpack.tracing import span, start_trace
 
 st.set_page_config(page_title="優等卡牌圖鑑")
+start_trace("卡牌圖鑑")
 
 # ✅ 背景圖片設定
-BACKGROUND_IMAGE_PATH = "background.png"
-if os.path.exists(BACKGROUND_IMAGE_PATH):
-    with open(BACKGROUND_IMAGE_PATH, "rb") as f:
-        bg_bytes = f.read()
-        bg_base64 = base64.b64encode(bg_bytes).decode()
-        page_bg = f"""
-        <style>
-        [data-testid="stApp"] {{
-            background-image: url("data:image/jpg;base64,{bg_base64}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-        }}
-        </style>
-        """
-        st.markdown(page_bg, unsafe_allow_html=True)
+apply_background()
 
 st.title("🃏 優等卡牌圖鑑")
 
 
-# 載入卡牌資料
-cards_df = pd.read_excel("優等卡牌 的副本.xlsx", sheet_name="遊戲卡片")
-card_folder = "card_images"
-
-# 過濾主卡（學生、知識、武器）
-cards_df = cards_df[cards_df["類型"].isin(["學生卡", "知識卡", "武器卡"])]
-cards_df = cards_df.sort_values(by=["稀有度", "名稱"])
+# 載入卡牌資料（主卡：學生、知識、武器，已依稀有度、名稱排序）
+# 篩選／排序使用預先建立的查詢索引（每個卡牌資料版本建立一次，見 cardpack/gallery_index.py）
+catalog = get_catalog()
+index = gallery_index(catalog)
+missing_art = report_missing_card_art(catalog)
 
 # 🔍 搜尋與篩選功能
 with st.sidebar:
     st.header("🔎 搜尋與篩選")
     name_query = st.text_input("卡名關鍵字：")
-    rarities = sorted([r for r in cards_df["稀有度"].dropna().unique() if isinstance(r, str)])
+    rarities = index.options("稀有度")
     rarity_choice = st.selectbox("選擇稀有度：", ["全部"] + rarities)
-    types = sorted(cards_df["類型"].unique())
+    types = index.options("類型")
     type_choice = st.multiselect("卡牌類型：", options=types, default=types)
 
 # ✅ 新增：卡池分類
-    pool_options = sorted(cards_df["卡池分類"].dropna().unique()) if "卡池分類" in cards_df.columns else []
+    pool_options = index.options("卡池分類")
     pool_choice = st.selectbox("選擇卡池：", ["全部"] + pool_options) if pool_options else "全部"
 
 
@@ -59,37 +43,29 @@ with st.sidebar:
 
     kn_sort = st.selectbox("KN 排序方式", ["無排序", "由小到大", "由大到小"])
 
-    subjects = sorted(cards_df["科目"].dropna().unique())
+    subjects = index.options("科目")
     subject_choice = st.multiselect("科目篩選", options=subjects, default=subjects)
     subject_sort = st.selectbox("科目排序方式", ["不排序", "A → Z", "Z → A"])
 
-# 篩選與排序
-filter_changed = False
-
-if name_query:
-    cards_df = cards_df[cards_df["名稱"].str.contains(name_query, case=False, na=False)]
-    filter_changed = True
-if rarity_choice != "全部":
-    cards_df = cards_df[cards_df["稀有度"] == rarity_choice]
-    filter_changed = True
-if pool_choice != "全部" and "卡池分類" in cards_df.columns:
-    cards_df = cards_df[cards_df["卡池分類"] == pool_choice]
-    filter_changed = True
-
-
-cards_df = cards_df[cards_df["類型"].isin(type_choice)]
-cards_df = cards_df[(cards_df["KN"] >= min_kn) & (cards_df["KN"] <= max_kn)]
-cards_df = cards_df[cards_df["科目"].isin(subject_choice)]
-
-if kn_sort == "由小到大":
-    cards_df = cards_df.sort_values(by="KN", ascending=True)
-elif kn_sort == "由大到小":
-    cards_df = cards_df.sort_values(by="KN", ascending=False)
-
-if subject_sort == "A → Z":
-    cards_df = cards_df.sort_values(by="科目", ascending=True)
-elif subject_sort == "Z → A":
-    cards_df = cards_df.sort_values(by="科目", ascending=False)
+    if missing_art:
+        st.divider()
+        st.caption(f"⚠️ {len(missing_art)} 張卡片缺少圖片：" + "、".join(missing_art))
+
+# 篩選與排序（bitset 交集 + 預先排序好的順序）
+filter_changed = bool(name_query) or rarity_choice != "全部" or pool_choice != "全部"
+
+SORT_ORDERS = {"由小到大": "asc", "由大到小": "desc", "A → Z": "asc", "Z → A": "desc"}
+with span("gallery.query"):
+    results = index.query(
+        name_query=name_query,
+        rarity=None if rarity_choice == "全部" else rarity_choice,
+        pool=None if pool_choice == "全部" else pool_choice,
+        types=type_choice,
+        kn_range=(min_kn, max_kn),
+        subjects=subject_choice,
+        kn_order=SORT_ORDERS.get(kn_sort),
+        subject_order=SORT_ORDERS.get(subject_sort),
+    )
 
 if "page" not in st.session_state:
     st.session_state.page = 1
@@ -98,7 +74,7 @@ if filter_changed:
 
 # 分頁設定
 cards_per_page = 9
-total_cards = len(cards_df)
+total_cards = len(results)
 total_pages = (total_cards - 1) // cards_per_page + 1
 
 # 分頁按鈕與跳頁功能
@@ -121,7 +97,7 @@ with col2:
 
 start_idx = (st.session_state.page - 1) * cards_per_page
 end_idx = start_idx + cards_per_page
-cards_page_df = cards_df.iloc[start_idx:end_idx]
+cards_page = results.page(start_idx, end_idx)
 
 # 樣式
 st.markdown("""
@@ -169,22 +145,13 @@ main > div:has(.card-gallery) {
 
 # 顯示卡片
 cols = st.columns(3)
-for idx, (_, row) in enumerate(cards_page_df.iterrows()):
+for idx, row in enumerate(cards_page):
     name = row["名稱"]
     rarity = row["稀有度"]
-    img_path = None
-    for ext in [".png", ".jpg", ".jpeg", ".webp"]:
-        try_path = os.path.join(card_folder, f"{name}{ext}")
-        if os.path.exists(try_path):
-            img_path = try_path
-            break
-
+    img_path = card_art.path(name)
     if img_path:
-        with open(img_path, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode()
-
         with cols[idx % 3]:
-            st.image(f"data:image/png;base64,{img_b64}", use_container_width=True)
+            st.image(derivative_path(img_path, "gallery"), use_container_width=True)
             st.markdown(
                 f"""
                 <div style='text-align: center; color: gold; font-weight: bold;'>{name}（{rarity}）</div>
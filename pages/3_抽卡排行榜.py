@@ -1,97 +1,71 @@
-import os
-from PIL import Image
-from io import BytesIO
-import base64
-import zipfile
 from datetime import datetime, timedelta
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
+from cardpack.bulk_fetch import audit_leaderboard, bootstrap_ledger, import_all_student_sheets
+from cardpack.gsheets import get_spreadsheet, is_student_sheet
+from cardpack.ledger import get_ledger
+from cardpack.quota import SHEETS_BUSY_MESSAGE, is_sheets_busy
+from cardpack.rank_history import migrate_legacy_rank_history, ranks_on, record_ranks
+from cardpack.replication import notify_replication, start_replication
+from cardpack.theme import apply_background
+from cardpack.tracing import start_trace
 
 st.set_page_config(page_title="抽卡排行榜", layout="wide")
+start_trace("抽卡排行榜")
 
 # ✅ 背景圖片設定
-BACKGROUND_IMAGE_PATH = "background.png"
-if os.path.exists(BACKGROUND_IMAGE_PATH):
-    with open(BACKGROUND_IMAGE_PATH, "rb") as f:
-        bg_bytes = f.read()
-        bg_base64 = base64.b64encode(bg_bytes).decode()
-        page_bg = f"""
-        <style>
-        [data-testid="stApp"] {{
-            background-image: url("data:image/jpg;base64,{bg_base64}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-        }}
-        </style>
-        """
-        st.markdown(page_bg, unsafe_allow_html=True)
-
-
-# Google Sheet 授權與連結
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = Credentials.from_service_account_info(st.secrets["gspread_json"], scopes=SCOPE)
-client = gspread.authorize(creds)
-
-SHEET_URL = "https://docs.google.com/spreadsheets/d/1-uKCq-8w_c3EUItPKV9NnEVkRAQiC5I5vW2BZr8NFfg/edit"
-sheet = client.open_by_url(SHEET_URL)
+apply_background()
+
+
+# 共用的 Google Sheet（整個程序只授權、開啟一次，第一次用到時才連線）
+sheet = get_spreadsheet()
 
 st.title("🏆 優等學院 抽卡排行榜")
 
+# ✅ 排行榜統計改從本機抽卡資料庫讀取
+ledger = get_ledger()
+start_replication(ledger, lambda: sheet)
+
+# 剛部署時本機資料庫是空的：第一次開啟頁面先從 Google Sheet 匯入所有學生（失敗時下次開啟再試）
+try:
+    with st.spinner("第一次使用，正在從 Google Sheet 匯入抽卡紀錄..."):
+        bootstrap_ledger(sheet, ledger)
+except Exception as e:
+    st.warning(SHEETS_BUSY_MESSAGE if is_sheets_busy(e) else f"⚠️ 無法從 Google Sheet 匯入抽卡紀錄：{e}")
+
+if st.button("🔄 從 Google Sheet 匯入尚未同步的學生"):
+    imported = import_all_student_sheets(sheet, ledger)
+    st.success(f"已匯入 {imported} 位學生的抽卡紀錄。")
+
+if st.button("🔍 核對 Google Sheet 與本機統計"):
+    mismatches = audit_leaderboard(sheet, ledger)
+    if mismatches:
+        st.warning(f"有 {len(mismatches)} 位學生的總抽卡數不一致（可能仍在背景同步中）。")
+        st.dataframe(pd.DataFrame(mismatches), use_container_width=True)
+    else:
+        st.success("✅ Google Sheet 與本機統計一致。")
+
 if st.button("載入排行榜"):
-    all_worksheets = sheet.worksheets()
-    summary = []
-    for ws in all_worksheets:
-        if ws.title in ["進度表", "排行榜記錄"] or ws.title.lower().startswith("test"):
-            continue
-        records = ws.get_all_records()
-        df = pd.DataFrame(records)
-        total_cards = len(df)
-        if "稀有度" in df.columns:
-            legend_count = df[df["稀有度"] == "傳說"].shape[0]
-        else:
-            legend_count = 0
-        if "稀有度" in df.columns:
-            epic_count = df[df["稀有度"] == "史詩"].shape[0]
-            rare_count = df[df["稀有度"] == "稀有"].shape[0]
-            normal_count = df[df["稀有度"] == "普通"].shape[0]
-            unique_cards = df["卡名"].nunique() if "卡名" in df.columns else 0
-        else:
-            epic_count = rare_count = normal_count = unique_cards = 0
-
-        summary.append({
-            "學號": ws.title,
-            "總抽卡數": total_cards,
-            "卡片種類數": unique_cards,
-            "傳說卡數": legend_count,
-            "史詩卡數": epic_count,
-            "稀有卡數": rare_count,
-            "普通卡數": normal_count
-        })
+    summary = [row for row in ledger.leaderboard() if is_student_sheet(row["學號"])]
 
     if summary:
         summary_df = pd.DataFrame(summary)
         summary_df = summary_df.sort_values(by=["傳說卡數", "總抽卡數"], ascending=False).reset_index(drop=True)
 
-        # 名次箭頭比較資料來源：昨日名次
+        # 名次箭頭比較資料來源：昨日名次（本機每日快照，以日期查詢）
+        # 舊紀錄匯入失敗時照常顯示排行榜（只是可能沒有昨日名次），下次載入再試
         try:
-            rank_ws = sheet.worksheet("排行榜記錄")
-        except:
-            rank_ws = sheet.add_worksheet(title="排行榜記錄", rows=1000, cols=10)
-            rank_ws.append_row(["日期", "學號", "名次"])
-
+            migrate_legacy_rank_history(sheet, ledger)
+        except Exception as e:
+            st.warning(SHEETS_BUSY_MESSAGE if is_sheets_busy(e) else f"⚠️ 無法匯入舊的排行榜記錄：{e}")
         today_str = datetime.now().strftime("%Y-%m-%d")
         yesterday_str = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-        past_records = rank_ws.get_all_records()
-        yesterday_ranks = {
-            r["學號"]: int(r["名次"]) for r in past_records if r["日期"] == yesterday_str
-        }
+        yesterday_ranks = ranks_on(ledger, yesterday_str)
 
         # 插入名次與箭頭
         badges = ["🥇", "🥈", "🥉"]
         rank_col = []
+        today_ranks = {}
         for i, row in summary_df.iterrows():
             curr_rank = i + 1
             student_id = row["學號"]
@@ -104,13 +78,11 @@ if st.button("載入排行榜"):
                 arrow = " ⏺"
             badge = badges[i] if i < 3 else str(curr_rank)
             rank_col.append(badge + arrow)
+            today_ranks[student_id] = curr_rank
 
-            # ✅ 自動寫入今日名次紀錄（避免重複）
-            already_logged = any(
-                r["日期"] == today_str and r["學號"] == student_id for r in past_records
-            )
-            if not already_logged:
-                rank_ws.append_row([today_str, student_id, curr_rank])
+        # ✅ 自動寫入今日名次紀錄（已記錄的學生不重複），一次寫入、背景同步
+        if record_ranks(ledger, today_str, today_ranks):
+            notify_replication()
 
         summary_df.insert(0, "名次", rank_col)
         
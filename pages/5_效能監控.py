@@ -0,0 +1,122 @@
+# ⏱️ 效能監控（管理用）：最近 rerun 的耗時、各步驟延遲分佈、每次抽卡的 Google Sheet 呼叫次數
+import numpy as np
+import pandas as pd
+import streamlit as st
+from datetime import datetime
+from cardpack.admin import require_admin
+from cardpack.quota import scheduler
+from cardpack.tracing import SHEETS_PREFIX, tracer
+
+st.set_page_config(page_title="效能監控", layout="wide")
+st.title("⏱️ 效能監控")
+
+# 🔒 只限管理者（包含清除紀錄）
+require_admin()
+
+st.caption("資料只存在這個伺服器程序的記憶體中（最近的 rerun 與每個步驟最近的耗時），重新啟動後會清空。")
+
+if st.sidebar.button("🧹 清除紀錄"):
+    tracer.reset()
+    st.rerun()
+
+# ✅ Google Sheet 配額餘裕（讀取、寫入各一個權杖桶，見 cardpack/quota.py）
+st.subheader("🚦 Google Sheet 配額")
+headroom = scheduler.headroom()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("可用讀取次數", f"{headroom['read']['available']:.0f} / {headroom['read']['per_minute']}")
+col2.metric("可用寫入次數", f"{headroom['write']['available']:.0f} / {headroom['write']['per_minute']}")
+col3.metric("429 暫停剩餘", f"{headroom['cooldown_s']} 秒")
+col4.metric("收到 429 次數", headroom["stats"]["quota_errors"])
+waiting = pd.DataFrame({kind: headroom[kind]["waiting"] for kind in ["read", "write"]}).rename(columns={"read": "等待讀取", "write": "等待寫入"})
+st.dataframe(waiting, use_container_width=True)
+st.caption(f"累計 {headroom['stats']['calls']} 次呼叫，其中 {headroom['stats']['waited']} 次曾等待配額、"
+           f"{headroom['stats']['timeouts']} 次等待逾時。")
+
+traces = [t for t in tracer.traces() if t.spans]
+samples = tracer.samples()
+
+if not traces and not samples:
+    st.info("目前還沒有紀錄，請先到其他頁面操作。")
+    st.stop()
+
+
+# ✅ 最近的 rerun
+st.subheader("🕒 最近的 rerun")
+pages = sorted({t.page for t in traces})
+selected_pages = st.multiselect("頁面", pages, default=pages)
+only_draws = st.checkbox("只顯示有抽卡的 rerun", value=False)
+
+rows = []
+for t in reversed(traces):
+    if t.page not in selected_pages or (only_draws and "draw" not in t.tags):
+        continue
+    slowest = max(t.spans, key=lambda s: s[2])
+    rows.append({
+        "時間": datetime.fromtimestamp(t.started_at).strftime("%H:%M:%S"),
+        "頁面": t.page,
+        "抽卡": "✅" if "draw" in t.tags else "",
+        "總耗時 (ms)": round(t.elapsed * 1000, 1),
+        "Sheets 呼叫": t.count(SHEETS_PREFIX),
+        "步驟數": len(t.spans),
+        "最慢步驟": f"{slowest[0]}（{slowest[2] * 1000:.0f} ms）",
+    })
+st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+# 🔍 單一 rerun 的步驟時間軸
+if rows:
+    visible = [t for t in reversed(traces) if t.page in selected_pages and (not only_draws or "draw" in t.tags)]
+    labels = [f"{r['時間']} {r['頁面']}（{r['總耗時 (ms)']} ms）" for r in rows]
+    picked = st.selectbox("查看步驟", range(len(labels)), format_func=lambda i: labels[i])
+    detail = pd.DataFrame([
+        {"步驟": name, "開始 (ms)": round(start * 1000, 1), "耗時 (ms)": round(duration * 1000, 1),
+         "附註": ", ".join(f"{k}={v}" for k, v in attrs.items())}
+        for name, start, duration, attrs in visible[picked].spans
+    ])
+    st.dataframe(detail, use_container_width=True, hide_index=True)
+
+
+# ✅ 每次抽卡的 Google Sheet 呼叫
+st.subheader("🎴 每次抽卡的 Google Sheet 呼叫")
+draw_traces = [t for t in traces if "draw" in t.tags]
+if draw_traces:
+    col1, col2, col3 = st.columns(3)
+    totals = [t.count(SHEETS_PREFIX) for t in draw_traces]
+    col1.metric("抽卡次數", len(draw_traces))
+    col2.metric("平均呼叫次數", f"{np.mean(totals):.1f}")
+    col3.metric("最多呼叫次數", max(totals))
+    method_counts = {}
+    for t in draw_traces:
+        for name, _, _, _ in t.spans:
+            if name.startswith(SHEETS_PREFIX):
+                method = name[len(SHEETS_PREFIX):]
+                method_counts[method] = method_counts.get(method, 0) + 1
+    if method_counts:
+        st.bar_chart(pd.Series({m: c / len(draw_traces) for m, c in method_counts.items()}, name="每次抽卡平均呼叫次數"))
+    else:
+        st.success("抽卡時沒有直接呼叫 Google Sheet（全部交給背景同步）。")
+else:
+    st.info("還沒有抽卡紀錄。")
+
+
+# ✅ 各步驟延遲分佈
+st.subheader("📊 各步驟延遲分佈")
+summary = []
+for name, (count, durations) in sorted(samples.items()):
+    ms = np.array(durations) * 1000
+    summary.append({
+        "步驟": name,
+        "累計次數": count,
+        "P50 (ms)": round(float(np.percentile(ms, 50)), 1),
+        "P90 (ms)": round(float(np.percentile(ms, 90)), 1),
+        "P99 (ms)": round(float(np.percentile(ms, 99)), 1),
+        "最大 (ms)": round(float(ms.max()), 1),
+    })
+st.caption("累計次數包含背景同步執行緒的呼叫；百分位數為每個步驟最近的紀錄。")
+st.dataframe(pd.DataFrame(summary), use_container_width=True, hide_index=True)
+
+if samples:
+    name = st.selectbox("直方圖", sorted(samples), index=0)
+    ms = np.array(samples[name][1]) * 1000
+    counts, edges = np.histogram(ms, bins=min(30, max(5, len(ms) // 5)))
+    histogram = pd.DataFrame({"耗時 (ms)": np.round(edges[:-1], 1), "次數": counts})
+    st.bar_chart(histogram, x="耗時 (ms)", y="次數")
@@ -0,0 +1,10 @@
+# 🚀 抽卡模擬器的啟動入口：streamlit run simulator_app.py（與 app.py 相同，只是換成模擬器主程式）
+import streamlit as st
+from starlette.middleware import Middleware
+
+from cardpack.static_assets import ImmutableAssetsMiddleware
+
+app = st.App("抽卡模擬器.py", middleware=[Middleware(ImmutableAssetsMiddleware)])
+
+if __name__ == "__main__":
+    app.run()
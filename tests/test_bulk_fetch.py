@@ -0,0 +1,60 @@
+# 📦 批次讀取學生分頁：匯入本機資料庫與核對排行榜（FakeSpreadsheet）
+from cardpack.bulk_fetch import BATCH_SIZE, audit_leaderboard, fetch_student_sheets, import_all_student_sheets
+from cardpack.fake_sheets import PROGRESS_HEADER, FakeSpreadsheet
+from cardpack.gsheets import STUDENT_SHEET_HEADER
+from cardpack.ledger import DrawLedger
+
+N_STUDENTS = BATCH_SIZE + 5
+
+
+def student_rows(i):
+    sid = f"s{i:03d}"
+    return [STUDENT_SHEET_HEADER] + [[sid, f"卡{j}", "傳說" if j == 0 else "普通", f"t{j}"] for j in range(i % 4)]
+
+
+def make_spreadsheet():
+    sheets = {f"s{i:03d}": student_rows(i) for i in range(N_STUDENTS)}
+    sheets["進度表"] = [PROGRESS_HEADER]
+    sheets["test-老師"] = [STUDENT_SHEET_HEADER, ["x", "卡", "普通", "t"]]
+    # 欄位順序不同、含空白列的分頁
+    sheets["s900"] = [["抽取時間", "稀有度", "卡名", "學號"], ["t0", "史詩", "龍息", "s900"], ["", "", "", ""]]
+    return FakeSpreadsheet(sheets)
+
+
+def test_import_reads_in_batches_and_skips_system_sheets(tmp_path):
+    spreadsheet = make_spreadsheet()
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+
+    reads = spreadsheet.stats()["read"]
+    assert import_all_student_sheets(spreadsheet, ledger) == N_STUDENTS + 1
+    # 一次列出分頁 + 每 BATCH_SIZE 個分頁一次 batchGet
+    assert spreadsheet.stats()["read"] - reads == 1 + 2
+
+    assert "進度表" not in ledger.student_ids() and "test-老師" not in ledger.student_ids()
+    assert ledger.student_records("s900") == [{"學號": "s900", "卡名": "龍息", "稀有度": "史詩", "抽取時間": "t0"}]
+    totals = {row["學號"]: row["總抽卡數"] for row in ledger.leaderboard()}
+    assert totals == {f"s{i:03d}": i % 4 for i in range(N_STUDENTS) if i % 4} | {"s900": 1}
+
+    # 已匯入的學生不再讀取分頁內容
+    assert import_all_student_sheets(spreadsheet, ledger) == 0
+
+
+def test_audit_reports_mismatched_totals(tmp_path):
+    spreadsheet = make_spreadsheet()
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+    import_all_student_sheets(spreadsheet, ledger)
+    assert audit_leaderboard(spreadsheet, ledger) == []
+
+    spreadsheet.worksheet("s001").append_rows([["s001", "卡9", "普通", "t9"]])  # 還沒匯入本機的紀錄
+    ledger.record_draws("s002", [("卡8", "普通")], "t8")                         # 還沒同步到 Google Sheet
+    assert audit_leaderboard(spreadsheet, ledger) == [
+        {"學號": "s001", "Google Sheet": 2, "本機": 1},
+        {"學號": "s002", "Google Sheet": 2, "本機": 3},
+    ]
+
+
+def test_fetch_student_sheets_dataframe():
+    df = fetch_student_sheets(make_spreadsheet(), titles=["s003", "s900"], batch_size=1)
+    assert list(df.columns) == STUDENT_SHEET_HEADER
+    assert df["學號"].tolist() == ["s003", "s003", "s003", "s900"]
+    assert df["卡名"].tolist() == ["卡0", "卡1", "卡2", "龍息"]
@@ -0,0 +1,56 @@
+# 🗂️ DrawCountCache：讀取期間有存檔時不可以快取到少算的張數
+import pytest
+
+from cardpack.draw_cache import DrawCountCache
+
+CARD = ("火球", "普通")
+
+
+def test_record_during_load_triggers_reload():
+    cache = DrawCountCache()
+    stored = {CARD: 1}
+    calls = []
+
+    def loader():
+        calls.append(dict(stored))
+        if len(calls) == 1:
+            # 另一個工作階段在讀取完成前存檔：資料庫多一張，快取尚未建立
+            stored[CARD] += 1
+            cache.record("s1", [CARD])
+        return calls[-1]
+
+    assert cache.get("s1", loader) == {CARD: 2}
+    assert len(calls) == 2
+    assert cache.get("s1", lambda: pytest.fail("應該已快取")) == {CARD: 2}
+
+
+def test_invalidate_during_load_triggers_reload():
+    cache = DrawCountCache()
+    results = iter([{CARD: 1}, {CARD: 0}])
+
+    def loader():
+        value = next(results)
+        if value[CARD] == 1:
+            cache.invalidate("s1")
+        return value
+
+    assert cache.get("s1", loader) == {CARD: 0}
+
+
+def test_loader_error_is_raised_and_not_cached():
+    cache = DrawCountCache()
+
+    def failing():
+        raise RuntimeError("配額")
+
+    with pytest.raises(RuntimeError):
+        cache.get("s1", failing)
+    assert cache._loading == {}
+    assert cache.get("s1", lambda: {CARD: 1}) == {CARD: 1}
+
+
+def test_record_updates_cached_counts():
+    cache = DrawCountCache()
+    cache.get("s1", lambda: {CARD: 1})
+    cache.record("s1", [CARD, ("冰箭", "普通")])
+    assert cache.get("s1", lambda: pytest.fail("應該已快取")) == {CARD: 2, ("冰箭", "普通"): 1}
@@ -0,0 +1,89 @@
+# 🗂️ 圖鑑查詢索引與原本的 pandas 篩選／排序結果相同
+import random
+
+import numpy as np
+import pandas as pd
+
+from cardpack.gallery_index import GalleryIndex
+
+RARITIES = ["普通", "稀有", "史詩", "傳說"]
+POOLS = ["基礎包", "擴充包", None]
+TYPES = ["學生卡", "知識卡", "武器卡"]
+SUBJECTS = ["國文", "數學", "英文", "自然", None]
+SORTS = [None, "asc", "desc"]
+
+
+def make_cards(n=200, seed=7):
+    rng = random.Random(seed)
+    cards = pd.DataFrame({
+        "名稱": [f"{rng.choice('火冰雷光暗')}{rng.choice(['球', '箭', 'Shield', 'sword'])}{i}" for i in range(n)],
+        "稀有度": [rng.choice(RARITIES) for _ in range(n)],
+        "卡池分類": [rng.choice(POOLS) for _ in range(n)],
+        "類型": [rng.choice(TYPES) for _ in range(n)],
+        "KN": [rng.choice([np.nan] + list(range(11))) for _ in range(n)],
+        "科目": [rng.choice(SUBJECTS) for _ in range(n)],
+    })
+    return cards.sort_values(by=["稀有度", "名稱"]).reset_index(drop=True)
+
+
+# 原本圖鑑頁的做法（卡名為字面比對；排序用穩定排序，與索引相同）
+def pandas_query(cards, name_query, rarity, pool, types, kn_range, subjects, kn_order, subject_order):
+    df = cards
+    if name_query:
+        df = df[df["名稱"].str.contains(name_query, case=False, na=False, regex=False)]
+    if rarity is not None:
+        df = df[df["稀有度"] == rarity]
+    if pool is not None:
+        df = df[df["卡池分類"] == pool]
+    df = df[df["類型"].isin(types)]
+    df = df[(df["KN"] >= kn_range[0]) & (df["KN"] <= kn_range[1])]
+    df = df[df["科目"].isin(subjects)]
+    if kn_order:
+        df = df.sort_values(by="KN", ascending=kn_order == "asc", kind="stable")
+    if subject_order:
+        df = df.sort_values(by="科目", ascending=subject_order == "asc", kind="stable")
+    return df["名稱"].tolist()
+
+
+def random_query(rng):
+    low = rng.randint(0, 10)
+    return dict(
+        name_query=rng.choice(["", "", "火", "s", "SHIELD", "1", "球2"]),
+        rarity=rng.choice([None] + RARITIES),
+        pool=rng.choice([None, "基礎包", "擴充包"]),
+        types=rng.sample(TYPES, rng.randint(0, 3)),
+        kn_range=(low, rng.randint(low, 10)),
+        subjects=rng.sample(SUBJECTS[:-1], rng.randint(0, 4)),
+        kn_order=rng.choice(SORTS),
+        subject_order=rng.choice(SORTS),
+    )
+
+
+def test_queries_match_pandas():
+    cards = make_cards()
+    index = GalleryIndex(cards)
+    rng = random.Random(11)
+    for _ in range(300):
+        query = random_query(rng)
+        expected = pandas_query(cards, **query)
+        result = index.query(**query)
+        assert len(result) == len(expected), query
+        assert [row["名稱"] for row in result.page(0, len(result))] == expected, query
+
+
+def test_pages_slice_the_ordered_result():
+    cards = make_cards()
+    index = GalleryIndex(cards)
+    query = dict(name_query="", rarity=None, pool=None, types=TYPES, kn_range=(0, 10),
+                 subjects=SUBJECTS[:-1], kn_order="desc", subject_order="asc")
+    expected = pandas_query(cards, **query)
+    result = index.query(**query)
+    pages = [row["名稱"] for start in range(0, len(result), 9) for row in result.page(start, start + 9)]
+    assert pages == expected
+
+
+def test_options_skip_missing_values():
+    index = GalleryIndex(make_cards())
+    assert index.options("稀有度") == sorted(RARITIES)
+    assert index.options("卡池分類") == ["基礎包", "擴充包"]
+    assert index.options("科目") == sorted(SUBJECTS[:-1])
@@ -0,0 +1,51 @@
+# 📄 append_rows / upsert_rows 的標題列處理（FakeSpreadsheet）
+from cardpack.fake_sheets import FakeAPIError, FakeSpreadsheet
+from cardpack.gsheets import append_rows, upsert_rows
+
+HEADER = ["學號", "卡名", "稀有度", "抽取時間"]
+
+
+# 新建立的分頁第一次 append_rows 失敗（例如逾時）
+def fail_first_append(spreadsheet):
+    new_worksheet = spreadsheet._new_worksheet
+
+    def create(title, rows=None):
+        worksheet = new_worksheet(title, rows)
+        append = worksheet.append_rows
+
+        def fail_once(rows, **kwargs):
+            worksheet.append_rows = append
+            raise FakeAPIError(500, "寫入失敗")
+
+        worksheet.append_rows = fail_once
+        return worksheet
+
+    spreadsheet._new_worksheet = create
+
+
+def test_new_sheet_gets_header():
+    spreadsheet = FakeSpreadsheet({})
+    append_rows(spreadsheet, "s1", HEADER, [["s1", "火球", "普通", "t1"]])
+    append_rows(spreadsheet, "s1", HEADER, [["s1", "冰箭", "普通", "t2"]])
+    assert spreadsheet.worksheet("s1").get_all_values() == [
+        HEADER, ["s1", "火球", "普通", "t1"], ["s1", "冰箭", "普通", "t2"]]
+
+
+def test_header_written_on_retry_after_failed_first_append():
+    spreadsheet = FakeSpreadsheet({})
+    fail_first_append(spreadsheet)
+    try:
+        append_rows(spreadsheet, "s1", HEADER, [["s1", "火球", "普通", "t1"]])
+    except FakeAPIError:
+        pass
+    append_rows(spreadsheet, "s1", HEADER, [["s1", "火球", "普通", "t1"]])
+    append_rows(spreadsheet, "s1", HEADER, [["s1", "冰箭", "普通", "t2"]])
+    assert spreadsheet.worksheet("s1").get_all_values() == [
+        HEADER, ["s1", "火球", "普通", "t1"], ["s1", "冰箭", "普通", "t2"]]
+
+
+def test_upsert_rows_overwrites_existing_keys():
+    spreadsheet = FakeSpreadsheet({})
+    upsert_rows(spreadsheet, "快照", ["日期", "資料"], [["d1", "a"]])
+    upsert_rows(spreadsheet, "快照", ["日期", "資料"], [["d1", "b"], ["d2", "c"]])
+    assert spreadsheet.worksheet("快照").get_all_values() == [["日期", "資料"], ["d1", "b"], ["d2", "c"]]
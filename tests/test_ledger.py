@@ -0,0 +1,85 @@
+# 🗃️ DrawLedger：學生第一次查詢時由 Google Sheet 匯入（FakeSpreadsheet）
+from cardpack.fake_sheets import FakeSpreadsheet
+from cardpack.gsheets import STUDENT_SHEET_HEADER, student_sheet_records
+from cardpack.ledger import DrawLedger
+
+SHEETS = {
+    "s1": [STUDENT_SHEET_HEADER,
+           ["s1", "火球", "普通", "2026-10-01 10:00:00"],
+           ["s1", "神諭", "傳說", "2026-10-01 10:00:01"],
+           ["s1", "火球", "普通", "2026-10-01 10:00:02"]],
+}
+
+
+def test_ensure_student_imports_once(tmp_path):
+    spreadsheet = FakeSpreadsheet(SHEETS)
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+    fetch = lambda: student_sheet_records(spreadsheet, "s1")
+
+    assert ledger.ensure_student("s1", fetch)
+    reads = spreadsheet.stats()["read"]
+    assert ledger.ensure_student("s1", fetch)
+    assert spreadsheet.stats()["read"] == reads  # 已匯入的學生不再讀取 Google Sheet
+
+    assert [(r["卡名"], r["抽取時間"]) for r in ledger.student_records("s1")] == [
+        ("火球", "2026-10-01 10:00:00"), ("神諭", "2026-10-01 10:00:01"), ("火球", "2026-10-01 10:00:02")]
+    assert ledger.drawn_counts("s1") == {("火球", "普通"): 2, ("神諭", "傳說"): 1}
+
+
+def test_ensure_student_without_sheet(tmp_path):
+    spreadsheet = FakeSpreadsheet(SHEETS)
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+
+    assert not ledger.ensure_student("s9", lambda: student_sheet_records(spreadsheet, "s9"))
+    assert not ledger.has_student("s9")
+    assert not ledger.has_students()
+
+
+def test_draws_after_import_are_appended_and_queued(tmp_path):
+    spreadsheet = FakeSpreadsheet(SHEETS)
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+    ledger.ensure_student("s1", lambda: student_sheet_records(spreadsheet, "s1"))
+
+    ledger.record_draws("s1", [("冰箭", "普通")], "2026-10-02 09:00:00")
+    ledger.record_draws("s1", [], "2026-10-02 09:00:01")  # 卡池抽完：不寫入也不排入同步
+
+    assert len(ledger.student_records("s1")) == 4
+    assert [(kind, ws, payload) for _, kind, ws, payload, _, _ in ledger.outbox_items()] == [
+        ("append", "s1", [["s1", "冰箭", "普通", "2026-10-02 09:00:00"]])]
+
+
+# 🏆 排行榜統計（student_summary）隨每次抽卡累加，與由明細重新計算的結果相同
+def recount(records):
+    names = {r["卡名"] for r in records}
+    by_rarity = lambda rarity: sum(r["稀有度"] == rarity for r in records)
+    return {"總抽卡數": len(records), "卡片種類數": len(names), "傳說卡數": by_rarity("傳說"),
+            "史詩卡數": by_rarity("史詩"), "稀有卡數": by_rarity("稀有"), "普通卡數": by_rarity("普通")}
+
+
+def test_leaderboard_matches_recount(tmp_path):
+    spreadsheet = FakeSpreadsheet(SHEETS)
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+    ledger.ensure_student("s1", lambda: student_sheet_records(spreadsheet, "s1"))
+    ledger.import_student("s2", [])
+    ledger.record_draws("s1", [("龍息", "史詩"), ("火球", "普通")], "t1")
+    ledger.record_draws("s2", [("雷擊", "稀有"), ("雷擊", "稀有"), ("神諭", "傳說")], "t2")
+    ledger.import_student("s3", [])  # 還沒抽過卡的學生不列入排行榜
+
+    rows = {row.pop("學號"): row for row in ledger.leaderboard()}
+    assert set(rows) == {"s1", "s2"}
+    for student_id, row in rows.items():
+        assert row == recount(ledger.student_records(student_id))
+
+
+def test_leaderboard_backfilled_for_old_database(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    ledger = DrawLedger(path)
+    ledger.import_student("s1", [("火球", "普通", "t1"), ("神諭", "傳說", "t2")])
+    # 舊版資料庫只有 draw_records：清掉統計後重新開啟要能補回
+    with ledger.connection() as conn:
+        conn.execute("DELETE FROM student_summary")
+        conn.execute("DELETE FROM student_cards")
+
+    rows = DrawLedger(path).leaderboard()
+    assert [row["學號"] for row in rows] == ["s1"]
+    assert rows[0]["傳說卡數"] == 1 and rows[0]["總抽卡數"] == 2
@@ -0,0 +1,69 @@
+# 📈 向量化蒙地卡羅模擬與逐抽的 DrawSession 有相同的分布
+import random
+
+import numpy as np
+
+from cardpack.montecarlo import simulate
+from cardpack.sampler import DrawSession
+
+CARDS = [("火球", "普通"), ("冰箭", "普通"), ("木盾", "普通"), ("水槍", "普通"),
+         ("雷擊", "稀有"), ("治療", "稀有"), ("護盾", "稀有"),
+         ("龍息", "史詩"), ("時停", "史詩"),
+         ("神諭", "傳說"), ("天罰", "傳說"),
+         ("無名", "未知")]  # 抽不到的卡不列入收集目標
+RARITIES = ["普通", "稀有", "史詩", "傳說"]
+CHECKPOINT = 10
+
+
+# 逐抽模擬一位學生：抽到卡池抽完為止
+def session_result(rng):
+    session = DrawSession(CARDS, rng=rng)
+    targets = {card for card in CARDS if card[1] in RARITIES}
+    seen = set()
+    result = {"rarity_complete": {}, "owned": None}
+    draws = 0
+    while not session.exhausted():
+        card = session.draw(1)[0]
+        draws += 1
+        seen.add(card)
+        if card[1] == "傳說" and "first_legendary" not in result:
+            result["first_legendary"] = draws
+        for rarity in RARITIES:
+            group = {c for c in targets if c[1] == rarity}
+            if rarity not in result["rarity_complete"] and group <= seen:
+                result["rarity_complete"][rarity] = draws
+        if "complete" not in result and targets <= seen:
+            result["complete"] = draws
+        if draws == CHECKPOINT:
+            result["owned"] = {r: len({c for c in seen if c[1] == r}) / sum(c[1] == r for c in targets) for r in RARITIES}
+    return result
+
+
+def assert_same_mean(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    stderr = np.sqrt(a.var() / len(a) + b.var() / len(b))
+    assert abs(a.mean() - b.mean()) <= 5 * stderr + 1e-9, (a.mean(), b.mean())
+
+
+def test_simulate_matches_draw_session():
+    rng = random.Random(3)
+    sessions = [session_result(rng) for _ in range(3000)]
+    result = simulate(CARDS, 30000, checkpoints=[CHECKPOINT], seed=5)
+
+    assert result["total_units"] == 4 * 2 + 3 * 2 + 2 * 2 + 2 * 1
+    assert ("無名", "未知") not in result["cards"]
+    assert_same_mean(result["complete"], [s["complete"] for s in sessions])
+    assert_same_mean(result["first_legendary"], [s["first_legendary"] for s in sessions])
+    for rarity in RARITIES:
+        assert_same_mean(result["rarity_complete"][rarity], [s["rarity_complete"][rarity] for s in sessions])
+        # 飽和度只有平均值，容許誤差以逐抽模擬的變異估計
+        owned = np.array([s["owned"][rarity] for s in sessions])
+        assert abs(result["saturation"][CHECKPOINT][rarity] - owned.mean()) <= 5 * owned.std() / np.sqrt(len(owned))
+
+
+def test_results_stay_within_the_pool():
+    result = simulate(CARDS, 1000, seed=1)
+    assert result["complete"].max() <= result["total_units"]
+    assert result["complete"].min() >= len(result["cards"])
+    assert (result["first_legendary"] >= 1).all()
+    assert (result["rarity_complete"]["傳說"] <= result["complete"]).all()
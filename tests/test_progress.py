@@ -0,0 +1,69 @@
+# 📋 ProgressIndex：同時過期只讀一次、寫回日期以最新的列號為準
+import threading
+
+from cardpack.fake_sheets import PROGRESS_HEADER, FakeSpreadsheet
+from cardpack.progress import ProgressIndex
+
+
+def progress_sheet(*rows):
+    return FakeSpreadsheet({"進度表": [PROGRESS_HEADER] + [list(r) for r in rows]}, latency=(0.02, 0.02))
+
+
+def test_concurrent_cold_lookups_read_once():
+    spreadsheet = progress_sheet(["s1", "小明", "3", "", "2", ""])
+    index = ProgressIndex()
+    index.lookup(spreadsheet, "warmup")  # 先讓分頁清單進快取，只計算進度表本身的讀取
+    index.invalidate()
+    before = spreadsheet.stats()["read"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(index.lookup(spreadsheet, "s1"))) for _ in range(30)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert spreadsheet.stats()["read"] - before == 1
+    assert all(found == (2, dict(zip(PROGRESS_HEADER, ["s1", "小明", "3", "", "2", ""]))) for found in results)
+
+
+def test_write_dates_follows_resorted_rows():
+    spreadsheet = progress_sheet(["s1", "小明", "", "", "", ""], ["s2", "小華", "", "", "", ""])
+    index = ProgressIndex()
+    assert index.lookup(spreadsheet, "s1")[0] == 2  # 快取：s1 在第 2 列
+
+    # 快取還沒過期時，老師把進度表重新排序
+    worksheet = spreadsheet.worksheet("進度表")
+    worksheet.clear()
+    worksheet.append_rows([PROGRESS_HEADER, ["s2", "小華", "", "", "", ""], ["s1", "小明", "", "", "", ""]])
+
+    skipped = index.write_dates(spreadsheet, [("s1", "作業最後抽卡日", "2026-10-01")])
+
+    assert skipped == []
+    rows = worksheet.get_all_values()
+    assert rows[1][0] == "s2" and rows[1][3] == ""
+    assert rows[2][0] == "s1" and rows[2][3] == "2026-10-01"
+
+
+def test_write_dates_returns_unknown_students_and_columns():
+    spreadsheet = progress_sheet(["s1", "小明", "", "", "", ""])
+    index = ProgressIndex()
+
+    skipped = index.write_dates(spreadsheet, [
+        ("s1", "進度最後抽卡日", "2026-10-02"),
+        ("s9", "進度最後抽卡日", "2026-10-02"),
+        ("s1", "不存在的欄位", "2026-10-02"),
+    ])
+
+    assert skipped == [("s9", "進度最後抽卡日", "2026-10-02"), ("s1", "不存在的欄位", "2026-10-02")]
+    assert spreadsheet.worksheet("進度表").get_all_values()[1][5] == "2026-10-02"
+
+
+def test_write_dates_raises_when_sheet_missing():
+    index = ProgressIndex()
+    try:
+        index.write_dates(FakeSpreadsheet({}), [("s1", "作業最後抽卡日", "2026-10-01")])
+    except LookupError:
+        pass
+    else:
+        raise AssertionError("進度表不存在時應整批重試")
@@ -0,0 +1,91 @@
+# 🚦 配額排程：優先順序保留、較高優先不被插隊、429 退避重試
+import threading
+import time
+
+import pytest
+
+from cardpack import quota
+from cardpack.fake_sheets import FakeAPIError
+from cardpack.quota import HIGH, LOW, NORMAL, QuotaWaitTimeout, SheetsScheduler
+
+
+def take_all(scheduler, priority):
+    taken = 0
+    while True:
+        try:
+            scheduler.acquire("read", priority, timeout=0.05)
+        except QuotaWaitTimeout:
+            return taken
+        taken += 1
+
+
+def test_lower_priorities_leave_reserved_tokens():
+    scheduler = SheetsScheduler(reads_per_minute=10, writes_per_minute=10)
+    assert take_all(scheduler, LOW) == 7      # 保留 30%（3 個）
+    assert take_all(scheduler, NORMAL) == 2   # 保留 10%（1 個）
+    assert take_all(scheduler, HIGH) == 1     # 最後的權杖只給抽卡寫入
+
+
+def test_waiting_high_priority_goes_first():
+    scheduler = SheetsScheduler(reads_per_minute=2, writes_per_minute=2)
+    bucket = scheduler.buckets["read"]
+    # 兩個權杖都剛用掉，約 0.3 秒後同時歸還
+    soon = time.monotonic() - bucket.WINDOW + 0.3
+    bucket.take(soon)
+    bucket.take(soon)
+
+    order = []
+    low = threading.Thread(target=lambda: (scheduler.acquire("read", LOW, timeout=5), order.append("low")))
+    high = threading.Thread(target=lambda: (scheduler.acquire("read", HIGH, timeout=5), order.append("high")))
+    low.start()
+    time.sleep(0.1)
+    high.start()
+    low.join()
+    high.join()
+    assert order == ["high", "low"]
+
+
+def test_quota_error_backs_off_and_retries(monkeypatch):
+    monkeypatch.setattr(quota, "BASE_BACKOFF", 0.2)
+    scheduler = SheetsScheduler(reads_per_minute=60, writes_per_minute=60)
+    calls = []
+
+    def flaky():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise FakeAPIError(429, "超過配額")
+        return "ok"
+
+    assert scheduler.call("read", flaky, priority=HIGH) == "ok"
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.1          # 退避（含抖動）至少 BASE_BACKOFF 的一半
+    assert scheduler.headroom()["stats"]["quota_errors"] == 1
+    assert scheduler._failures == 0            # 成功後退避次數歸零
+
+
+def test_quota_error_gives_up_after_retries(monkeypatch):
+    monkeypatch.setattr(quota, "BASE_BACKOFF", 0.01)
+    scheduler = SheetsScheduler(reads_per_minute=60, writes_per_minute=60)
+    calls = []
+
+    def always_busy():
+        calls.append(1)
+        raise FakeAPIError(429, "超過配額")
+
+    with pytest.raises(FakeAPIError):
+        scheduler.call("read", always_busy, priority=HIGH, retries=2)
+    assert len(calls) == 3
+
+
+def test_other_errors_are_not_retried():
+    scheduler = SheetsScheduler(reads_per_minute=60, writes_per_minute=60)
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise FakeAPIError(500, "後端錯誤")
+
+    with pytest.raises(FakeAPIError):
+        scheduler.call("read", broken, priority=HIGH)
+    assert len(calls) == 1
+    assert scheduler.headroom()["stats"]["quota_errors"] == 0
@@ -0,0 +1,61 @@
+# 🏆 每日名次快照：合併、同步到「排行榜快照」（每天一列）與舊紀錄匯入
+import json
+
+from cardpack.fake_sheets import FakeSpreadsheet
+from cardpack.ledger import DrawLedger
+from cardpack.rank_history import (
+    LEGACY_RANK_SHEET, RANK_SNAPSHOT_HEADER, RANK_SNAPSHOT_SHEET, migrate_legacy_rank_history, ranks_on,
+    record_ranks,
+)
+from cardpack.replication import replicate_once
+
+
+def snapshot_rows(spreadsheet):
+    rows = spreadsheet.worksheet(RANK_SNAPSHOT_SHEET).get_all_values()
+    return rows[0], [(d, json.loads(r)) for d, r in rows[1:]]
+
+
+def test_merge_keeps_first_rank_of_the_day(tmp_path):
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+    assert ledger.merge_rank_snapshot("2026-10-01", {"s1": 1, "s2": 2}) == {"s1": 1, "s2": 2}
+    assert ledger.merge_rank_snapshot("2026-10-01", {"s1": 2, "s2": 1}) is None  # 沒有新學生
+    assert ledger.merge_rank_snapshot("2026-10-01", {"s2": 1, "s3": 3}) == {"s1": 1, "s2": 2, "s3": 3}
+    assert ranks_on(ledger, "2026-10-01") == {"s1": 1, "s2": 2, "s3": 3}
+    assert ranks_on(ledger, "2026-09-30") == {}
+    assert ledger.outbox_depth() == 0  # 沒有指定同步的分頁
+
+
+def test_one_sheet_row_per_day(tmp_path):
+    spreadsheet = FakeSpreadsheet({})
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+
+    assert record_ranks(ledger, "2026-10-01", {"s1": 1})
+    replicate_once(ledger, spreadsheet)
+    assert record_ranks(ledger, "2026-10-01", {"s2": 2})
+    assert not record_ranks(ledger, "2026-10-01", {"s2": 5})
+    assert record_ranks(ledger, "2026-10-02", {"s1": 1})
+    assert record_ranks(ledger, "2026-10-01", {"s3": 3})
+    replicate_once(ledger, spreadsheet)
+
+    header, rows = snapshot_rows(spreadsheet)
+    assert header == RANK_SNAPSHOT_HEADER
+    assert rows == [("2026-10-01", {"s1": 1, "s2": 2, "s3": 3}), ("2026-10-02", {"s1": 1})]
+    assert ledger.outbox_depth() == 0
+
+
+def test_legacy_history_is_compacted_once(tmp_path):
+    spreadsheet = FakeSpreadsheet({LEGACY_RANK_SHEET: [
+        ["日期", "學號", "名次"],
+        ["2026-09-01", "s1", "1"], ["2026-09-01", "s2", "2"],
+        ["2026-09-01", "s1", "3"],  # 同一天重複記錄：保留第一次
+        ["2026-09-02", "s2", "1"], ["2026-09-02", "s1", "x"],  # 無法解析的名次略過
+    ]})
+    ledger = DrawLedger(str(tmp_path / "ledger.db"))
+
+    assert migrate_legacy_rank_history(spreadsheet, ledger) == 2
+    assert migrate_legacy_rank_history(spreadsheet, ledger) == 0
+    assert ranks_on(ledger, "2026-09-01") == {"s1": 1, "s2": 2}
+    assert ranks_on(ledger, "2026-09-02") == {"s2": 1}
+
+    replicate_once(ledger, spreadsheet)
+    assert snapshot_rows(spreadsheet)[1] == [("2026-09-01", {"s1": 1, "s2": 2}), ("2026-09-02", {"s2": 1})]
@@ -0,0 +1,85 @@
+# ☁️ 背景同步：合併送出、失敗重試與放棄（FakeSpreadsheet）
+from cardpack.fake_sheets import PROGRESS_HEADER, FakeAPIError, FakeSpreadsheet
+from cardpack.gsheets import STUDENT_SHEET_HEADER
+from cardpack.ledger import DrawLedger
+from cardpack.replication import MAX_ATTEMPTS, enqueue_progress_date, replicate_once
+
+
+def make_ledger(tmp_path):
+    return DrawLedger(str(tmp_path / "ledger.db"))
+
+
+def dead_letters(ledger):
+    return ledger.connection().execute(
+        "SELECT kind, worksheet, attempts FROM sheet_outbox_dead ORDER BY id"
+    ).fetchall()
+
+
+def test_draws_for_one_student_are_sent_in_one_write(tmp_path):
+    spreadsheet = FakeSpreadsheet({})
+    ledger = make_ledger(tmp_path)
+    ledger.import_student("s1", [])
+    ledger.import_student("s2", [])
+    ledger.record_draws("s1", [("火球", "普通")], "t1")
+    ledger.record_draws("s1", [("冰箭", "普通"), ("神諭", "傳說")], "t2")
+    ledger.record_draws("s2", [("雷擊", "稀有")], "t3")
+
+    assert replicate_once(ledger, spreadsheet) == 3
+    assert ledger.outbox_depth() == 0
+    assert spreadsheet.worksheet("s1").get_all_values() == [
+        STUDENT_SHEET_HEADER, ["s1", "火球", "普通", "t1"], ["s1", "冰箭", "普通", "t2"], ["s1", "神諭", "傳說", "t2"]]
+    assert spreadsheet.worksheet("s2").get_all_values() == [STUDENT_SHEET_HEADER, ["s2", "雷擊", "稀有", "t3"]]
+    # 兩個分頁：各一次 add_worksheet 與一次 append_rows
+    assert spreadsheet.stats()["write"] == 4
+
+
+def test_progress_dates_coalesce_to_latest(tmp_path):
+    spreadsheet = FakeSpreadsheet({"進度表": [PROGRESS_HEADER, ["s1", "小明", "", "", "", ""]]})
+    ledger = make_ledger(tmp_path)
+    enqueue_progress_date(ledger, "s1", "作業最後抽卡日", "2026-10-01")
+    enqueue_progress_date(ledger, "s1", "作業最後抽卡日", "2026-10-02")
+    enqueue_progress_date(ledger, "s1", "進度最後抽卡日", "2026-10-02")
+
+    writes = spreadsheet.stats()["write"]
+    assert replicate_once(ledger, spreadsheet) == 3
+    assert spreadsheet.stats()["write"] - writes == 1
+    assert spreadsheet.worksheet("進度表").get_all_values()[1] == ["s1", "小明", "", "2026-10-02", "", "2026-10-02"]
+
+
+def test_unknown_student_is_dead_lettered_without_blocking_others(tmp_path):
+    spreadsheet = FakeSpreadsheet({"進度表": [PROGRESS_HEADER, ["s1", "小明", "", "", "", ""]]})
+    ledger = make_ledger(tmp_path)
+    enqueue_progress_date(ledger, "s9", "作業最後抽卡日", "2026-10-01")
+    enqueue_progress_date(ledger, "s1", "作業最後抽卡日", "2026-10-01")
+
+    assert replicate_once(ledger, spreadsheet) == 1
+    assert ledger.outbox_depth() == 0
+    assert dead_letters(ledger) == [("progress_date", "進度表", 1)]
+    assert spreadsheet.worksheet("進度表").get_all_values()[1][3] == "2026-10-01"
+
+
+def test_failures_back_off_then_dead_letter(tmp_path, monkeypatch):
+    spreadsheet = FakeSpreadsheet({})
+    ledger = make_ledger(tmp_path)
+    ledger.import_student("s1", [])
+    ledger.record_draws("s1", [("火球", "普通")], "t1")
+
+    def fail(*args, **kwargs):
+        raise FakeAPIError(500, "後端錯誤")
+
+    monkeypatch.setattr(spreadsheet, "add_worksheet", fail)
+    assert replicate_once(ledger, spreadsheet) == 0
+    (_, _, _, _, attempts, next_attempt), = ledger.outbox_items()
+    assert attempts == 1 and next_attempt > 0
+
+    # 還在退避中：不會再送
+    assert replicate_once(ledger, spreadsheet) == 0
+    assert ledger.outbox_items()[0][4] == 1
+
+    for _ in range(MAX_ATTEMPTS - 1):
+        with ledger.connection() as conn:
+            conn.execute("UPDATE sheet_outbox SET next_attempt = 0")
+        replicate_once(ledger, spreadsheet)
+
+    assert ledger.outbox_depth() == 0
+    assert dead_letters(ledger) == [("append", "s1", MAX_ATTEMPTS)]
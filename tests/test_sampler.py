@@ -0,0 +1,82 @@
+# 🎲 CardPool 與舊版展開 list 卡池（build_limited_card_pool）的分布比對
+from collections import Counter
+
+from cardpack.sampler import MAX_ALLOWED, RARITY_WEIGHTS, CardPool, DrawSession
+
+CARDS = [
+    ("火球", "普通"), ("冰箭", "普通"), ("木盾", "普通"),
+    ("雷擊", "稀有"), ("治療", "稀有"),
+    ("龍息", "史詩"), ("時停", "史詩"),
+    ("神諭", "傳說"), ("天罰", "傳說"),
+    ("無名", "未知"),  # 不在權重表內，舊版不會放進卡池
+]
+# 已到上限：冰箭（普通 2）、神諭（傳說 1）；部分已抽：火球、龍息
+DRAWN = {("冰箭", "普通"): 2, ("神諭", "傳說"): 1, ("火球", "普通"): 1, ("龍息", "史詩"): 1}
+
+
+# 舊版（baseline）build_limited_card_pool：每一單位權重放一筆 (卡名, 稀有度)
+def legacy_pool(cards, drawn_counts):
+    limited_pool = []
+    for name, rarity in cards:
+        key = (name, rarity)
+        remaining = max(0, MAX_ALLOWED.get(rarity, 0) - drawn_counts.get(key, 0))
+        weight = RARITY_WEIGHTS.get(rarity, 0)
+        for _ in range(remaining * weight):
+            limited_pool.append((name, rarity))
+    return limited_pool
+
+
+# 依序回傳指定值的亂數來源
+class ScriptedRandom:
+    def __init__(self, values):
+        self.values = iter(values)
+
+    def randrange(self, n):
+        value = next(self.values)
+        assert 0 <= value < n
+        return value
+
+
+# 走過 randrange(total) 的每一個值，統計 draw() 抽到的卡
+def walk(pool):
+    pool._rng = ScriptedRandom(range(pool.total))
+    return Counter(pool.draw() for _ in range(pool.total))
+
+
+def test_card_weights_match_legacy_pool():
+    pool = CardPool(CARDS, DRAWN)
+    legacy = legacy_pool(CARDS, DRAWN)
+    assert len(pool) == len(legacy)
+    assert pool.card_weights() == Counter(legacy)
+
+
+def test_every_index_maps_to_legacy_multiset():
+    assert walk(CardPool(CARDS, DRAWN)) == Counter(legacy_pool(CARDS, DRAWN))
+
+
+def test_cards_at_limit_are_excluded():
+    drawn_cards = set(walk(CardPool(CARDS, DRAWN)))
+    assert ("冰箭", "普通") not in drawn_cards
+    assert ("神諭", "傳說") not in drawn_cards
+    assert ("無名", "未知") not in drawn_cards
+
+
+def test_in_pack_limits_match_rebuilt_legacy_pool():
+    # 連續抽到同一張卡直到上限：每抽一張後的卡池，都要與「已抽數量加上這張」重建的舊版卡池相同
+    session = DrawSession(CARDS, DRAWN, rng=ScriptedRandom([0] * 4))
+    counts = Counter(DRAWN)
+    for _ in range(4):
+        card = session.draw(1)[0]
+        counts[card] += 1
+        assert counts[card] <= MAX_ALLOWED[card[1]]
+        assert session.pool.card_weights() == Counter(legacy_pool(CARDS, counts))
+        assert walk(CardPool(CARDS, counts)) == Counter(legacy_pool(CARDS, counts))
+
+
+def test_session_stops_when_pool_is_exhausted():
+    cards = [("神諭", "傳說"), ("雷擊", "稀有")]
+    session = DrawSession(cards, rng=ScriptedRandom([0, 0, 0]))
+    drawn = session.draw(5)
+    assert Counter(drawn) == {("神諭", "傳說"): 1, ("雷擊", "稀有"): 2}
+    assert session.exhausted()
+    assert legacy_pool(cards, Counter(drawn)) == []
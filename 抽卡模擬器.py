@@ -1,66 +1,52 @@
 # ✅ 優等卡牌抽卡模擬器（含學生抽卡限制版）
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import random
 from datetime import datetime
 import os
-from PIL import Image
-import time
-import base64
-import zipfile
-import io
 import pytz
-import gspread
-from google.oauth2.service_account import Credentials
+from cardpack.assets import card_art, report_missing_card_art, start_card_art_check
+from cardpack.audio import show_bgm_player
+from cardpack.catalog import get_catalog
+from cardpack.draw_cache import draw_counts
+from cardpack.gsheets import get_spreadsheet, student_sheet_records
+from cardpack.images import derivative_path
+from cardpack.ledger import get_ledger
+from cardpack.progress import progress_index
+from cardpack.quota import SHEETS_BUSY_MESSAGE, is_sheets_busy
+from cardpack.render import build_card_reveal_html
+from cardpack.replication import notify_replication, start_replication
+from cardpack.sampler import PACK_SIZE, DrawSession
+from cardpack.static_assets import asset_url
+from cardpack.theme import apply_background
+from cardpack.tracing import span, start_trace, tag_trace
+
+# ✅ 第一個 Streamlit 呼叫：頁面設定（之前不可以有連網或載入大型套件的動作）
+st.set_page_config(page_title="優等學院對戰卡牌 抽卡紀錄器", layout="wide")
 
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = Credentials.from_service_account_info(st.secrets["gspread_json"], scopes=SCOPE)
-client = gspread.authorize(creds)
+# ⏱️ 這次 rerun 的計時紀錄（見 pages/5_效能監控.py）
+start_trace("抽卡模擬器")
 
-SHEET_URL = "https://docs.google.com/spreadsheets/d/1-uKCq-8w_c3EUItPKV9NnEVkRAQiC5I5vW2BZr8NFfg/edit"
-sheet = client.open_by_url(SHEET_URL)
+# ✅ 共用的 Google Sheet（整個程序只授權、開啟一次，第一次用到時才連線）
+sheet = get_spreadsheet()
 
-st.set_page_config(page_title="優等學院對戰卡牌 抽卡紀錄器", layout="wide")
-st.info("目前讀取的卡池為：" + selected_pool)
-BACKGROUND_IMAGE_PATH = "background.png"
-if os.path.exists(BACKGROUND_IMAGE_PATH):
-    with open(BACKGROUND_IMAGE_PATH, "rb") as f:
-        bg_bytes = f.read()
-        bg_base64 = base64.b64encode(bg_bytes).decode()
-        page_bg = f"""
-        <style>
-        [data-testid="stApp"] {{
-            background-image: url("data:image/jpg;base64,{bg_base64}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-        }}
-        </style>
-        """
-        st.markdown(page_bg, unsafe_allow_html=True)
+# ✅ 背景圖片（壓縮過的版本，以可快取的網址提供，見 cardpack/theme.py）
+apply_background()
 
 # ✅ 玩家選擇要抽的卡池
 available_pools = ["基礎包", "羅馬戰士體驗營"]
 selected_pool = st.selectbox("請選擇想抽的卡包：", available_pools)
+st.info("目前讀取的卡池為：" + selected_pool)
 
-# ✅ 根據卡池分類篩選卡片
-all_cards_df = pd.read_excel("優等卡牌 的副本.xlsx", sheet_name="遊戲卡片")
-cards_df = all_cards_df[
-    (all_cards_df["類型"].isin(["學生卡", "知識卡", "武器卡"])) &
-    (all_cards_df["卡池分類"] == selected_pool)
-]
 
-# ✅ 檢查學生是否符合抽卡資格（根據 Google Sheet "進度表"）
+# ✅ 檢查學生是否符合抽卡資格（根據 Google Sheet "進度表"，經由短時間快取的索引查詢，不再每次讀整張表）
 def check_student_eligibility(student_id):
     try:
-        progress_ws = sheet.worksheet("進度表")  # 這裡請確認你的工作表名稱
-        records = progress_ws.get_all_records()
-        for row in records:
-            if str(row.get("學號")).strip() == str(student_id).strip():
-                return row.get("可抽卡") == "是"
-    except:
-        st.error("讀取進度表失敗，請確認工作表名稱與權限")
+        found = progress_index.lookup(sheet, student_id)
+        if found:
+            _, row = found
+            return row.get("可抽卡") == "是"
+    except Exception as e:
+        st.error(SHEETS_BUSY_MESSAGE if is_sheets_busy(e) else "讀取進度表失敗，請確認工作表名稱與權限")
     return False
 
 # 用來記錄密碼是否正確（Session State）
@@ -68,99 +54,66 @@ if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 
 
+# 🗃️ 本機抽卡資料庫（學生第一次出現時，從 Google Sheet 匯入既有紀錄）
+ledger = get_ledger()
+start_replication(ledger, lambda: sheet)
+
+def ensure_student_in_ledger(student_id):
+    return ledger.ensure_student(student_id, lambda: student_sheet_records(sheet, student_id))
+
+# 🔍 從本機資料庫讀取該學生已抽過的卡片數量（僅在快取未命中時呼叫）
+def load_student_drawn_counts(student_id):
+    ensure_student_in_ledger(student_id)
+    return ledger.drawn_counts(student_id)
 
-# 顯示背景音樂播放器（需使用者手動播放）
-def show_background_music_player():
-    music_path = "sounds/bgm.mp3"
-    if os.path.exists(music_path):
-        with open(music_path, "rb") as f:
-            data = f.read()
-            b64 = base64.b64encode(data).decode()
-            st.markdown(
-                f"""
-                <p>🎵 背景音樂：</p>
-                <audio controls loop>
-                    <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
-                </audio>
-                """,
-                unsafe_allow_html=True
-            )
-
-# 播放傳說音效
-
-def play_sound(sound_file):
-    if os.path.exists(sound_file):
-        with open(sound_file, "rb") as f:
-            data = f.read()
-            b64 = base64.b64encode(data).decode()
-            st.markdown(
-                f"""
-                <audio autoplay>
-                    <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
-                </audio>
-                """,
-                unsafe_allow_html=True
-            )
-
-
-
-
-# 🔍 抓取該學生已抽過的卡片數量
+# 🔍 抓取該學生已抽過的卡片數量（每位學生只讀一次，之後由存檔同步更新）
+# 讀不到已抽紀錄時不能當成「都沒抽過」（會超過每張卡的上限），這次先不抽卡
 def get_student_drawn_counts(student_id):
     try:
-        worksheet = sheet.worksheet(student_id)
-        records = worksheet.get_all_records()
-    except:
-        return {}
-
-    counts = {}
-    for record in records:
-        key = (record["卡名"], record["稀有度"])
-        counts[key] = counts.get(key, 0) + 1
-    return counts
-
-# 🧮 建立符合該學生限制 + 稀有度權重的卡池
-def build_limited_card_pool(student_id):
-    drawn_counts = get_student_drawn_counts(student_id)
-    max_allowed = {"普通": 2, "稀有": 2, "史詩": 2, "傳說": 1}
-    rarity_weights = {"普通": 75, "稀有": 20, "史詩": 4, "傳說": 1}
-
-    limited_pool = []
-    for _, row in cards_df.iterrows():
-        name = row["名稱"]
-        rarity = row["稀有度"]
-        key = (name, rarity)
-        current_count = drawn_counts.get(key, 0)
-        remaining = max(0, max_allowed.get(rarity, 0) - current_count)
-        weight = rarity_weights.get(rarity, 0)
-        for _ in range(remaining * weight):
-            limited_pool.append((name, rarity))
-    return limited_pool
-
-
-# 🎴 抽卡邏輯（含限制）
+        return draw_counts.get(student_id, lambda: load_student_drawn_counts(student_id))
+    except Exception as e:
+        st.error(SHEETS_BUSY_MESSAGE if is_sheets_busy(e) else f"❌ 無法讀取抽卡紀錄：{e}")
+        st.stop()
+
+# ✅ 根據卡池分類篩選卡片（共用的卡牌資料快取，不必每次重新讀 Excel；抽卡時才載入，不拖慢首頁顯示）
+def pool_cards(pool):
+    catalog = get_catalog()
+    report_missing_card_art(catalog)
+    return catalog.pool_cards(pool)
+
+# 🧮 建立符合該學生限制 + 稀有度權重的抽卡工作階段（已抽數量只讀一次，見 cardpack/sampler.py）
+def start_draw_session(student_id):
+    tag_trace("draw")
+    with span("draw.session"):
+        drawn_counts = get_student_drawn_counts(student_id)
+        cards_df = pool_cards(selected_pool)
+        return DrawSession(zip(cards_df["名稱"], cards_df["稀有度"]), drawn_counts)
+
+
+# 抽出的卡片 [(卡名, 稀有度), ...] → DataFrame（pandas 到第一次抽卡時才載入）
+def draw_frame(cards):
+    import pandas as pd
+    return pd.DataFrame(cards, columns=["卡名", "稀有度"])
+
+
+# 🎴 抽卡邏輯（含限制：每抽一張就扣除剩餘張數，同一包內也不會超過上限）
 def draw_single(student_id):
-    pool = build_limited_card_pool(student_id)
-    if not pool:
+    session = start_draw_session(student_id)
+    if session.exhausted():
         st.warning("你已經抽滿所有卡片了！")
-        return pd.DataFrame(columns=["卡名", "稀有度"])
-    drawn = random.sample(pool, 1)
-    return pd.DataFrame(drawn, columns=["卡名", "稀有度"])
+        return draw_frame([])
+    return draw_frame(session.draw(1))
 
 def draw_pack(student_id):
-    pool = build_limited_card_pool(student_id)
-    if len(pool) < 5:
-        drawn = random.choices(pool, k=5)
-    else:
-        drawn = random.sample(pool, 5)
-    return pd.DataFrame(drawn, columns=["卡名", "稀有度"])
+    session = start_draw_session(student_id)
+    return draw_frame(session.draw(PACK_SIZE))
 
 def simulate_draws(student_id, n_packs=10):
-    all_packs = []
-    for _ in range(n_packs):
-        pack = draw_pack(student_id)
-        all_packs.append(pack)
-    return pd.concat(all_packs, ignore_index=True)
+    session = start_draw_session(student_id)
+    session.packs(n_packs)
+    if session.exhausted() and len(session.drawn) < n_packs * PACK_SIZE:
+        st.warning("卡池已抽完，本次抽出的張數少於預定包數。")
+    return draw_frame(session.drawn)
 
 # ✅ 儲存抽卡紀錄（含 Google Sheet）
 def save_draw_result(result_df, student_id):
@@ -173,207 +126,27 @@ def save_draw_result(result_df, student_id):
     os.makedirs(folder, exist_ok=True)
     timestamp = datetime.now(taipei).strftime("%Y%m%d_%H%M%S")
     filename = f"{folder}/抽卡紀錄_{student_id}_{timestamp}.xlsx"
-    result_df.to_excel(filename, index=False)
-
-    write_to_google_sheet(result_df, student_id)
+    with span("draw.xlsx"):
+        result_df.to_excel(filename, index=False)
+
+    # 寫入本機資料庫（正式紀錄）即完成；Google Sheet 由背景執行緒同步
+    # （抽卡前 start_draw_session 已確認過學生的舊紀錄，這裡不再呼叫 Google Sheet）
+    cards = list(zip(result_df["卡名"], result_df["稀有度"]))
+    ledger.record_draws(student_id, cards, now_tw)
+    draw_counts.record(student_id, cards)
+    notify_replication()
     return filename
 
-def write_to_google_sheet(result_df, student_id):
-    taipei = pytz.timezone("Asia/Taipei")
-    now = datetime.now(taipei).strftime("%Y-%m-%d %H:%M:%S")
-    sheet_titles = [ws.title for ws in sheet.worksheets()]
-
-    if student_id not in sheet_titles:
-        worksheet = sheet.add_worksheet(title=student_id, rows=1000, cols=10)
-        worksheet.append_row(["學號", "卡名", "稀有度", "抽取時間"])
-    else:
-        worksheet = sheet.worksheet(student_id)
-
-    for _, row in result_df.iterrows():
-        worksheet.append_row([
-            student_id,
-            row["卡名"],
-            row["稀有度"],
-            now
-        ])
-
-
-# ✅ 捲動畫面到底部（動畫區使用）
-def scroll_to_bottom():
-    components.html("""
-        <div id='bottom-marker'></div>
-        <script>
-            setTimeout(function() {
-                var marker = document.getElementById("bottom-marker");
-                if (marker) {
-                    marker.scrollIntoView({ behavior: "smooth" });
-                }
-            }, 200);
-        </script>
-    """, height=0)
-
 
+# 🎴 翻牌動畫：整包卡一次送出，逐張出現與捲動由瀏覽器端計時（見 cardpack/render.py）
 def show_card_images_with_animation(card_df):
     st.subheader("點擊卡片翻面展示")
-    import mimetypes
-    img_folder = "card_images"
-    back_path = os.path.join(img_folder, "card_back.png")
-    if not os.path.exists(back_path):
+    final_html = build_card_reveal_html(card_df)
+    if final_html is None:
         st.warning("請提供統一卡背圖 card_back.png 放在 card_images 資料夾內")
         return
-
-    # Base64 讀入音效
-    def encode_audio(file_path):
-        if not os.path.exists(file_path):
-            return ""
-        mime_type, _ = mimetypes.guess_type(file_path)
-        with open(file_path, "rb") as f:
-            return f"data:{mime_type};base64," + base64.b64encode(f.read()).decode()
-
-    sfx_legendary = encode_audio("sounds/legendary.mp3")
-    sfx_epic = encode_audio("sounds/epic.mp3")
-    sfx_rare = encode_audio("sounds/rare.mp3")
-    sfx_hover = encode_audio("sounds/hover.mp3")  # 統一 hover 音效
-
-    card_width = 200
-    card_height = 290
-    if len(card_df) == 1:
-        card_width = 260
-        card_height = 370
-
-    container_css = f"""
-    .card-container {{
-        {'display: flex; justify-content: center; align-items: center; height: 100%; padding: 30px;' if len(card_df) == 1 else 'display: grid; grid-template-columns: repeat(5, 1fr); gap: 20px; justify-items: center; padding: 20px; max-width: 1100px; margin: 0 auto;'}
-    }}
-    .flip-card {{
-        background-color: transparent;
-        width: {card_width}px;
-        height: {card_height}px;
-        perspective: 1000px;
-        position: relative;
-        transition: box-shadow 0.5s ease-in-out;
-        animation: float 3s ease-in-out infinite;
-    }}
-    """
-
-    back_b64 = base64.b64encode(open(back_path, "rb").read()).decode()
-    html_cards = ""
-
-    for idx, row in card_df.iterrows():
-        name = row["卡名"]
-        rarity = row["稀有度"]
-        img_path = None
-        for ext in [".png", ".jpg", ".jpeg", ".webp"]:
-            try_path = os.path.join(img_folder, f"{name}{ext}")
-            if os.path.exists(try_path):
-                img_path = try_path
-                break
-
-        if img_path:
-            front_b64 = base64.b64encode(open(img_path, "rb").read()).decode()
-            rarity_class = ""
-            if rarity == "稀有":
-                rarity_class = "hover-glow-white"
-                sound_data = sfx_rare
-            elif rarity == "史詩":
-                rarity_class = "hover-glow-purple"
-                sound_data = sfx_epic
-            elif rarity == "傳說":
-                rarity_class = "hover-glow-gold pulse-animation"
-                sound_data = sfx_legendary
-            else:
-                sound_data = ""
-
-            audio_tag = f"var a=new Audio('{sound_data}');a.play();" if sound_data else ""
-            hover_audio = f"onmouseenter=\"if(!this.hovered){{this.hovered=true;this.sound=new Audio('{sfx_hover}');this.sound.loop=true;this.sound.volume=0.4;this.sound.play();}}\" onmouseleave=\"if(this.sound){{this.sound.pause();this.sound.currentTime=0;this.hovered=false;}}\""
-            
-            html_cards += f"""
-            <div class="flip-card {rarity_class}" onclick="this.classList.add('flipped'); {audio_tag}" {hover_audio}>
-              <div class="flip-card-inner">
-                <div class="flip-card-front">
-                  <img src="data:image/png;base64,{back_b64}" width="100%">
-                </div>
-                <div class="flip-card-back">
-                  <img src="data:image/png;base64,{front_b64}" width="100%">
-                  <p style='text-align:center;font-weight:bold;color:gold;margin:0;'>{name} ({rarity})</p>
-                </div>
-              </div>
-            </div>
-    """
-
-        if (idx + 1) % 5 == 0:
-            html_cards += "<div style='flex-basis: 100%; height: 10px;'></div>"
-            scroll_to_bottom()
-        time.sleep(0.2)
-
-    final_html = f"""
-    <style>
-    {container_css}
-    .flip-card-inner {{
-        position: relative;
-        width: 100%;
-        height: 100%;
-        text-align: center;
-        transition: transform 0.8s;
-        transform-style: preserve-3d;
-    }}
-    .flipped .flip-card-inner {{
-        transform: rotateY(180deg);
-    }}
-    .flip-card-front, .flip-card-back {{
-        position: absolute;
-        width: 100%;
-        height: 100%;
-        backface-visibility: hidden;
-        border-radius: 12px;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.3);
-    }}
-    .flip-card-back {{
-        transform: rotateY(180deg);
-    }}
-    .hover-glow-white:hover {{
-        box-shadow: 0 0 20px 5px white !important;
-        animation: glow-white 1.5s infinite alternate;
-    }}
-    .hover-glow-purple:hover {{
-        box-shadow: 0 0 20px 5px purple !important;
-        animation: glow-purple 1.5s infinite alternate;
-    }}
-    .hover-glow-gold:hover {{
-        box-shadow: 0 0 20px 5px gold !important;
-        animation: glow-gold 1.5s infinite alternate;
-    }}
-    @keyframes glow-white {{
-        from {{ box-shadow: 0 0 5px white; }}
-        to {{ box-shadow: 0 0 25px white; }}
-    }}
-    @keyframes glow-purple {{
-        from {{ box-shadow: 0 0 5px purple; }}
-        to {{ box-shadow: 0 0 25px violet; }}
-    }}
-    @keyframes glow-gold {{
-        from {{ box-shadow: 0 0 5px gold; }}
-        to {{ box-shadow: 0 0 25px orange; }}
-    }}
-    @keyframes pulse {{
-        0%   {{ transform: scale(1); }}
-        50%  {{ transform: scale(1.2); }}
-        100% {{ transform: scale(1); }}
-    }}
-    @keyframes float {{
-        0% {{ transform: translateY(0px); }}
-        50% {{ transform: translateY(-10px); }}
-        100% {{ transform: translateY(0px); }}
-    }}
-    .pulse-animation {{
-        animation: pulse 1s ease-in-out infinite;
-    }}
-    </style>
-    <div class="card-container">
-    {html_cards}
-    </div>
-    """
-    components.html(final_html, height=750, scrolling=True)
+    with span("render.component"):
+        components.html(final_html, height=750, scrolling=True)
 
 
 # --- Streamlit 前端 ---
@@ -381,25 +154,8 @@ def show_card_images_with_animation(card_df):
 st.title("優等學院對戰卡牌 抽卡紀錄器")
 
 
-# 背景音樂函式（顯示播放器）
-def show_background_music_player():
-    music_path = "sounds/bgm.mp3"
-    if os.path.exists(music_path):
-        with open(music_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode()
-            components.html(f"""
-                <p>🎵 背景音樂：</p>
-                <audio id="bgm" controls autoplay loop>
-                    <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
-                    Your browser does not support the audio element.
-                </audio>
-                <script>
-                    var audio = document.getElementById("bgm");
-                    audio.volume = 0.05;  // 設定音量為 20%
-                </script>
-            """, height=100)
-
-show_background_music_player()
+# 背景音樂播放器（音檔在程序內快取，見 cardpack/audio.py）
+show_bgm_player("🎵 背景音樂：")
 
 # 顯示 4 張英雄卡封面（含 hover 特效）
 st.markdown("""
@@ -426,23 +182,15 @@ st.markdown("""
 }
 </style>
 """, unsafe_allow_html=True)
-hero_folder = "card_images"
 hero_names = ["Annie老師", "紀老師", "黃老師", "Allen老師"]
 hero_cols = st.columns(4)
 for i, name in enumerate(hero_names):
-    img_path = None
-    for ext in [".png", ".jpg", ".jpeg", ".webp"]:
-        try_path = os.path.join(hero_folder, f"{name}{ext}")
-        if os.path.exists(try_path):
-            img_path = try_path
-            break
-
+    img_path = card_art.path(name)
     if img_path:
-        with open(img_path, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode()
+        img_src = asset_url(derivative_path(img_path, "gallery"))
         hero_cols[i].markdown(f"""
         <div class='hero-card-container'>
-            <img src='data:image/png;base64,{img_b64}' class='hero-hover'>
+            <img src='{img_src}' class='hero-hover'>
             <div class='hero-caption'>{name}</div>
         </div>
         """, unsafe_allow_html=True)
@@ -466,23 +214,29 @@ if student_id:
         packs = st.number_input("請輸入要抽幾包卡（每包5張）", min_value=1, max_value=5, value=1)
         if st.button("開始抽卡！"):
             result = simulate_draws(student_id, packs)
-            st.success(f"已抽出 {packs} 包，共 {len(result)} 張卡！")
-            saved_file = save_draw_result(result, student_id)
-            st.info(f"抽卡紀錄已儲存至：{saved_file}")
-            if animate:
-                show_card_images_with_animation(result)
-            else:
-                st.dataframe(result)
+            if not result.empty:
+                st.success(f"已抽出 {packs} 包，共 {len(result)} 張卡！")
+                saved_file = save_draw_result(result, student_id)
+                st.info(f"抽卡紀錄已儲存至：{saved_file}")
+                if animate:
+                    show_card_images_with_animation(result)
+                else:
+                    st.dataframe(result)
 
     else:
         if st.button("立即單抽！🎯"):
             result = draw_single(student_id)
-            st.success("你抽到了 1 張卡片！")
-            saved_file = save_draw_result(result, student_id)
-            #st.info(f"抽卡紀錄已儲存至：{saved_file}")
-            if animate:
-                show_card_images_with_animation(result)
-            else:
-                st.dataframe(result)
+            # 卡池已抽完時 draw_single 已顯示提示，不存檔
+            if not result.empty:
+                st.success("你抽到了 1 張卡片！")
+                saved_file = save_draw_result(result, student_id)
+                #st.info(f"抽卡紀錄已儲存至：{saved_file}")
+                if animate:
+                    show_card_images_with_animation(result)
+                else:
+                    st.dataframe(result)
 else:
-    st.warning("請先輸入學號才能進行抽卡。")
\ No newline at end of file
+    st.warning("請先輸入學號才能進行抽卡。")
+
+# ⚠️ 程序啟動後在背景檢查一次缺少圖片的卡片（寫入 log）；放在頁面內容之後才開始，不拖慢首頁顯示
+start_card_art_check()